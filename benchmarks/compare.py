@@ -0,0 +1,55 @@
+import argparse
+import json
+import sys
+
+# A step regresses when it is this much slower / bigger than the baseline ...
+TIME_RATIO = 1.25
+RSS_RATIO = 1.25
+# ... and the change is above run-to-run noise
+MIN_SECONDS = 0.5
+MIN_RSS_MB = 50
+
+
+def compare(baseline, current, time_ratio=TIME_RATIO, rss_ratio=RSS_RATIO):
+    """Rows of (size, step, metric, old, new, ratio, regressed) for steps in both runs."""
+    rows = []
+    for size, steps in current["results"].items():
+        old_steps = baseline["results"].get(size, {})
+        for step, new in steps.items():
+            old = old_steps.get(step)
+            if not old or old.get("status") != "ok" or new.get("status") != "ok":
+                continue
+            for metric, limit, floor in [("seconds", time_ratio, MIN_SECONDS),
+                                         ("kernel_seconds", time_ratio, MIN_SECONDS),
+                                         ("peak_rss_mb", rss_ratio, MIN_RSS_MB)]:
+                if metric not in old or metric not in new:
+                    continue
+                ratio = new[metric] / max(old[metric], 1e-9)
+                regressed = ratio > limit and new[metric] - old[metric] > floor
+                rows.append((size, step, metric, old[metric], new[metric], ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag regressions between two benchmark runs.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--time-ratio", type=float, default=TIME_RATIO)
+    parser.add_argument("--rss-ratio", type=float, default=RSS_RATIO)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"{baseline['meta'].get('commit')} → {current['meta'].get('commit')}")
+    rows = compare(baseline, current, args.time_ratio, args.rss_ratio)
+    for size, step, metric, old, new, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{size:>9} {step:<13} {metric:<15} {old:>10.2f} → {new:>10.2f}  x{ratio:.2f}{flag}")
+    return 1 if any(r[-1] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
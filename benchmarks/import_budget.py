@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+# Wall-clock budget for a whole `python -m src rank` run against a store, and
+# for importing the CLI module alone
+RANK_BUDGET_S = 0.6
+IMPORT_BUDGET_S = 0.1
+REPEATS = 5
+
+# Must not be imported on the fast paths
+HEAVY = ["pandas", "sklearn", "scipy", "matplotlib", "seaborn", "playwright", "bs4", "requests"]
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+from src.cli import main
+imported = time.perf_counter() - t0
+if len(sys.argv) > 1:
+    import contextlib, io
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(sys.argv[1:])
+print(json.dumps({"import_s": imported, "heavy": sorted(m for m in %r if m in sys.modules)}))
+""" % (HEAVY,)
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def _probe(args, cwd):
+    """Best-of-REPEATS wall time of a fresh interpreter running the probe, plus what it imported."""
+    best, report = None, None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", PROBE, *args], cwd=cwd, env=_env(),
+                              capture_output=True, text=True, check=True)
+        wall = time.perf_counter() - t0
+        if best is None or wall < best:
+            best, report = wall, json.loads(proc.stdout.strip().splitlines()[-1])
+    return best, report
+
+
+def _build_store(workdir):
+    # A store from the processed data, so the check runs without the full pipeline
+    import pandas as pd
+
+    from src.pipeline.store import write_store
+
+    catalog = pd.read_csv(REPO_ROOT / "data" / "processed" / "materials_env_enriched.csv",
+                          dtype=str, keep_default_na=False, na_values=[""])
+    write_store(catalog, Path(workdir) / "materials_store")
+
+
+def check(rank_budget=RANK_BUDGET_S, import_budget=IMPORT_BUDGET_S):
+    with tempfile.TemporaryDirectory() as workdir:
+        _build_store(workdir)
+        results = {}
+        results["import"] = dict(zip(["wall_s", "report"], _probe([], workdir)))
+        results["rank"] = dict(zip(["wall_s", "report"], _probe(["rank", "--top", "10"], workdir)))
+
+    failures = []
+    imp = results["import"]["report"]["import_s"]
+    if imp > import_budget:
+        failures.append(f"importing src.cli took {imp:.3f}s > {import_budget}s")
+    if results["rank"]["wall_s"] > rank_budget:
+        failures.append(f"`rank` on a store took {results['rank']['wall_s']:.3f}s > {rank_budget}s")
+    for step in results:
+        heavy = results[step]["report"]["heavy"]
+        if heavy:
+            failures.append(f"{step} imported {heavy}")
+    return results, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when CLI start-up exceeds its import-time budget.")
+    parser.add_argument("--rank-budget", type=float, default=RANK_BUDGET_S)
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_S)
+    args = parser.parse_args()
+    results, failures = check(args.rank_budget, args.import_budget)
+    print(f"import src.cli        {results['import']['report']['import_s'] * 1e3:8.1f} ms")
+    print(f"python -m src rank    {results['rank']['wall_s'] * 1e3:8.1f} ms (fresh interpreter, best of {REPEATS})")
+    for f in failures:
+        print(f"OVER BUDGET: {f}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,57 @@
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.ml.cluster_selection import select_k
+from src.ranking.pareto import non_dominated_sort
+from src.ranking.topsis import TOPSIS_COLS, median_impute, topsis_directions, topsis_scores, topsis_weights
+
+INPUT = "materials_final_with_price.csv"
+# Layers the pareto kernel peels, as with `rank --fronts 3`
+PARETO_FRONTS = 3
+TEXT_COLS = ["Material Name", "Categories", "CategoryList", "Material Notes", "GUID"]
+
+
+def _topsis_matrix(df):
+    cols = [c for c in TOPSIS_COLS if c in df.columns]
+    X = df[cols].apply(pd.to_numeric, errors="coerce").values.astype(float)
+    return cols, median_impute(X)
+
+
+def topsis(df):
+    cols, X = _topsis_matrix(df)
+    t0 = time.perf_counter()
+    topsis_scores(X, topsis_weights(cols), topsis_directions(cols))
+    return time.perf_counter() - t0
+
+
+def pareto(df):
+    cols, X = _topsis_matrix(df)
+    t0 = time.perf_counter()
+    non_dominated_sort(X, topsis_directions(cols), max_fronts=PARETO_FRONTS)
+    return time.perf_counter() - t0
+
+
+def kmeans_sweep(df):
+    from sklearn.preprocessing import RobustScaler
+
+    num = df.drop(columns=[c for c in TEXT_COLS if c in df.columns]).apply(pd.to_numeric, errors="coerce")
+    num = num.loc[:, num.notna().any()]
+    X = RobustScaler().fit_transform(median_impute(num.values.astype(float)))
+    t0 = time.perf_counter()
+    select_k(X)
+    return time.perf_counter() - t0
+
+
+KERNELS = {"topsis": topsis, "pareto": pareto, "kmeans_sweep": kmeans_sweep}
+
+
+if __name__ == "__main__":
+    # Usage: kernels.py <kernel> [input.csv]; prints {"kernel_seconds": ...} as JSON
+    name = sys.argv[1]
+    df = pd.read_csv(sys.argv[2] if len(sys.argv) > 2 else INPUT)
+    seconds = KERNELS[name](df)
+    print(json.dumps({"kernel_seconds": round(seconds, 4), "rows": int(len(df))}))
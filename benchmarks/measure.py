@@ -0,0 +1,25 @@
+import atexit
+import os
+import runpy
+import sys
+
+# Usage: measure.py <script> [args...]
+# Runs script as __main__ and writes this process's peak RSS (VmHWM, KiB) to
+# $BENCH_RSS_FILE at exit. ru_maxrss from wait4 is not usable here: Linux keeps
+# the high-water mark across fork/exec, so every child would inherit the
+# benchmark driver's own peak.
+
+
+def _report():
+    path = os.environ.get("BENCH_RSS_FILE")
+    if not path:
+        return
+    with open("/proc/self/status") as f:
+        peak = next((line.split()[1] for line in f if line.startswith("VmHWM:")), "0")
+    with open(path, "w") as f:
+        f.write(peak)
+
+
+atexit.register(_report)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.import_budget import check as check_startup  # noqa: E402
+from benchmarks.synthetic import load_source, write_raw  # noqa: E402
+from src.pipeline.runner import select_stages  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+# Offline pipeline stages in order, then the numeric kernels on the priced table
+STAGE_NAMES = ["reconstruct", "units", "dedup", "impute", "environment", "cost", "rank", "store"]
+KERNEL_NAMES = ["topsis", "pareto", "kmeans_sweep"]
+KERNEL_INPUT = "materials_final_with_price.csv"
+
+STAGE_TIMEOUT = 3600
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def run_measured(script, args, cwd, timeout=STAGE_TIMEOUT):
+    """
+    Run a script under measure.py and return wall time, exit status and the
+    child's own peak RSS.
+    """
+    env = _env()
+    with tempfile.TemporaryDirectory() as tmp:
+        env["BENCH_RSS_FILE"] = rss_file = os.path.join(tmp, "rss")
+        cmd = [sys.executable, str(REPO_ROOT / "benchmarks" / "measure.py"), str(script), *args]
+        t0 = time.perf_counter()
+        try:
+            proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, timeout=timeout)
+            returncode, stdout, stderr = proc.returncode, proc.stdout, proc.stderr
+        except subprocess.TimeoutExpired as e:
+            err = e.stderr or b""
+            returncode, stdout, stderr = None, "", err.decode(errors="replace") if isinstance(err, bytes) else err
+        seconds = time.perf_counter() - t0
+        peak_kb = 0
+        if os.path.exists(rss_file):
+            with open(rss_file) as f:
+                peak_kb = int(f.read() or 0)
+    result = {"seconds": round(seconds, 3), "peak_rss_mb": round(peak_kb / 1024, 1), "returncode": returncode}
+    if returncode == 0:
+        result["status"] = "ok"
+    else:
+        result["status"] = "timeout" if returncode is None else "failed"
+        result["stderr"] = stderr.strip().splitlines()[-5:]
+    return result, stdout
+
+
+def _lines(path):
+    with open(path, "rb") as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+
+
+def bench_size(n_rows, workdir, source, seed=0, stages=STAGE_NAMES, kernels=KERNEL_NAMES):
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    results = {}
+
+    t0 = time.perf_counter()
+    info = write_raw(workdir / "comprehensive_matweb_data.csv", n_rows, seed=seed, source=source)
+    results["generate"] = {"seconds": round(time.perf_counter() - t0, 3), "status": "ok", **info}
+    print(f"  generate      {results['generate']['seconds']:>9.2f}s")
+
+    for stage in select_stages(stages):
+        missing = [i for i in stage["inputs"] if not (workdir / i).exists()]
+        if missing:
+            results[stage["name"]] = {"status": "missing_input", "missing": missing}
+            print(f"  {stage['name']:<13} missing {missing}")
+            continue
+        res, _ = run_measured(REPO_ROOT / stage["script"], [], workdir)
+        csv_out = [o for o in stage["outputs"] if o.endswith(".csv") and (workdir / o).exists()]
+        if csv_out:
+            res["output_lines"] = _lines(workdir / csv_out[0])
+        results[stage["name"]] = res
+        print(f"  {stage['name']:<13} {res['seconds']:>9.2f}s  {res['peak_rss_mb']:>8.1f} MB  {res['status']}")
+
+    for name in kernels:
+        if not (workdir / KERNEL_INPUT).exists():
+            results[name] = {"status": "missing_input", "missing": [KERNEL_INPUT]}
+            continue
+        res, stdout = run_measured(REPO_ROOT / "benchmarks" / "kernels.py", [name, KERNEL_INPUT], workdir)
+        if res["status"] == "ok":
+            res.update(json.loads(stdout.strip().splitlines()[-1]))
+        results[name] = res
+        print(f"  {name:<13} {res['seconds']:>9.2f}s  {res['peak_rss_mb']:>8.1f} MB  {res['status']}"
+              + (f"  (kernel {res['kernel_seconds']:.2f}s)" if "kernel_seconds" in res else ""))
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import numpy as np
+    import pandas as pd
+
+    return {
+        "commit": _git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--stages", nargs="+", default=STAGE_NAMES)
+    parser.add_argument("--kernels", nargs="*", default=KERNEL_NAMES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="keep the generated files here (default: temporary)")
+    parser.add_argument("--output", help="results JSON (default: benchmarks/results/<commit>-<time>.json)")
+    args = parser.parse_args(argv)
+
+    meta = environment()
+    base = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="materials-bench-"))
+    source = load_source()
+    results = {}
+    try:
+        for n in args.sizes:
+            print(f"{n:,} rows")
+            results[str(n)] = bench_size(n, base / str(n), source, args.seed, args.stages, args.kernels)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(base, ignore_errors=True)
+
+    startup, over_budget = check_startup()
+    print(f"startup: import {startup['import']['report']['import_s'] * 1e3:.1f} ms, "
+          f"rank {startup['rank']['wall_s'] * 1e3:.1f} ms" + "".join(f"\n  OVER BUDGET: {f}" for f in over_budget))
+
+    out = Path(args.output) if args.output else \
+        RESULTS_DIR / f"{meta['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"meta": meta, "seed": args.seed, "results": results,
+                   "startup": {"import_s": startup["import"]["report"]["import_s"],
+                               "rank_s": startup["rank"]["wall_s"], "over_budget": over_budget}}, f, indent=2)
+    print(f"Saved {out}")
+    failed = [(n, s) for n, r in results.items() for s, v in r.items() if v.get("status") not in ("ok",)]
+    return 1 if failed or over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
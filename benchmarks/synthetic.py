@@ -0,0 +1,156 @@
+import argparse
+import csv
+import io
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# Reconstructed scrape: the raw schema with one well-formed row per material
+SOURCE = REPO_ROOT / "data" / "processed" / "dataset_stage1_reconstructed.csv"
+OUTPUT = "comprehensive_matweb_data.csv"
+
+# Property values are scaled by one of JITTER_LEVELS factors in exp(±JITTER)
+JITTER = 0.15
+JITTER_LEVELS = 16
+
+# Malformed rows like the ones in the real scrape:
+#   wrapped  - a row broken over 2-3 physical lines (reconstructor re-joins them)
+#   overlong - a row with stray trailing fields (reconstructor truncates them)
+WRAP_RATE = 0.03
+OVERLONG_RATE = 0.02
+OVERLONG_EXTRA = (1, 40)
+
+CHUNK_ROWS = 50000
+
+NUMBER = re.compile(r"^(\s*[<>=~]*\s*)(-?\d+(?:\.\d+)?(?:e[+-]?\d+)?)(.*)$", re.S)
+
+
+def _format(x):
+    return f"{x:.4g}"
+
+
+def _jitter_tables(source, value_cols):
+    """
+    For every non-empty property cell of the source, its rendering under each
+    jitter level, so generating a row is an array lookup instead of a regex.
+    """
+    factors = np.exp(np.linspace(-JITTER, JITTER, JITTER_LEVELS))
+    tables = {}
+    for col in value_cols:
+        cells = source[col].values
+        table = np.empty((len(cells), JITTER_LEVELS), dtype=object)
+        for i, cell in enumerate(cells):
+            m = NUMBER.match(cell) if isinstance(cell, str) else None
+            if m is None:
+                table[i, :] = cell
+                continue
+            head, num, tail = m.groups()
+            table[i, :] = [head + _format(float(num) * f) + tail for f in factors]
+        tables[col] = table
+    return tables
+
+
+def load_source(path=SOURCE):
+    return pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+
+
+def synthetic_frame(source, n_rows, seed=0, tables=None, start=0):
+    """
+    n_rows materials bootstrapped from source rows, so the column schema,
+    category lists and per-row NaN patterns follow the real scrape. Numeric
+    property values are jittered (a value and its English comment column move
+    together) and GUIDs / names are made unique.
+    """
+    rng = np.random.default_rng(seed)
+    value_cols = [c for c in source.columns if c.startswith("Descriptive Properties")]
+    tables = tables or _jitter_tables(source, value_cols)
+    pick = rng.integers(0, len(source), n_rows)
+    out = source.iloc[pick].reset_index(drop=True)
+
+    # One factor per property shared by the metric column and its "(Comment)" twin
+    levels = {}
+    for col in value_cols:
+        base = col[:-len(" (Comment)")] if col.endswith(" (Comment)") else col
+        if base not in levels:
+            levels[base] = rng.integers(0, JITTER_LEVELS, n_rows)
+        out[col] = tables[col][pick, levels[base]]
+
+    ids = np.arange(start, start + n_rows)
+    out["GUID"] = [f"{i:032x}" for i in ids]
+    out["Material Name"] = out["Material Name"].fillna("Material") + pd.Series(
+        [f" (syn {i})" for i in ids])
+    return out
+
+
+def _malform(lines, rng, n_cols):
+    """Apply wrap / overlong damage to a list of CSV data lines in place."""
+    n = len(lines)
+    wrap = rng.random(n) < WRAP_RATE
+    overlong = ~wrap & (rng.random(n) < OVERLONG_RATE)
+    for i in np.flatnonzero(overlong):
+        extra = rng.integers(*OVERLONG_EXTRA)
+        lines[i] = lines[i] + "," * extra
+    for i in np.flatnonzero(wrap):
+        line = lines[i]
+        # break only at commas outside quotes, like a scraped cell split mid-row
+        cuts, inside = [], False
+        for pos, ch in enumerate(line):
+            if ch == '"':
+                inside = not inside
+            elif ch == "," and not inside:
+                cuts.append(pos)
+        if len(cuts) < 2:
+            continue
+        k = int(rng.integers(1, 3))
+        where = sorted(rng.choice(cuts[:n_cols - 1], size=min(k, len(cuts) - 1), replace=False))
+        pieces, prev = [], 0
+        for pos in where:
+            pieces.append(line[prev:pos])
+            prev = pos
+        pieces.append(line[prev:])
+        lines[i] = "\n".join(pieces)
+    return int(wrap.sum()), int(overlong.sum())
+
+
+def write_raw(path, n_rows, seed=0, source=None, malformed=True):
+    """
+    Write an n_rows synthetic raw scrape to path in chunks. Returns counts of
+    rows written and malformed rows injected.
+    """
+    source = load_source() if source is None else source
+    value_cols = [c for c in source.columns if c.startswith("Descriptive Properties")]
+    tables = _jitter_tables(source, value_cols)
+    rng = np.random.default_rng(seed + 1)
+    wrapped = overlong = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(_quote(c) for c in source.columns) + "\n")
+        for start in range(0, n_rows, CHUNK_ROWS):
+            chunk = synthetic_frame(source, min(CHUNK_ROWS, n_rows - start),
+                                    seed=seed + start, tables=tables, start=start)
+            buf = io.StringIO()
+            chunk.to_csv(buf, header=False, index=False, lineterminator="\n", quoting=csv.QUOTE_MINIMAL)
+            lines = buf.getvalue().split("\n")[:-1]
+            if malformed:
+                w, o = _malform(lines, rng, len(source.columns))
+                wrapped += w
+                overlong += o
+            f.write("\n".join(lines) + "\n")
+    return {"rows": n_rows, "wrapped": wrapped, "overlong": overlong}
+
+
+def _quote(s):
+    return f'"{s}"' if "," in s else s
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic raw MatWeb scrape.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clean", action="store_true", help="no malformed rows")
+    args = parser.parse_args()
+    info = write_raw(args.output, args.rows, args.seed, malformed=not args.clean)
+    print(f"Saved {args.output}: {info}")
@@ -0,0 +1,243 @@
+import argparse
+import csv
+import os
+import sys
+
+# Only the standard library is imported up front. pandas, sklearn and
+# playwright are imported inside the subcommands that need them, and
+# `rank` on a binary store needs numpy alone, so short jobs start fast.
+
+STORE_DIR = "materials_store"
+CATALOG = "materials_final_with_price.csv"
+
+# Pipeline subcommands run these runner stages (cached, dependency ordered)
+STAGE_GROUPS = {
+    "scrape": ["scrape"],
+    "clean": ["reconstruct", "units", "dedup"],
+    "impute": ["impute"],
+    "enrich": ["environment", "cost", "store"],
+}
+
+
+def parse_weights(items):
+    """["UTS=2", "Density=0.5"] -> {"UTS": 2.0, "Density": 0.5}"""
+    weights = {}
+    for item in items or []:
+        name, sep, value = item.rpartition("=")
+        if not sep or not name:
+            raise SystemExit(f"Bad weight {item!r}; expected COLUMN=VALUE")
+        weights[name] = float(value)
+    return weights
+
+
+def _write_csv(header, rows, output=None):
+    f = open(output, "w", newline="") if output else sys.stdout
+    try:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    finally:
+        if output:
+            f.close()
+
+
+def run_stages(args, names):
+    from src.pipeline.runner import run_pipeline
+
+    status = run_pipeline(args.workdir, names, args.force, args.jobs)
+    return 1 if any(v in ("failed", "blocked", "missing_input") for v in status.values()) else 0
+
+
+def cmd_pipeline(args):
+    names = (["guids"] if getattr(args, "guids", False) else []) + STAGE_GROUPS[args.command]
+    return run_stages(args, names)
+
+
+def cmd_refresh(args):
+    if args.guids:
+        args.force = True    # the GUID search is not a cached stage here: always re-collect
+        if run_stages(args, ["guids"]):
+            return 1
+    from src.refresh import refresh_catalog
+
+    os.chdir(args.workdir)
+    changes = refresh_catalog(args.budget, apply=not args.no_apply)
+    return 1 if changes is None else 0
+
+
+def _rank_store(path, cols, weights, n_fronts, method, top):
+    from src.pipeline.store import numeric_matrix, open_store, text_values
+    from src.ranking.rank import rank_matrix
+    from src.ranking.topsis import TOPSIS_COLS, median_impute
+
+    store = open_store(path)
+    cols = [c for c in (cols or TOPSIS_COLS) if c in store["numeric"]]
+    if not cols:
+        raise SystemExit("No ranking columns found in the store.")
+    X = median_impute(numeric_matrix(store, cols))
+    res = rank_matrix(X, cols, weights, n_fronts, method)
+    rows = res["rows"][:top] if top else res["rows"]
+    names = text_values(store, "Material Name", rows) if "Material Name" in store["text"] \
+        else [str(r) for r in rows]
+
+    # Print stored values at their stored precision (float32 noise is not data)
+    shown = X[rows].astype(store["values"].dtype)
+    header = ["Material Name"] + (["Pareto_Front"] if res["fronts"] is not None else []) + cols + [res["score_col"]]
+    out = []
+    for i, name in enumerate(names):
+        front = [int(res["fronts"][i])] if res["fronts"] is not None else []
+        out.append([name] + front + [float(str(v)) for v in shown[i]] + [float(res["score"][i])])
+    return header, out
+
+
+def _rank_csv(path, cols, weights, n_fronts, method, top):
+    from src.pipeline.schema import load_materials
+    from src.ranking.rank import rank_materials
+
+    df, _ = load_materials(path, coerce=True, narrow=False)
+    ranking = rank_materials(df, cols, weights, n_fronts, method)
+    if top:
+        ranking = ranking.head(top)
+    return list(ranking.columns), ranking.values.tolist()
+
+
+def cmd_rank(args):
+    path = os.path.join(args.workdir, args.input) if args.input else os.path.join(args.workdir, STORE_DIR)
+    if not args.input and not os.path.isdir(path):
+        path = os.path.join(args.workdir, CATALOG)
+    cols = args.cols.split(",") if args.cols else None
+    n_fronts = None if args.fronts == "all" else int(args.fronts)
+    rank = _rank_store if os.path.isdir(path) else _rank_csv
+    header, rows = rank(path, cols, parse_weights(args.weight), n_fronts, args.method, args.top)
+    _write_csv(header, rows, args.output)
+    return 0
+
+
+def cmd_query(args):
+    from src.ml.similarity import INDEX_FILE, build_index, load_index, query, save_index
+
+    index_path = os.path.join(args.workdir, args.index or INDEX_FILE)
+    if os.path.exists(index_path) and not args.rebuild:
+        index = load_index(index_path)
+    else:
+        store_path = os.path.join(args.workdir, STORE_DIR)
+        if os.path.isdir(store_path):
+            from src.pipeline.store import open_store, to_frame
+
+            df = to_frame(open_store(store_path))
+        else:
+            import pandas as pd
+
+            df = pd.read_csv(os.path.join(args.workdir, CATALOG))
+        index = build_index(df)
+        save_index(index, index_path)
+    try:
+        result = query(index, names=args.names, k=args.k)
+    except KeyError as e:
+        raise SystemExit(str(e.args[0]))
+    _write_csv(list(result.columns), result.values.tolist(), args.output)
+    return 0
+
+
+def cmd_plot(args):
+    from src.ml.density_grids import (
+        ASHBY_PAIRS, BUNDLE_FILE, GRID_CACHE, PCA_PAIRS, all_pairs, cached_grids, category_membership,
+        pca_inputs, render_all,
+    )
+    from src.pipeline.store import load_catalog
+
+    path = os.path.join(args.workdir, args.input) if args.input else os.path.join(args.workdir, STORE_DIR)
+    if not args.input and not os.path.isdir(path):
+        path = os.path.join(args.workdir, CATALOG)
+    X, cols, csr = load_catalog(path)
+    pairs = all_pairs(cols) if args.all_pairs else ASHBY_PAIRS
+    membership, names = category_membership(csr) if not args.all_pairs else (None, None)
+    cache_dir = os.path.join(args.workdir, GRID_CACHE)
+    grids = [cached_grids(X, cols, pairs, args.bins, membership, names, cache_dir=cache_dir)]
+    if args.pca:
+        P, pcs, membership, names = pca_inputs(X, cols, os.path.join(args.workdir, BUNDLE_FILE))
+        grids.append(cached_grids(P, pcs, PCA_PAIRS, args.bins, membership, names, cache_dir=cache_dir))
+    for g in grids:
+        for chart in render_all(g, os.path.join(args.workdir, args.outdir), args.jobs):
+            print(chart)
+    return 0
+
+
+def cmd_stats(args):
+    from src.ml.property_stats import INPUT, STATS_CACHE, catalog_stats, write_reports
+
+    # the cleaned table, not the store: the catalog behind it is already imputed
+    path = os.path.join(args.workdir, args.input or INPUT)
+    stats = catalog_stats(path, os.path.join(args.workdir, STATS_CACHE), args.min_periods)
+    for report in write_reports(stats, os.path.join(args.workdir, args.outdir)):
+        print(report)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src", description="Materials selection pipeline.")
+    parser.add_argument("--workdir", default=".", help="directory holding the pipeline files")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in [("scrape", "fetch datasheets for the saved GUID list"),
+                            ("clean", "reconstruct, clean and deduplicate the raw scrape"),
+                            ("impute", "category-weighted imputation"),
+                            ("enrich", "CO2, recyclability and price columns, then the binary store")]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--force", action="store_true", help="ignore the stage cache")
+        p.add_argument("--jobs", type=int, default=4, help="stages run concurrently")
+        if name == "scrape":
+            p.add_argument("--guids", action="store_true", help="collect the GUID list first")
+        p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser("refresh", help="re-fetch only new and due datasheets; record added/changed/removed")
+    p.add_argument("--guids", action="store_true", help="re-collect the GUID list first")
+    p.add_argument("--budget", type=int, default=250, help="re-fetches of known datasheets this run")
+    p.add_argument("--no-apply", action="store_true",
+                   help="dry run: write the change file only, leave the raw scrape and refresh state alone")
+    p.add_argument("--jobs", type=int, default=4, help=argparse.SUPPRESS)
+    p.set_defaults(func=cmd_refresh)
+
+    p = sub.add_parser("rank", help="rank materials (reads the binary store when present)")
+    p.add_argument("--input", help=f"store directory or CSV (default: {STORE_DIR}, else {CATALOG})")
+    p.add_argument("--cols", help="comma-separated objective columns (default: TOPSIS_COLS)")
+    p.add_argument("--weight", "-w", action="append", metavar="COL=VALUE", help="override a criterion weight")
+    p.add_argument("--method", choices=["topsis", "weighted"], default="topsis")
+    p.add_argument("--fronts", default="all",
+                   help="score only the first N Pareto layers (the top N rows stay exact), or 'all'")
+    p.add_argument("--top", type=int, default=20, help="rows to output (0 = all)")
+    p.add_argument("--output", "-o", help="CSV path (default: stdout)")
+    p.set_defaults(func=cmd_rank)
+
+    p = sub.add_parser("query", help="nearest materials to the named ones")
+    p.add_argument("names", nargs="+", help="Material Name values")
+    p.add_argument("-k", type=int, default=5)
+    p.add_argument("--index", help="similarity index file (built from the catalog when missing)")
+    p.add_argument("--rebuild", action="store_true", help="rebuild the index from the catalog")
+    p.add_argument("--output", "-o", help="CSV path (default: stdout)")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("plot", help="Ashby charts from cached density grids")
+    p.add_argument("--input", help=f"store directory or CSV (default: {STORE_DIR}, else {CATALOG})")
+    p.add_argument("--outdir", default="analysis_outputs")
+    p.add_argument("--bins", type=int, default=128, help="grid cells per axis")
+    p.add_argument("--jobs", type=int, help="render processes (default: one per chart)")
+    p.add_argument("--all-pairs", action="store_true", help="every numeric column pair (without category labels)")
+    p.add_argument("--pca", action="store_true", help="also draw the PCA chart labelled by KMeans cluster")
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser("stats", help="pairwise-complete correlations and per-category statistics")
+    p.add_argument("--input", help="CSV or store directory (default: dataset_cleaned_final.csv, before imputation)")
+    p.add_argument("--outdir", default="analysis_outputs")
+    p.add_argument("--min-periods", type=int, default=2, help="shared rows a pair needs")
+    p.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.telemetry import end_span, frame, log, start_span
+
+INPUT = "dataset_cleaned_final.csv"
+OUTPUT = "dataset_deduplicated.csv"
+GROUPS_OUTPUT = "duplicate_groups.csv"
+
+ID_COLS = ["GUID", "Material Name", "Categories", "CategoryList"]
+
+# Property values are bucketed on a log scale; 0.01 decades ~ 2.3 % bins
+QUANT_LOG_STEP = 0.01
+
+# MinHash / LSH layout: NUM_PERM = BANDS * ROWS_PER_BAND
+NUM_PERM = 32
+BANDS = 16
+ROWS_PER_BAND = 2
+SEED = 42
+
+# Buckets larger than this are generic (e.g. every "Density=2.7" metal) and skipped
+MAX_BUCKET = 200
+
+# Verification of candidate pairs
+REL_TOL = 0.03            # every co-observed property within 3 %
+MIN_SHARED_PROPS = 2      # and at least this many of them
+NAME_MIN_JACCARD = 0.3    # normalised name token overlap
+
+number_regex = re.compile(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?")
+name_split = re.compile(r"[^a-z0-9]+")
+
+
+def _numeric_matrix(df, cols):
+    out = np.empty((len(df), len(cols)))
+    for j, c in enumerate(cols):
+        s = df[c]
+        if not pd.api.types.is_numeric_dtype(s):
+            s = s.astype(str).str.extract(f"({number_regex.pattern})")[0]
+        out[:, j] = pd.to_numeric(s, errors="coerce").values
+    return out
+
+
+def name_tokens(name):
+    return {t for t in name_split.split(str(name).lower()) if len(t) > 1}
+
+
+def _token_hashes(values, names):
+    # One set of 32-bit token hashes per row: quantised properties + name tokens
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bins = np.round(np.log10(np.abs(values)) / QUANT_LOG_STEP)
+    signs = np.sign(values)
+    rows = []
+    for i in range(len(values)):
+        toks = []
+        for j in np.flatnonzero(~np.isnan(values[i])):
+            b = "0" if signs[i, j] == 0 else f"{int(signs[i, j])}:{int(bins[i, j])}"
+            toks.append(f"p{j}={b}")
+        toks.extend(f"n={t}" for t in names[i])
+        rows.append(np.array([zlib.crc32(t.encode()) for t in toks], dtype=np.uint64))
+    return rows
+
+
+def minhash_signatures(token_rows):
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(1, 2**63 - 1, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63 - 1, size=NUM_PERM, dtype=np.uint64)
+    sig = np.full((len(token_rows), NUM_PERM), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for i, h in enumerate(token_rows):
+        if len(h):
+            # multiply-shift hashing; uint64 overflow is intended
+            sig[i] = ((h[:, None] * a + b) >> np.uint64(32)).min(axis=0)
+    return sig
+
+
+def _is_duplicate(i, j, values, names):
+    both = ~np.isnan(values[i]) & ~np.isnan(values[j])
+    if both.sum() < MIN_SHARED_PROPS:
+        return False
+    a, b = values[i, both], values[j, both]
+    if np.any(np.abs(a - b) > REL_TOL * np.maximum(np.abs(a), np.abs(b))):
+        return False
+    union = names[i] | names[j]
+    return not union or len(names[i] & names[j]) / len(union) >= NAME_MIN_JACCARD
+
+
+def find_near_duplicates(df, cols=None):
+    """
+    Group id per row; rows sharing an id are near-duplicate grades.
+    Candidates come from LSH over MinHash signatures of quantised property
+    values and name tokens, then each candidate pair is verified on the raw
+    values, so the work grows with the number of rows, not pairs.
+    """
+    if cols is None:
+        cols = [c for c in df.columns if c not in ID_COLS]
+    values = _numeric_matrix(df, cols)
+    names = [name_tokens(n) for n in df.get("Material Name", pd.Series([""] * len(df)))]
+    sig = minhash_signatures(_token_hashes(values, names))
+
+    # Rows with identical signatures (re-listed datasheets) collapse up front,
+    # so LSH only sees one row per distinct signature. Rows with too few
+    # properties can never verify and stay on their own.
+    eligible = np.flatnonzero((~np.isnan(values)).sum(axis=1) >= MIN_SHARED_PROPS)
+    parent = np.arange(len(df))
+    if len(eligible) == 0:
+        return parent
+    _, first, inverse = np.unique(sig[eligible], axis=0, return_index=True, return_inverse=True)
+    first = eligible[first]
+    parent[eligible] = first[inverse.ravel()]
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        keys = sig[first, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        for i, key in zip(first, map(bytes, keys)):
+            buckets[key].append(i)
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > MAX_BUCKET:
+                continue
+            # each member is checked against one row per group already in the
+            # bucket; roots are looked up again after every merge, since a
+            # merge can make a stored root a child
+            roots = {}
+            for i in members:
+                ri = find(i)
+                for j in list(roots.values()):
+                    rj = find(j)
+                    if rj == ri:
+                        break
+                    if _is_duplicate(i, j, values, names):
+                        parent[max(ri, rj)] = min(ri, rj)
+                        roots = {find(k): k for k in roots.values()}
+                        break
+                roots.setdefault(find(i), i)
+
+    return np.array([find(i) for i in range(len(df))])
+
+
+def collapse_duplicates(df, cols=None):
+    """
+    Keep one representative per near-duplicate group (the most complete
+    datasheet) and return it with a member -> representative mapping.
+    """
+    df = df.reset_index(drop=True)
+    groups = find_near_duplicates(df, cols)
+    completeness = df.drop(columns=[c for c in ID_COLS if c in df.columns]) \
+        .replace("", np.nan).notna().sum(axis=1).values
+
+    order = np.lexsort((np.arange(len(df)), -completeness, groups))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = groups[order][1:] != groups[order][:-1]
+    rep_of_group = dict(zip(groups[order][first], order[first]))
+    rep = np.array([rep_of_group[g] for g in groups])
+
+    sizes = pd.Series(groups).value_counts()
+    reduced = df.loc[order[first]].sort_index().copy()
+    reduced["Group_Size"] = sizes.reindex(groups[reduced.index]).values
+
+    mapping = pd.DataFrame({
+        "Group": rep,
+        "Representative": df["Material Name"].values[rep] if "Material Name" in df.columns else rep,
+        "Material Name": df["Material Name"].values if "Material Name" in df.columns else np.arange(len(df)),
+    })
+    if "GUID" in df.columns:
+        mapping["GUID"] = df["GUID"].values
+        mapping["Representative GUID"] = df["GUID"].values[rep]
+    return reduced, mapping
+
+
+if __name__ == "__main__":
+    stage = start_span("dedup")
+    df = pd.read_csv(INPUT, dtype=str, keep_default_na=False)
+    frame(stage, df, "in")
+    reduced, mapping = collapse_duplicates(df)
+    reduced.to_csv(OUTPUT, index=False)
+    mapping.to_csv(GROUPS_OUTPUT, index=False)
+    frame(stage, reduced, "out")
+    end_span(stage)
+    log(f"Collapsed {len(df)} rows into {len(reduced)} groups → {OUTPUT} (mapping: {GROUPS_OUTPUT})")
@@ -1,43 +1,45 @@
 import pandas as pd
 import numpy as np
 
-# 1. Load dataset and drop GUID
-df = pd.read_csv("dataset_cleaned_final.csv")
-df = df.drop(columns=["GUID"], errors="ignore")
+from src.pipeline.schema import (
+    category_means, csr_lists, csr_rows, dense, load_materials, log_memory, memory_report,
+)
+from src.pipeline.telemetry import annotate, end_span, frame, log, start_span
+
+# 1. Load dataset (one row per near-duplicate group; compact: numeric columns
+#    parsed, sparse when mostly empty, categories split into CSR offsets/codes)
+#    and drop GUID and the dedup group size, which is not a property
+stage = start_span("impute")
+df, categories = load_materials("dataset_deduplicated.csv", coerce=True, narrow=False)
+frame(stage, df, "in")
+report = memory_report(df, categories, stage="impute")
+log_memory(report)
+annotate(stage, frame_bytes=report["bytes"])
+df = df.drop(columns=["GUID", "Group_Size"], errors="ignore")
 
 # 2. Rename columns for easier access
 df = df.rename(columns=lambda x: x.replace("Descriptive Properties - ", "").strip())
 
-# 3. Split category string into Python lists
-df["CategoryList"] = df["Categories"].fillna("").apply(lambda x: [c.strip() for c in x.split(";") if c.strip()])
+# 3. Extract all unique categories in the dataset
+all_categories = categories["vocab"]
 
-# 4. Extract all unique categories in the dataset
-all_categories = sorted({cat for lst in df["CategoryList"] for cat in lst})
+log(f"Collected {len(all_categories)} unique categories")
 
-print("Collected", len(all_categories), "unique categories")
-
-# 5. Identify numeric columns for imputation
-non_feature_cols = ["Material Name", "Categories", "CategoryList"]
+# 4. Identify numeric columns for imputation
+non_feature_cols = ["Material Name", "Categories"]
 feature_cols = [c for c in df.columns if c not in non_feature_cols]
-
-# Convert values to float, ignoring non-numeric strings
-for col in feature_cols:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
+X = dense(df, feature_cols)
 
 
-# 6. Build category → average value lookup tables
-category_stats = {
-    cat: {
-        col: df.loc[df["CategoryList"].apply(lambda lst: cat in lst), col].mean()
-        for col in feature_cols
-    }
-    for cat in all_categories
-}
+# 5. Build category → average value lookup tables (one pass over the memberships)
+step = start_span("category_stats")
+means = category_means(X, categories)
 
-print("Built category average tables")
+end_span(step)
+log("Built category average tables")
 
 
-# 7. Weight assignment function
+# 6. Weight assignment function
 def get_weights(n):
     if n == 1:
         return [1.0]
@@ -50,38 +52,42 @@ def get_weights(n):
     return (base / base.sum()).tolist()
 
 
-# 8. Weighted imputation logic
-def impute_row(row):
-    categories = row["CategoryList"]
-    if not categories:
-        return row
-
-    weights = get_weights(len(categories))
-
-    for col in feature_cols:
-        if not pd.isna(row[col]):
-            continue
-
-        weighted_values = []
-        weighted_weights = []
-
-        for cat, w in zip(categories, weights):
-            avg_val = category_stats.get(cat, {}).get(col, np.nan)
-            if not pd.isna(avg_val):
-                weighted_values.append(avg_val * w)
-                weighted_weights.append(w)
-
-        if weighted_values:
-            row[col] = sum(weighted_values) / sum(weighted_weights)
-
-    return row
-
-
-# 9. Apply imputation
-df_imputed = df.apply(impute_row, axis=1)
-
-print("Imputation complete")
-
-# 10. Save final dataset
+# 7. Weighted imputation: a missing value becomes the weighted mean of its
+#    categories' averages (categories without an average are skipped).
+#    Sums run over each row's categories in listed order, as a per-row loop would.
+def impute_matrix(X, csr, means):
+    rows = csr_rows(csr)
+    lengths = np.diff(csr["offsets"])
+    position = np.arange(len(rows)) - csr["offsets"][rows]
+    weights = np.empty(len(rows))
+    for n in np.unique(lengths[rows]):
+        at = lengths[rows] == n
+        weights[at] = np.array(get_weights(int(n)))[position[at]]
+
+    values = means[csr["codes"]]
+    known = ~np.isnan(values)
+    num = np.zeros_like(X)
+    den = np.zeros_like(X)
+    np.add.at(num, rows, np.where(known, values * weights[:, None], 0.0))
+    np.add.at(den, rows, np.where(known, weights[:, None], 0.0))
+    fill = np.isnan(X) & (den > 0)
+    out = X.copy()
+    out[fill] = num[fill] / den[fill]
+    return out
+
+
+# 8. Apply imputation
+step = start_span("impute_rows")
+imputed = impute_matrix(X, categories, means)
+end_span(step)
+
+log("Imputation complete")
+
+# 9. Save final dataset (category lists written out as before)
+df_imputed = pd.DataFrame({"Material Name": df["Material Name"], "Categories": df["Categories"]})
+df_imputed = pd.concat([df_imputed, pd.DataFrame(imputed, columns=feature_cols, index=df.index)], axis=1)
+df_imputed["CategoryList"] = csr_lists(categories)
 df_imputed.to_csv("dataset_final_imputed.csv", index=False)
-print("Saved dataset_final_imputed.csv")
\ No newline at end of file
+frame(stage, df_imputed, "out")
+end_span(stage)
+log("Saved dataset_final_imputed.csv")
\ No newline at end of file
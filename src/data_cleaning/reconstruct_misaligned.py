@@ -1,5 +1,7 @@
 import re
 
+from src.pipeline.telemetry import annotate, end_span, log, start_span
+
 INPUT = "comprehensive_matweb_data.csv"
 OUTPUT = "dataset_stage1_reconstructed.csv"
 
@@ -24,6 +26,7 @@ def split_csv_row(row):
     parts.append("".join(current).strip())
     return parts
 
+stage = start_span("reconstruct")
 with open(INPUT, "r", encoding="utf-8", errors="replace") as f:
     lines = f.readlines()
 
@@ -56,4 +59,6 @@ with open(OUTPUT, "w", encoding="utf-8") as f:
     for row in fixed_rows:
         f.write(row + "\n")
 
-print("Structural reconstruction finished.")
\ No newline at end of file
+annotate(stage, lines_in=len(lines) - 1, rows_out=len(fixed_rows) - 1, cols_out=EXPECTED_COLS)
+end_span(stage)
+log("Structural reconstruction finished.")
\ No newline at end of file
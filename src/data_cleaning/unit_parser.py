@@ -0,0 +1,283 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.telemetry import annotate, end_span, frame, log, start_span
+
+INPUT = "dataset_stage1_reconstructed.csv"
+# The cleaned catalog imputation reads: one SI value column per property
+OUTPUT = "dataset_cleaned_final.csv"
+
+TEXT_COLS = ["GUID", "Material Name", "Categories"]
+PREFIX = "Descriptive Properties - "
+COMMENT = " (Comment)"
+
+# Text-only properties left out of the catalog
+DROP_PROPS = ["Acid Class, SR", "Alkali Class, AR", "Color", "Component Elements Properties", "Other"]
+# Properties with at least this share of cells holding no number are left out
+BLANK_THRESHOLD = 0.95
+
+# SI unit a property is measured in. Misaligned sheets put other quantities in
+# a column, often more of them than the right one (Refractive Index holds more
+# W/m-K cells than plain numbers), so cells in any other unit are dropped.
+# Properties not listed keep their most common unit.
+PROPERTY_UNITS = {
+    "Density": "kg/m³",
+    "Modulus of Elasticity": "Pa",
+    "Shear Modulus": "Pa",
+    "Poissons Ratio": "1",
+    "Volume Resistivity": "ohm-m",
+    "Dielectric Constant": "1",
+    "Dielectric Loss Index": "1",
+    "CTE, linear": "1/K",
+    "Thermal Conductivity": "W/m-K",
+    "Transformation Temperature, Tg": "K",
+    "Softening Point": "K",
+    "Working Point": "K",
+    "Annealing Point": "K",
+    "Maximum Service Temperature, Air": "K",
+    "tk100(°C)": "K",
+    "Classification Temperature (°C)": "K",
+    "Refractive Index": "1",
+    "UV Transmittance": "%",
+    "CaO+MgO": "%",
+    "SiO2": "%",
+}
+
+BTU_IN_HR_FT2_F = 0.1442279     # W/m-K
+KSI = 6.894757e6                # Pa
+
+# Scraped unit -> (canonical SI unit, scale, offset): si = value * scale + offset.
+# Units are as extract_material_properties leaves them: its clean_value()
+# strips "µm/m" / "µin/in", so CTE arrives as "-°C" / "-°F".
+UNITS = {
+    "": ("1", 1.0, 0.0),
+    "%": ("%", 1.0, 0.0),
+    "ppm": ("ppm", 1.0, 0.0),
+    # density
+    "g/cc": ("kg/m³", 1e3, 0.0),
+    "g/cm³": ("kg/m³", 1e3, 0.0),
+    "lb/in³": ("kg/m³", 27679.9047, 0.0),
+    "g/l": ("kg/m³", 1.0, 0.0),
+    # temperature
+    "°C": ("K", 1.0, 273.15),
+    "°F": ("K", 5.0 / 9.0, 273.15 - 32.0 * 5.0 / 9.0),
+    "K": ("K", 1.0, 0.0),
+    # stress / pressure
+    "Pa": ("Pa", 1.0, 0.0),
+    "kPa": ("Pa", 1e3, 0.0),
+    "MPa": ("Pa", 1e6, 0.0),
+    "GPa": ("Pa", 1e9, 0.0),
+    "psi": ("Pa", 6894.757, 0.0),
+    "ksi": ("Pa", KSI, 0.0),
+    "msi": ("Pa", KSI * 1e3, 0.0),
+    "bar": ("Pa", 1e5, 0.0),
+    "torr": ("Pa", 133.322, 0.0),
+    # fracture toughness
+    "MPa-m½": ("Pa-m½", 1e6, 0.0),
+    "ksi-in½": ("Pa-m½", KSI * 0.0254 ** 0.5, 0.0),
+    # thermal
+    "W/m-K": ("W/m-K", 1.0, 0.0),
+    "BTU-in/hr-ft²-°F": ("W/m-K", BTU_IN_HR_FT2_F, 0.0),
+    "-°C": ("1/K", 1e-6, 0.0),
+    "-°F": ("1/K", 1.8e-6, 0.0),
+    "J/g-°C": ("J/kg-K", 1e3, 0.0),
+    "BTU/lb-°F": ("J/kg-K", 4186.8, 0.0),
+    "J/g": ("J/kg", 1e3, 0.0),
+    "BTU/lb": ("J/kg", 2326.0, 0.0),
+    "kJ/mol": ("J/mol", 1e3, 0.0),
+    # electrical
+    "ohm-cm": ("ohm-m", 1e-2, 0.0),
+    "kV/mm": ("V/m", 1e6, 0.0),
+    "kV/in": ("V/m", 1e3 / 0.0254, 0.0),
+    "V": ("V", 1.0, 0.0),
+    "eV": ("J", 1.602176634e-19, 0.0),
+    # length
+    "m": ("m", 1.0, 0.0),
+    "mm": ("m", 1e-3, 0.0),
+    "µm": ("m", 1e-6, 0.0),
+    "microns": ("m", 1e-6, 0.0),
+    "nm": ("m", 1e-9, 0.0),
+    "Å": ("m", 1e-10, 0.0),
+    "in": ("m", 0.0254, 0.0),
+    "mil": ("m", 2.54e-5, 0.0),
+    # other
+    "m²/g": ("m²/kg", 1e3, 0.0),
+    "g/m2": ("kg/m²", 1e-3, 0.0),
+    "g/m²": ("kg/m²", 1e-3, 0.0),
+    "g/m": ("kg/m", 1e-3, 0.0),
+    "tex": ("kg/m", 1e-6, 0.0),
+    "dtex": ("kg/m", 1e-7, 0.0),
+    "barns/atom": ("m²", 1e-28, 0.0),
+    "cm³/mol": ("m³/mol", 1e-6, 0.0),
+    "g/A/h": ("kg/C", 1e-3 / 3600.0, 0.0),
+    "emu/g": ("A-m²/kg", 1.0, 0.0),
+    "dynes/cm": ("N/m", 1e-3, 0.0),
+    "ft-lb": ("J", 1.3558179483, 0.0),
+    "ohm": ("ohm", 1.0, 0.0),
+    # sieve mesh number: a count with no SI equivalent, kept under its own unit
+    "Mesh": ("mesh", 1.0, 0.0),
+    "g/mol": ("kg/mol", 1e-3, 0.0),
+    "cP": ("Pa-s", 1e-3, 0.0),
+    "kN/m": ("N/m", 1e3, 0.0),
+    "pli": ("N/m", 175.126835, 0.0),
+    "sec": ("s", 1.0, 0.0),
+    "min": ("s", 60.0, 0.0),
+    "h": ("s", 3600.0, 0.0),
+    "hour": ("s", 3600.0, 0.0),
+    "Month": ("s", 2629746.0, 0.0),
+    "Hz": ("Hz", 1.0, 0.0),
+    "kg": ("kg", 1.0, 0.0),
+    "lb": ("kg", 0.45359237, 0.0),
+}
+
+NUM = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+# "<=2.23 - 2.40g/cc@Temperature 25.0 °C" -> qualifier, value, upper, unit, condition
+CELL = re.compile(rf"^\s*(?P<qualifier>[<>=~≤≥]*)\s*(?P<value>{NUM})(?:\s*-\s*(?P<upper>{NUM}))?"
+                  rf"\s*(?P<unit>[^@]*?)\s*(?P<condition>@.*)?$")
+# one condition term: "Temperature 23.0 °C", "Thickness 1.00 mm"
+TERM = re.compile(rf"^(?P<key>.*?)[\s:#-]*(?P<value>{NUM})(?:\s*-\s*{NUM})?\s*(?P<unit>.*)$")
+
+
+def unit_table(units):
+    """SI unit, scale and offset arrays for an array of distinct unit strings (NaN scale when unknown)."""
+    rows = [UNITS.get(u.strip() if isinstance(u, str) else "", (None, np.nan, np.nan)) for u in units]
+    return ([r[0] for r in rows],
+            np.array([r[1] for r in rows], dtype=float),
+            np.array([r[2] for r in rows], dtype=float))
+
+
+def parse_cells(values):
+    """Split cells into value, upper (for "a - b" ranges), unit and condition; non-numeric cells are NaN."""
+    parts = pd.Series(values, dtype=object).str.extract(CELL)
+    return pd.DataFrame({
+        "value": pd.to_numeric(parts["value"], errors="coerce").values,
+        "upper": pd.to_numeric(parts["upper"], errors="coerce").values,
+        "unit": parts["unit"].fillna("").values,
+        "condition": parts["condition"].values,
+    })
+
+
+def to_si(parsed):
+    """
+    SI value, upper bound and unit of parsed cells. The unit table is looked up
+    once per distinct unit string and applied to all cells with a take.
+    """
+    codes, uniques = pd.factorize(parsed["unit"])
+    si_units, scale, offset = unit_table(uniques)
+    s = scale[codes] if len(uniques) else np.full(len(codes), np.nan)
+    o = offset[codes] if len(uniques) else np.full(len(codes), np.nan)
+    known = ~np.isnan(s) & ~np.isnan(parsed["value"].values)
+    unit = np.array(si_units + [None], dtype=object)[np.where(known, codes, len(si_units))]
+    return {
+        "value": np.where(known, parsed["value"].values * s + o, np.nan),
+        "upper": np.where(known, parsed["upper"].values * s + o, np.nan),
+        "unit": unit,
+    }
+
+
+def parse_condition(text):
+    """'@Temperature 23.0 °C,Time 60 sec' -> {'Temperature [K]': 296.15, 'Time [s]': 60.0}"""
+    out = {}
+    if not isinstance(text, str):
+        return out
+    for term in text.lstrip("@").split(","):
+        m = TERM.match(term.strip())
+        if not m:
+            continue
+        key = m.group("key").strip(" :#-") or "Value"
+        si_unit, scale, offset = UNITS.get(m.group("unit").strip(), (None, np.nan, np.nan))
+        if si_unit is None:
+            continue
+        out[f"{key} [{si_unit}]" if si_unit else key] = float(m.group("value")) * scale + offset
+    return out
+
+
+def condition_columns(conditions):
+    """Typed condition columns, each distinct condition string parsed once."""
+    codes, uniques = pd.factorize(pd.Series(conditions, dtype=object))
+    parsed = [parse_condition(u) for u in uniques]
+    keys = list(dict.fromkeys(k for p in parsed for k in p))
+    cols = {}
+    for k in keys:
+        table = np.array([p.get(k, np.nan) for p in parsed] + [np.nan])
+        cols[k] = table[np.where(codes >= 0, codes, len(parsed))]
+    return cols
+
+
+def typed_property(metric, unit=None):
+    """
+    One property as SI columns. Cells whose SI unit is not unit (default: the
+    most common one) are dropped and counted in "off_unit", so a column holds
+    one quantity.
+    """
+    parsed = parse_cells(metric)
+    si = to_si(parsed)
+    # numbers whose unit is not in UNITS (reported, never guessed)
+    unknown = parsed["unit"].values[~np.isnan(parsed["value"].values) & pd.isna(si["unit"])]
+    known = pd.notna(si["unit"])
+    if unit is None and known.any():
+        unit = pd.Series(si["unit"][known]).value_counts().index[0]
+    keep = known & (si["unit"] == unit)
+    si = {k: np.where(keep, v, np.nan if k != "unit" else None) for k, v in si.items()}
+    si["condition"] = np.where(keep, parsed["condition"].values.astype(object), None)
+    si["si_unit"] = unit
+    si["numbers"] = int((~np.isnan(parsed["value"].values)).sum())
+    si["off_unit"] = int((known & ~keep).sum())
+    si["unknown_units"] = unknown
+    return si
+
+
+def typed_frame(df, conditions=True):
+    """
+    The reconstructed scrape as typed columns: per property "<name>" (SI
+    value, the lower bound of a range), "<name> (Max)" for ranges, and with
+    conditions "<name> (Condition)" plus one numeric column per condition
+    term, e.g. "<name> @Temperature [K]". Text-only, mostly empty and
+    (Comment) columns are dropped; stats["units"] holds each property's SI unit.
+    """
+    out = {c: df[c].values for c in TEXT_COLS if c in df.columns}
+    stats = {"converted": 0, "off_unit": 0, "units": {}, "unknown_units": {}}
+    props = [c for c in df.columns if c.startswith(PREFIX) and not c.endswith(COMMENT)
+             and c[len(PREFIX):] not in DROP_PROPS]
+    for col in props:
+        name = col[len(PREFIX):]
+        si = typed_property(df[col].values, PROPERTY_UNITS.get(name))
+        for u in si["unknown_units"]:
+            stats["unknown_units"][u] = stats["unknown_units"].get(u, 0) + 1
+        has = ~np.isnan(si["value"])
+        if si["numbers"] <= (1 - BLANK_THRESHOLD) * len(df) or not has.any():
+            continue
+        out[name] = si["value"]
+        if not np.isnan(si["upper"]).all():
+            out[f"{name} (Max)"] = si["upper"]
+        if conditions and pd.notna(si["condition"]).any():
+            out[f"{name} (Condition)"] = si["condition"]
+            for key, values in condition_columns(si["condition"]).items():
+                out[f"{name} @{key}"] = values
+        stats["converted"] += int(has.sum())
+        stats["off_unit"] += si["off_unit"]
+        stats["units"][name] = si["si_unit"]
+    return pd.DataFrame(out), stats
+
+
+def catalog_frame(typed, units):
+    """Text columns and one SI value column per property, under the scraped column names."""
+    cols = [c for c in TEXT_COLS if c in typed.columns]
+    return typed[cols + list(units)].rename(columns={name: PREFIX + name for name in units})
+
+
+if __name__ == "__main__":
+    stage = start_span("units")
+    df = pd.read_csv(INPUT, dtype=str, keep_default_na=False, na_values=[""])
+    frame(stage, df, "in")
+    typed, stats = typed_frame(df, conditions=False)
+    catalog = catalog_frame(typed, stats["units"])
+    catalog.to_csv(OUTPUT, index=False)
+    frame(stage, catalog, "out")
+    annotate(stage, converted=stats["converted"], off_unit=stats["off_unit"], units=stats["units"])
+    end_span(stage)
+    top = sorted(stats["unknown_units"].items(), key=lambda kv: -kv[1])[:5]
+    log(f"Saved {OUTPUT}: {stats['converted']} SI values in {len(stats['units'])} properties, "
+        f"{stats['off_unit']} cells in another unit dropped; unknown units: {top}")
@@ -6,6 +6,8 @@ import random
 import os
 from concurrent.futures import ThreadPoolExecutor
 
+from src.pipeline.telemetry import count, log, observe, span
+
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept-Language': 'en-US,en;q=0.9',
@@ -22,6 +24,22 @@ SEARCH_SEGMENTS = [chr(i) for i in range(ord('a'), ord('z') + 1)] + [str(i) for
 GUIDS_FILE = 'matweb_guids_checkpoint.csv'
 
 
+def timed_request(method, url, **kwargs):
+    """SESSION.get/post with latency, size and error counts recorded."""
+    started = time.perf_counter()
+    try:
+        response = SESSION.request(method, url, **kwargs)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        observe("guids_request_seconds", time.perf_counter() - started, method=method)
+        count("guids_requests", method=method, status="error")
+        raise
+    observe("guids_request_seconds", time.perf_counter() - started, method=method)
+    count("guids_requests", method=method, status="ok")
+    count("guids_bytes", len(response.content))
+    return response
+
+
 def extract_asp_net_state(soup):
     view_state_tag = soup.find('input', {'name': '__VIEWSTATE'})
     view_state_gen_tag = soup.find('input', {'name': '__VIEWSTATEGENERATOR'})
@@ -60,23 +78,22 @@ def scrape_guids_via_segment(search_term):
     page = 1
     
     initial_delay = random.uniform(0, 10)
-    print(f"[THREAD-{search_term.upper()}] Initializing. Waiting {initial_delay:.2f}s before GET...")
+    log(f"[THREAD-{search_term.upper()}] Initializing. Waiting {initial_delay:.2f}s before GET...")
     time.sleep(initial_delay)
     
     initial_search_url = f"{SEARCH_URL}?SearchText={search_term}"
-    print(f"[THREAD-{search_term.upper()}] Step 1: Submitting initial GET search...")
+    log(f"[THREAD-{search_term.upper()}] Step 1: Submitting initial GET search...")
     
     try:
-        response = SESSION.get(initial_search_url, timeout=15)
-        response.raise_for_status()
+        response = timed_request("GET", initial_search_url, timeout=15)
         current_soup = BeautifulSoup(response.content, 'html.parser')
     except requests.exceptions.RequestException as e:
-        print(f"[THREAD-{search_term.upper()}] Error submitting initial GET: {e}. Stopping segment.")
+        log(f"[THREAD-{search_term.upper()}] Error submitting initial GET: {e}. Stopping segment.")
         return all_guids # Return empty set if initial search fails
 
     # --- Step 2: Loop through pages using subsequent POSTs ---
     while True:
-        print(f"[THREAD-{search_term.upper()}] Scraping page {page}")
+        log(f"[THREAD-{search_term.upper()}] Scraping page {page}")
 
         # Extract GUIDs from the current page
         for link in current_soup.find_all('a', href=True):
@@ -92,16 +109,17 @@ def scrape_guids_via_segment(search_term):
         try:
             next_link_tag = current_soup.find('a', id='ctl00_ContentMain_ucSearchResults1_lnkNextPage')
             if not next_link_tag:
-                print(f"[THREAD-{search_term.upper()}] Last page reached. Stopping segment.")
+                log(f"[THREAD-{search_term.upper()}] Last page reached. Stopping segment.")
                 break
             
             view_state, view_state_gen = extract_asp_net_state(current_soup)
             
         except ConnectionRefusedError:
-            print(f"[THREAD-{search_term.upper()}] !!! IP Block Detected. Halting thread !!!")
+            count("guids_ban_events")
+            log(f"[THREAD-{search_term.upper()}] !!! IP Block Detected. Halting thread !!!")
             break
         except Exception as e:
-            print(f"[THREAD-{search_term.upper()}] Failed to extract state: {e}. Halting thread.")
+            log(f"[THREAD-{search_term.upper()}] Failed to extract state: {e}. Halting thread.")
             break
             
         # --- Step 3: Prepare and send the 'Next Page' POST request ---
@@ -110,19 +128,18 @@ def scrape_guids_via_segment(search_term):
 
         # MANDATORY DELAY for navigation (Phase 1: Moderate Speed)
         wait_time = random.uniform(3, 7)
-        print(f"[THREAD-{search_term.upper()}] POSTing for page {page}. Waiting {wait_time:.2f}s...")
+        log(f"[THREAD-{search_term.upper()}] POSTing for page {page}. Waiting {wait_time:.2f}s...")
         time.sleep(wait_time) 
 
         try:
-            post_response = SESSION.post(SEARCH_URL, data=payload, timeout=20)
-            post_response.raise_for_status()
+            post_response = timed_request("POST", SEARCH_URL, data=payload, timeout=20)
             current_soup = BeautifulSoup(post_response.content, 'html.parser')
             
         except requests.exceptions.RequestException as e:
-            print(f"[THREAD-{search_term.upper()}] POST Error: {e}. Stopping segment.")
+            log(f"[THREAD-{search_term.upper()}] POST Error: {e}. Stopping segment.")
             break
             
-    print(f"[THREAD-{search_term.upper()}] Finished. GUIDs collected: {len(all_guids)}")
+    log(f"[THREAD-{search_term.upper()}] Finished. GUIDs collected: {len(all_guids)}")
     return all_guids
 
 # --- Main Concurrent Execution ---
@@ -131,10 +148,10 @@ def concurrent_guid_collector():
     """Manages the ThreadPoolExecutor to run searches concurrently."""
     final_guids = set()
     
-    print("="*50)
-    print(f"Starting concurrent GUID collection with {MAX_WORKERS} workers...")
-    print(f"Total Segments to search: {len(SEARCH_SEGMENTS)}")
-    print("="*50)
+    log("="*50)
+    log(f"Starting concurrent GUID collection with {MAX_WORKERS} workers...")
+    log(f"Total Segments to search: {len(SEARCH_SEGMENTS)}")
+    log("="*50)
     
     # Use ThreadPoolExecutor to manage parallel scraping
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
@@ -150,19 +167,20 @@ def concurrent_guid_collector():
                 guid_set = future.result()
                 if guid_set:
                     final_guids.update(guid_set)
-                    print(f"*** Segment {segment.upper()} complete. Total GUIDs now: {len(final_guids)}")
+                    log(f"*** Segment {segment.upper()} complete. Total GUIDs now: {len(final_guids)}")
             except Exception as exc:
-                print(f"Segment {segment.upper()} generated an exception: {exc}")
+                log(f"Segment {segment.upper()} generated an exception: {exc}")
 
     # Save final checkpoint
     pd.Series(list(final_guids)).to_csv(GUIDS_FILE, index=False, header=['GUID'])
-    print("\n" + "="*50)
-    print(f"CONCURRENT COLLECTION COMPLETE. Total UNIQUE GUIDs saved: {len(final_guids)}")
-    print("Next: Use this list for the slow, detailed data scrape (Phase 2).")
-    print("="*50)
+    log("\n" + "="*50)
+    log(f"CONCURRENT COLLECTION COMPLETE. Total UNIQUE GUIDs saved: {len(final_guids)}")
+    log("Next: Use this list for the slow, detailed data scrape (Phase 2).")
+    log("="*50)
     
     return list(final_guids)
 
 # --- Execution ---
 if __name__ == "__main__":
-    concurrent_guid_collector()
\ No newline at end of file
+    with span("guids"):
+        concurrent_guid_collector()
\ No newline at end of file
@@ -1,10 +1,11 @@
 import pandas as pd
 
+from src.pipeline.chunked import CHUNKSIZE, map_csv
+from src.pipeline.telemetry import annotate, end_span, frame, log, start_span
+
 INPUT = "materials_env_enriched.csv"
 OUTPUT = "materials_final_with_price.csv"
 
-df = pd.read_csv(INPUT)
-
 PRICE_TABLE = {
     "Aluminum": 250,
     "Steel": 80,
@@ -66,19 +67,31 @@ def compute_price(cat_string):
 
     return sum(price_values)
 
-# 3. Apply price computation
-df["Cost_INR_per_kg"] = df["Categories"].apply(compute_price)
+def add_prices(df):
+    """Row-local, so it runs on the full table or one chunk at a time."""
+    # 3. Apply price computation
+    df["Cost_INR_per_kg"] = df["Categories"].apply(compute_price)
+
+    # 4. Derived metrics
+    if "Elastic Modulus" in df.columns:
+        df["Cost_per_Stiffness"] = df["Cost_INR_per_kg"] / df["Elastic Modulus"]
 
-# 4. Derived metrics
-if "Elastic Modulus" in df.columns:
-    df["Cost_per_Stiffness"] = df["Cost_INR_per_kg"] / df["Elastic Modulus"]
+    if "UTS" in df.columns:
+        df["Cost_per_Strength"] = df["Cost_INR_per_kg"] / df["UTS"]
 
-if "UTS" in df.columns:
-    df["Cost_per_Strength"] = df["Cost_INR_per_kg"] / df["UTS"]
+    if "CO2_kg_per_kg" in df.columns:
+        df["Cost_per_CO2"] = df["Cost_INR_per_kg"] / df["CO2_kg_per_kg"]
+    return df
 
-if "CO2_kg_per_kg" in df.columns:
-    df["Cost_per_CO2"] = df["Cost_INR_per_kg"] / df["CO2_kg_per_kg"]
 
-# 5. Save final dataset
-df.to_csv(OUTPUT, index=False)
-print("Price enrichment complete →", OUTPUT)
\ No newline at end of file
+if __name__ == "__main__":
+    # 5. Save final dataset
+    stage = start_span("cost", chunksize=CHUNKSIZE)
+    if CHUNKSIZE:
+        annotate(stage, rows_out=map_csv(INPUT, OUTPUT, add_prices, CHUNKSIZE))
+    else:
+        df = add_prices(pd.read_csv(INPUT))
+        df.to_csv(OUTPUT, index=False)
+        frame(stage, df, "out")
+    end_span(stage)
+    log(f"Price enrichment complete → {OUTPUT}")
\ No newline at end of file
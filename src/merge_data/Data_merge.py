@@ -5,17 +5,21 @@ import numpy as np
 import os
 import re
 
+from src.pipeline.telemetry import annotate, end_span, frame, log, start_span
+
 INPUT = "Data.csv"
 OUTPUT = "materials_enriched.csv"
 
 if not os.path.exists(INPUT):
     raise SystemExit(f"Input file not found: {INPUT} (put this script in same folder as your Data.csv)")
 
+stage = start_span("merge_reference")
 df = pd.read_csv(INPUT)
+frame(stage, df, "in")
 
 # Show initial info
-print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}")
-print("Columns:", df.columns.tolist())
+log(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}")
+log(f"Columns: {df.columns.tolist()}")
 
 # Columns we expect to coerce to numeric
 numeric_cols = ["Su","Sy","A5","Bhn","E","G","mu","Ro","HV"]
@@ -67,10 +71,14 @@ df['Eco_Index'] = df.apply(lambda r: ((1.0/r['CO2_per_kg_est'])*r['Strength_to_W
 
 # Save enriched file
 df.to_csv(OUTPUT, index=False)
-print(f"Enriched dataset saved to {OUTPUT} (rows: {df.shape[0]}, cols: {df.shape[1]})")
+frame(stage, df, "out")
+annotate(stage, cost_estimates=int(df['Cost_per_kg_est'].notna().sum()),
+         co2_estimates=int(df['CO2_per_kg_est'].notna().sum()))
+end_span(stage)
+log(f"Enriched dataset saved to {OUTPUT} (rows: {df.shape[0]}, cols: {df.shape[1]})")
 
 # Print quick diagnostics
-print("\nMissing value counts (top 10):")
-print(df.isnull().sum().sort_values(ascending=False).head(20))
-print("\nSample rows with filled estimates:")
-print(df.loc[df['Cost_per_kg_est'].notnull(), ['Material','Cost_per_kg_est','CO2_per_kg_est']].head(10).to_string(index=False))
\ No newline at end of file
+log("\nMissing value counts (top 10):")
+log(df.isnull().sum().sort_values(ascending=False).head(20).to_string())
+log("\nSample rows with filled estimates:")
+log(df.loc[df['Cost_per_kg_est'].notnull(), ['Material','Cost_per_kg_est','CO2_per_kg_est']].head(10).to_string(index=False))
\ No newline at end of file
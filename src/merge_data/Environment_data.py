@@ -3,23 +3,21 @@ import numpy as np
 import re
 from pathlib import Path
 
+from src.pipeline.chunked import CHUNKSIZE, map_csv
+from src.pipeline.telemetry import annotate, end_span, frame, log, start_span
+
 INP = Path("dataset_final_imputed.csv")
 OUT = Path("materials_env_enriched.csv")
 
-# 1. LOAD
-df = pd.read_csv(INP)
-for bad in ["Unnamed: 0", "index"]:
-    if bad in df.columns:
-        df = df.drop(columns=[bad])
-
-# 2. BASIC NORMALIZATION
-# Ensure 'Material Name' exists
-if "Material Name" not in df.columns:
-    raise ValueError("Expected 'Material Name' column not found.")
-
-# Make sure we have a Categories column; if not, create an empty one
-if "Categories" not in df.columns:
-    df["Categories"] = ""
+NUMERIC_COLS = [
+    "Density",
+    "UTS", "Elastic Modulus", "Shear Modulus", "Poisson Ratio",
+    "Thermal Conductivity", "Dielectric Constant", "Dielectric Loss Index",
+    "CTE (Linear)", "Glass Transition Temperature", "Softening Point",
+    "Working Point", "Annealing Point",
+    "Refractive Index", "UV Transmittance",
+    "Cost_USD_per_kg"
+]
 
 # Clean up obvious non-numeric artifacts if any remain
 def to_float_or_nan(x):
@@ -35,18 +33,6 @@ def extract_first_number(s):
     m = re.search(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", s)
     return float(m.group(0)) if m else np.nan
 
-for col in [
-    "Density",
-    "UTS", "Elastic Modulus", "Shear Modulus", "Poisson Ratio",
-    "Thermal Conductivity", "Dielectric Constant", "Dielectric Loss Index",
-    "CTE (Linear)", "Glass Transition Temperature", "Softening Point",
-    "Working Point", "Annealing Point",
-    "Refractive Index", "UV Transmittance",
-    "Cost_USD_per_kg"
-]:
-    if col in df.columns:
-        df[col] = df[col].apply(extract_first_number)
-
 # 3. BUILD CATEGORY MAPPINGS
 def canon_cat(token: str) -> str:
     t = token.strip().lower()
@@ -167,10 +153,6 @@ def weighted_env_from_categories(cat_str: str):
     rec = sum(v*w for v, w in zip(rec_vals, wts)) / sw
     return co2, rec
 
-env = df["Categories"].apply(weighted_env_from_categories)
-df["CO2_kg_per_kg"] = [x[0] for x in env]
-df["Recyclability_pct"] = [x[1] for x in env]
-
 # 6. DERIVED METRICS
 def safe_div(a, b):
     try:
@@ -182,34 +164,88 @@ def safe_div(a, b):
     except Exception:
         return np.nan
 
-# Compute derived metrics only if inputs exist
-if "UTS" in df.columns and "Density" in df.columns:
-    df["Strength_to_Weight"] = df.apply(lambda r: safe_div(r.get("UTS"), r.get("Density")), axis=1)
-
-if "Elastic Modulus" in df.columns and "Density" in df.columns:
-    df["Specific_Stiffness"] = df.apply(lambda r: safe_div(r.get("Elastic Modulus"), r.get("Density")), axis=1)
-
-if "Elastic Modulus" in df.columns and "Cost_USD_per_kg" in df.columns:
-    df["Stiffness_to_Cost"] = df.apply(lambda r: safe_div(r.get("Elastic Modulus"), r.get("Cost_USD_per_kg")), axis=1)
-
-# Eco Index = (Strength_to_Weight * recyclability) / CO2
-if "Strength_to_Weight" in df.columns:
-    df["Eco_Index"] = (df["Strength_to_Weight"] * (df["Recyclability_pct"] / 100.0)) / df["CO2_kg_per_kg"]
-
-# 7. SAVE
-df.to_csv(OUT, index=False)
-print(f"Wrote: {OUT}")
-
-# 8. QUICK REPORT
-have_cost = "Cost_USD_per_kg" in df.columns and df["Cost_USD_per_kg"].notna().sum()
-print(f"Rows: {len(df)}")
-print(f"Non-null CO2 entries: {df['CO2_kg_per_kg'].notna().sum()}")
-print(f"Non-null Recyclability entries: {df['Recyclability_pct'].notna().sum()}")
-if "Strength_to_Weight" in df.columns:
-    print(f"Non-null Strength_to_Weight: {df['Strength_to_Weight'].notna().sum()}")
-if "Specific_Stiffness" in df.columns:
-    print(f"Non-null Specific_Stiffness: {df['Specific_Stiffness'].notna().sum()}")
-if "Eco_Index" in df.columns:
-    print(f"Non-null Eco_Index: {df['Eco_Index'].notna().sum()}")
-if have_cost:
-    print(f"Rows with Cost_USD_per_kg: {have_cost}")
\ No newline at end of file
+def enrich(df):
+    """Every step is row-local, so this works on the full table or on one chunk."""
+    # 1. LOAD
+    for bad in ["Unnamed: 0", "index"]:
+        if bad in df.columns:
+            df = df.drop(columns=[bad])
+
+    # 2. BASIC NORMALIZATION
+    # Ensure 'Material Name' exists
+    if "Material Name" not in df.columns:
+        raise ValueError("Expected 'Material Name' column not found.")
+
+    # Make sure we have a Categories column; if not, create an empty one
+    if "Categories" not in df.columns:
+        df["Categories"] = ""
+
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = df[col].apply(extract_first_number)
+
+    env = df["Categories"].apply(weighted_env_from_categories)
+    df["CO2_kg_per_kg"] = [x[0] for x in env]
+    df["Recyclability_pct"] = [x[1] for x in env]
+
+    # Compute derived metrics only if inputs exist
+    if "UTS" in df.columns and "Density" in df.columns:
+        df["Strength_to_Weight"] = df.apply(lambda r: safe_div(r.get("UTS"), r.get("Density")), axis=1)
+
+    if "Elastic Modulus" in df.columns and "Density" in df.columns:
+        df["Specific_Stiffness"] = df.apply(lambda r: safe_div(r.get("Elastic Modulus"), r.get("Density")), axis=1)
+
+    if "Elastic Modulus" in df.columns and "Cost_USD_per_kg" in df.columns:
+        df["Stiffness_to_Cost"] = df.apply(lambda r: safe_div(r.get("Elastic Modulus"), r.get("Cost_USD_per_kg")), axis=1)
+
+    # Eco Index = (Strength_to_Weight * recyclability) / CO2
+    if "Strength_to_Weight" in df.columns:
+        df["Eco_Index"] = (df["Strength_to_Weight"] * (df["Recyclability_pct"] / 100.0)) / df["CO2_kg_per_kg"]
+    return df
+
+
+REPORT_COLS = ["CO2_kg_per_kg", "Recyclability_pct", "Strength_to_Weight", "Specific_Stiffness", "Eco_Index", "Cost_USD_per_kg"]
+
+
+def report_counts(df):
+    counts = {"Rows": len(df)}
+    for col in REPORT_COLS:
+        if col in df.columns:
+            counts[col] = int(df[col].notna().sum())
+    return counts
+
+
+if __name__ == "__main__":
+    # 7. SAVE
+    stage = start_span("environment", chunksize=CHUNKSIZE)
+    if CHUNKSIZE:
+        counts = {}
+
+        def enrich_chunk(chunk):
+            out = enrich(chunk)
+            for k, v in report_counts(out).items():
+                counts[k] = counts.get(k, 0) + v
+            return out
+
+        map_csv(INP, OUT, enrich_chunk, CHUNKSIZE)
+    else:
+        df = enrich(pd.read_csv(INP))
+        df.to_csv(OUT, index=False)
+        counts = report_counts(df)
+        frame(stage, df, "out")
+    annotate(stage, rows_out=counts["Rows"], non_null=counts)
+    end_span(stage)
+    log(f"Wrote: {OUT}")
+
+    # 8. QUICK REPORT
+    log(f"Rows: {counts['Rows']}")
+    log(f"Non-null CO2 entries: {counts.get('CO2_kg_per_kg', 0)}")
+    log(f"Non-null Recyclability entries: {counts.get('Recyclability_pct', 0)}")
+    if "Strength_to_Weight" in counts:
+        log(f"Non-null Strength_to_Weight: {counts['Strength_to_Weight']}")
+    if "Specific_Stiffness" in counts:
+        log(f"Non-null Specific_Stiffness: {counts['Specific_Stiffness']}")
+    if "Eco_Index" in counts:
+        log(f"Non-null Eco_Index: {counts['Eco_Index']}")
+    if counts.get("Cost_USD_per_kg"):
+        log(f"Rows with Cost_USD_per_kg: {counts['Cost_USD_per_kg']}")
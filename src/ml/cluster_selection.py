@@ -0,0 +1,152 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+K_RANGE = range(2, 9)
+RANDOM_STATE = 42
+
+# Above this many rows silhouette is estimated on a fixed random sample
+EXACT_MAX_ROWS = 4000
+SAMPLE_SIZE = 2000
+
+# Above this many rows the sweep switches to MiniBatchKMeans
+MINIBATCH_MIN_ROWS = 50000
+
+# Process start-up outweighs the fits on small catalogs, so the sweep only
+# fans out across processes above this many rows
+PARALLEL_MIN_ROWS = 20000
+MAX_WORKERS = 4
+
+
+def _fit_one(X, k, minibatch, random_state):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    t0 = time.perf_counter()
+    if minibatch:
+        km = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init="auto", batch_size=4096)
+    else:
+        km = KMeans(n_clusters=k, random_state=random_state, n_init="auto")
+    labels = km.fit_predict(X)
+    return k, labels, km.cluster_centers_, time.perf_counter() - t0
+
+
+def _silhouette_from_distances(D, labels):
+    # Per-cluster distance sums for every row in one matrix product instead of
+    # a Python loop over clusters.
+    ks, inv = np.unique(labels, return_inverse=True)
+    if len(ks) < 2:
+        return -1.0
+    onehot = np.zeros((len(labels), len(ks)))
+    onehot[np.arange(len(labels)), inv] = 1.0
+    sums = D @ onehot
+    counts = onehot.sum(axis=0)
+
+    own = inv
+    own_count = counts[own] - 1
+    a = np.where(own_count > 0, sums[np.arange(len(labels)), own] / np.maximum(own_count, 1), 0.0)
+    mean_other = sums / counts
+    mean_other[np.arange(len(labels)), own] = np.inf
+    b = mean_other.min(axis=1)
+    s = np.where(own_count > 0, (b - a) / np.maximum(np.maximum(a, b), 1e-12), 0.0)
+    return float(s.mean())
+
+
+def simplified_silhouette(X, labels, centers):
+    """Silhouette with centroid distances in place of mean pairwise distances, O(n k)."""
+    d = np.linalg.norm(X[:, None, :] - centers[None, :, :], axis=2)
+    a = d[np.arange(len(X)), labels]
+    d[np.arange(len(X)), labels] = np.inf
+    b = d.min(axis=1)
+    return float(np.mean((b - a) / np.maximum(np.maximum(a, b), 1e-12)))
+
+
+def select_k(X, k_range=K_RANGE, metric="silhouette", minibatch=None, sample_size=None,
+             n_jobs=None, random_state=RANDOM_STATE):
+    """
+    Fit KMeans for every k in k_range and pick the best one.
+    metric is "silhouette" (exact on <= EXACT_MAX_ROWS rows, sampled above),
+    "simplified" (centroid silhouette) or "davies_bouldin" (lower is better).
+    Returns the chosen k, its labels, all scores and per-step timings.
+    """
+    from sklearn.metrics import davies_bouldin_score, pairwise_distances
+
+    X = np.ascontiguousarray(X, dtype=float)
+    n = len(X)
+    ks = [k for k in k_range if 2 <= k < n]
+    if not ks:
+        raise ValueError("Need at least 3 rows and one k >= 2 to select a cluster count.")
+    if minibatch is None:
+        minibatch = n >= MINIBATCH_MIN_ROWS
+    if n_jobs is None:
+        n_jobs = MAX_WORKERS if n >= PARALLEL_MIN_ROWS else 1
+
+    timings = {}
+    t_start = time.perf_counter()
+
+    # 1. Fit every k, in parallel across processes
+    t0 = time.perf_counter()
+    if n_jobs and n_jobs > 1 and len(ks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(ks))) as ex:
+            fits = list(ex.map(_fit_one, [X] * len(ks), ks, [minibatch] * len(ks), [random_state] * len(ks)))
+    else:
+        fits = [_fit_one(X, k, minibatch, random_state) for k in ks]
+    timings["fit_wall"] = time.perf_counter() - t0
+
+    # 2. Distance structure shared by every k
+    sample = None
+    D = None
+    if metric == "silhouette":
+        t0 = time.perf_counter()
+        if sample_size is None and n > EXACT_MAX_ROWS:
+            sample_size = SAMPLE_SIZE
+        if sample_size is not None and sample_size < n:
+            sample = np.random.default_rng(random_state).choice(n, size=sample_size, replace=False)
+        rows = X if sample is None else X[sample]
+        D = pairwise_distances(rows)
+        timings["distances"] = time.perf_counter() - t0
+    elif metric not in ("simplified", "davies_bouldin"):
+        raise ValueError(f"Unknown metric: {metric}")
+
+    # 3. Score
+    scores, per_k = {}, {}
+    for k, labels, centers, fit_s in fits:
+        t0 = time.perf_counter()
+        if metric == "silhouette":
+            scores[k] = _silhouette_from_distances(D, labels if sample is None else labels[sample])
+        elif metric == "simplified":
+            scores[k] = simplified_silhouette(X, labels, centers)
+        else:
+            scores[k] = float(davies_bouldin_score(X, labels))
+        per_k[k] = {"fit": fit_s, "score": time.perf_counter() - t0}
+
+    pick = min if metric == "davies_bouldin" else max
+    best_k = pick(scores, key=scores.get)
+    timings["per_k"] = per_k
+    timings["total"] = time.perf_counter() - t_start
+
+    return {
+        "k": best_k,
+        "score": scores[best_k],
+        "labels": next(labels for k, labels, _, _ in fits if k == best_k),
+        "scores": scores,
+        "metric": metric,
+        "minibatch": minibatch,
+        "sampled_rows": None if sample is None else len(sample),
+        "timings": timings,
+    }
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import RobustScaler
+
+    df = pd.read_csv("materials_final_with_price.csv")
+    num = df.drop(columns=["Material Name", "Categories", "CategoryList"], errors="ignore")
+    num = num.apply(pd.to_numeric, errors="coerce").dropna(axis=1, how="all")
+    X_scaled = RobustScaler().fit_transform(SimpleImputer(strategy="median").fit_transform(num))
+
+    result = select_k(X_scaled)
+    print(f"Best k: {result['k']} {result['metric']}: {result['score']:.4f}")
+    print(f"Total selection time: {result['timings']['total']:.2f}s")
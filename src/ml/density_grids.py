@@ -0,0 +1,336 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.pipeline.store import load_catalog
+from src.pipeline.telemetry import annotate, end_span, log, start_span
+
+INPUT = "materials_final_with_price.csv"
+OUTDIR = "analysis_outputs"
+GRID_CACHE = "grid_cache"
+GRID_VERSION = 1
+BUNDLE_FILE = "model_bundle.npz"    # as in src/ml/model_bundle.py
+
+# Cells per axis; a 128x128 grid draws in constant time whatever the row count
+BINS = 128
+DPI = 200
+# Category labels drawn on a chart (largest categories first)
+MAX_LABELS = 12
+# Flat bin indices held at once; pairs are counted in batches of this many cells
+BATCH_CELLS = 20_000_000
+
+# The notebook's Ashby charts plus the usual selection pairs; pairs whose
+# columns are missing from the catalog are skipped
+ASHBY_PAIRS = [
+    {"x": "Density", "y": "UTS", "file": "ashby_uts_density.png", "title": "Ashby: UTS vs Density"},
+    {"x": "Density", "y": "Elastic Modulus", "file": "ashby_E_density.png",
+     "title": "Ashby: Elastic Modulus vs Density"},
+    {"x": "Density", "y": "Modulus of Elasticity", "file": "ashby_modulus_density.png",
+     "title": "Ashby: Modulus of Elasticity vs Density"},
+    {"x": "Density", "y": "Thermal Conductivity", "file": "ashby_k_density.png",
+     "title": "Ashby: Thermal Conductivity vs Density"},
+    {"x": "Density", "y": "CO2_kg_per_kg", "file": "ashby_co2_density.png", "title": "Ashby: CO2 vs Density"},
+    {"x": "Cost_INR_per_kg", "y": "Modulus of Elasticity", "file": "ashby_modulus_cost.png",
+     "title": "Ashby: Modulus of Elasticity vs Cost"},
+]
+
+# The notebook's PCA scatter, labelled by KMeans cluster (see pca_inputs)
+PCA_PAIRS = [
+    {"x": "PC1", "y": "PC2", "xlog": False, "ylog": False, "file": "pca_2d.png", "title": "PCA (2D) by cluster"},
+]
+
+
+def all_pairs(cols, log=True):
+    """Every unordered pair of columns as plot specs."""
+    return [{"x": a, "y": b, "xlog": log, "ylog": log, "file": f"density_{_slug(a)}__{_slug(b)}.png",
+             "title": f"{b} vs {a}"} for a, b in itertools.combinations(cols, 2)]
+
+
+def _slug(name):
+    return "".join(ch if ch.isalnum() else "_" for ch in name).strip("_").lower()
+
+
+def _spec(pair):
+    return {"xlog": True, "ylog": True, "title": None, **pair}
+
+
+def _axis(values, bins, log):
+    """
+    Bin index of every value (-1 when it cannot be placed: NaN, or <= 0 on a
+    log axis) and the bin edges in data units.
+    """
+    v = np.asarray(values, dtype=float)
+    ok = np.isfinite(v) & (v > 0) if log else np.isfinite(v)
+    if not ok.any():
+        return np.full(len(v), -1, dtype=np.int32), None
+    t = np.log10(np.where(ok, v, 1.0)) if log else np.where(ok, v, 0.0)
+    lo, hi = float(t[ok].min()), float(t[ok].max())
+    if hi == lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    idx = np.minimum(((t - lo) * (bins / (hi - lo))).astype(np.int32), bins - 1)
+    idx[~ok] = -1
+    edges = np.linspace(lo, hi, bins + 1)
+    return idx, (10.0 ** edges if log else edges)
+
+
+def density_grids(X, cols, pairs, bins=BINS, membership=None, group_names=None):
+    """
+    Count grids for many (x, y) column pairs of X at once. Every column is
+    binned once (log10-spaced unless the pair says xlog/ylog=False), then one
+    bincount over (pair, x bin, y bin) fills a whole batch of grids (as many
+    pairs as fit in BATCH_CELLS flat indices). membership is an
+    optional (rows, groups) pair of arrays -- a row may sit in several groups,
+    as with category lists -- and adds per-group grids (pair, group, x, y).
+    """
+    col_index = {c: i for i, c in enumerate(cols)}
+    specs = [_spec(p) for p in pairs if p["x"] in col_index and p["y"] in col_index]
+
+    axes = {}
+    for s in specs:
+        for c, lg in ((s["x"], s["xlog"]), (s["y"], s["ylog"])):
+            if (c, lg) not in axes:
+                axes[(c, lg)] = _axis(X[:, col_index[c]], bins, lg)
+    specs = [s for s in specs if axes[(s["x"], s["xlog"])][1] is not None
+             and axes[(s["y"], s["ylog"])][1] is not None]
+
+    n_pairs, cells = len(specs), bins * bins
+    rows = groups = None
+    if membership is not None:
+        rows, groups = (np.asarray(a, dtype=np.int64) for a in membership)
+        n_groups = len(group_names) if group_names is not None else int(groups.max(initial=-1)) + 1
+        group_counts = np.zeros((n_pairs, n_groups, bins, bins), dtype=np.int32)
+    counts = np.zeros((n_pairs, bins, bins), dtype=np.int64)
+
+    # per pair: one index per row (and per membership), plus the group grids' bincount
+    per_pair = max(X.shape[0], 0 if rows is None else len(rows) + n_groups * cells, 1)
+    step = max(1, BATCH_CELLS // per_pair)
+    for p0 in range(0, n_pairs, step):
+        batch = specs[p0:p0 + step]
+        # cell of every row for each pair in the batch, -1 where either value is unplaced
+        cell = np.empty((len(batch), X.shape[0]), dtype=np.int64)
+        for j, s in enumerate(batch):
+            ix, iy = axes[(s["x"], s["xlog"])][0], axes[(s["y"], s["ylog"])][0]
+            np.add(ix.astype(np.int64) * bins, iy, out=cell[j])
+            cell[j][(ix < 0) | (iy < 0)] = -1
+        pair_of = np.arange(len(batch))[:, None]
+        placed = cell >= 0
+        counts[p0:p0 + len(batch)] = np.bincount(
+            np.broadcast_to(pair_of * cells, cell.shape)[placed] + cell[placed], minlength=len(batch) * cells
+        ).reshape(len(batch), bins, bins)
+        if rows is not None:
+            # (pair, group, cell) for every (row, group) pair whose row is placed
+            g_cell = cell[:, rows]
+            g_placed = g_cell >= 0
+            key = (pair_of * n_groups + groups[None, :]) * cells + g_cell
+            group_counts[p0:p0 + len(batch)] = np.bincount(
+                key[g_placed], minlength=len(batch) * n_groups * cells
+            ).reshape(len(batch), n_groups, bins, bins)
+
+    grids = {
+        "meta": {"version": GRID_VERSION, "bins": bins, "pairs": specs, "groups": None},
+        "counts": counts,
+        "xedges": np.array([axes[(s["x"], s["xlog"])][1] for s in specs]).reshape(n_pairs, bins + 1),
+        "yedges": np.array([axes[(s["y"], s["ylog"])][1] for s in specs]).reshape(n_pairs, bins + 1),
+    }
+    if rows is not None:
+        grids["group_counts"] = group_counts
+        grids["meta"]["groups"] = list(group_names) if group_names is not None else [str(g) for g in range(n_groups)]
+    return grids
+
+
+def _grid_median(counts, edges, axis, log):
+    """Median bin centre of a grid's marginal along axis (NaN for an empty grid)."""
+    marginal = counts.sum(axis=1 - axis)
+    total = marginal.sum()
+    if total == 0:
+        return np.nan
+    b = int(np.searchsorted(np.cumsum(marginal), total / 2.0))
+    lo, hi = edges[b], edges[b + 1]
+    return float(np.sqrt(lo * hi)) if log else float((lo + hi) / 2.0)
+
+
+def group_summary(grids):
+    """
+    Per pair and group: material count and median (x, y), read off the grids
+    rather than the rows, so it costs the same for any catalog size.
+    """
+    out = []
+    if "group_counts" not in grids:
+        return out
+    for p, s in enumerate(grids["meta"]["pairs"]):
+        for g, name in enumerate(grids["meta"]["groups"]):
+            c = grids["group_counts"][p, g]
+            n = int(c.sum())
+            if n == 0:
+                continue
+            out.append({"x": s["x"], "y": s["y"], "group": name, "count": n,
+                        "x_median": _grid_median(c, grids["xedges"][p], 0, s["xlog"]),
+                        "y_median": _grid_median(c, grids["yedges"][p], 1, s["ylog"])})
+    return out
+
+
+def cache_key(X, cols, pairs, bins, membership=None, group_names=None):
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X, dtype=float).tobytes())
+    h.update(json.dumps([GRID_VERSION, list(cols), [_spec(p) for p in pairs], bins, group_names]).encode())
+    if membership is not None:
+        for a in membership:
+            h.update(np.ascontiguousarray(a, dtype=np.int64).tobytes())
+    return h.hexdigest()[:20]
+
+
+def save_grids(grids, path):
+    arrays = {k: v for k, v in grids.items() if k != "meta"}
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp, meta=np.array(json.dumps(grids["meta"])), **arrays)
+    os.replace(tmp, path)
+
+
+def load_grids(path):
+    with np.load(path, allow_pickle=False) as z:
+        grids = {k: z[k] for k in z.files if k != "meta"}
+        grids["meta"] = json.loads(str(z["meta"]))
+    if grids["meta"]["version"] != GRID_VERSION:
+        raise ValueError(f"Grid cache version {grids['meta']['version']} does not match {GRID_VERSION}.")
+    return grids
+
+
+def cached_grids(X, cols, pairs, bins=BINS, membership=None, group_names=None, cache_dir=GRID_CACHE):
+    """density_grids(), reusing grid_cache/<hash>.npz when the data and pairs are unchanged."""
+    if not cache_dir:
+        return density_grids(X, cols, pairs, bins, membership, group_names)
+    path = os.path.join(cache_dir, f"grids_{cache_key(X, cols, pairs, bins, membership, group_names)}.npz")
+    if os.path.exists(path):
+        return load_grids(path)
+    grids = density_grids(X, cols, pairs, bins, membership, group_names)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_grids(grids, path)
+    return grids
+
+
+def _render(job):
+    """Draw one grid to a PNG. Runs in a worker process; matplotlib is imported here."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    s, counts = job["spec"], job["counts"]
+    fig, ax = plt.subplots()
+    shown = np.ma.masked_equal(counts.T, 0)
+    mesh = ax.pcolormesh(job["xedges"], job["yedges"], shown, cmap="viridis",
+                         norm=LogNorm(vmin=1, vmax=max(int(counts.max()), 1)))
+    fig.colorbar(mesh, ax=ax, label="materials")
+    if s["xlog"]:
+        ax.set_xscale("log")
+    if s["ylog"]:
+        ax.set_yscale("log")
+    for label in job["labels"]:
+        ax.plot(label["x_median"], label["y_median"], "o", color="white", mec="black", ms=4)
+        ax.annotate(label["group"], (label["x_median"], label["y_median"]), fontsize=6,
+                    xytext=(3, 3), textcoords="offset points")
+    ax.set_xlabel(s["x"])
+    ax.set_ylabel(s["y"])
+    if s["title"]:
+        ax.set_title(s["title"])
+    fig.tight_layout()
+    fig.savefig(job["path"], dpi=job["dpi"])
+    plt.close(fig)
+    return job["path"]
+
+
+def render_all(grids, outdir=OUTDIR, jobs=None, dpi=DPI, max_labels=MAX_LABELS):
+    """Render every grid to outdir/<file>, one chart per worker process."""
+    os.makedirs(outdir, exist_ok=True)
+    summary = group_summary(grids)
+    work = []
+    for p, s in enumerate(grids["meta"]["pairs"]):
+        labels = [g for g in summary if g["x"] == s["x"] and g["y"] == s["y"]]
+        labels = sorted(labels, key=lambda g: -g["count"])[:max_labels]
+        work.append({"spec": s, "counts": grids["counts"][p], "xedges": grids["xedges"][p],
+                     "yedges": grids["yedges"][p], "labels": labels, "dpi": dpi,
+                     "path": os.path.join(outdir, s["file"])})
+    jobs = jobs or min(len(work), os.cpu_count() or 1)
+    if jobs <= 1 or len(work) <= 1:
+        return [_render(j) for j in work]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_render, work))
+
+
+def category_membership(csr):
+    from src.pipeline.schema import csr_membership
+
+    return csr_membership(csr), list(csr["vocab"])
+
+
+def label_membership(labels, prefix=""):
+    """Single-label groups (e.g. KMeans clusters) in membership form."""
+    names, codes = np.unique(np.asarray(labels), return_inverse=True)
+    return (np.arange(len(codes)), codes), [f"{prefix}{n}" for n in names]
+
+
+def pca_inputs(X, cols, bundle_path):
+    """
+    (PC matrix, ["PC1", "PC2"], cluster membership) for PCA_PAIRS. Rows are
+    projected and assigned to clusters with the analysis model bundle, so the
+    chart matches the notebook's PCA; the bundle is fitted on this catalog
+    and saved when bundle_path does not exist yet.
+    """
+    import pandas as pd
+
+    from src.ml.model_bundle import fit_bundle, load_bundle, save_bundle, score_new
+
+    rows = pd.DataFrame(X, columns=cols)
+    if os.path.exists(bundle_path):
+        bundle = load_bundle(bundle_path)
+    else:
+        bundle = fit_bundle(rows)
+        save_bundle(bundle, bundle_path)
+        log(f"Fitted {bundle_path} (k={bundle['meta']['k']})")
+    scored = score_new(bundle, rows)
+    pcs = ["PC1", "PC2"]
+    membership, names = label_membership(scored["Cluster"].values, prefix="Cluster ")
+    return scored[pcs].values, pcs, membership, names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ashby charts from pre-aggregated density grids.")
+    parser.add_argument("--input", default=INPUT, help="catalog CSV or materials_store directory")
+    parser.add_argument("--outdir", default=OUTDIR)
+    parser.add_argument("--bins", type=int, default=BINS)
+    parser.add_argument("--jobs", type=int, default=None, help="render processes (default: one per chart)")
+    parser.add_argument("--all-pairs", action="store_true",
+                        help="every numeric column pair, not just ASHBY_PAIRS (without category grids)")
+    parser.add_argument("--no-categories", action="store_true", help="skip the per-category grids")
+    parser.add_argument("--pca", action="store_true",
+                        help=f"also draw the PCA chart labelled by KMeans cluster (uses {BUNDLE_FILE})")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    stage = start_span("density_grids")
+    X, cols, csr = load_catalog(args.input)
+    pairs = all_pairs(cols) if args.all_pairs else ASHBY_PAIRS
+    by_category = not (args.no_categories or args.all_pairs)
+    membership, names = category_membership(csr) if by_category else (None, None)
+
+    t0 = time.perf_counter()
+    cache_dir = None if args.no_cache else GRID_CACHE
+    grids = [cached_grids(X, cols, pairs, args.bins, membership, names, cache_dir=cache_dir)]
+    if args.pca:
+        P, pcs, membership, names = pca_inputs(X, cols, BUNDLE_FILE)
+        grids.append(cached_grids(P, pcs, PCA_PAIRS, args.bins, membership, names, cache_dir=cache_dir))
+    t_grid = time.perf_counter() - t0
+    paths = [p for g in grids for p in render_all(g, args.outdir, args.jobs)]
+    annotate(stage, rows=int(X.shape[0]), charts=len(paths))
+    end_span(stage)
+    log(f"Saved {len(paths)} charts to {args.outdir}/ (grids {t_grid:.2f}s, "
+        f"total {time.perf_counter() - t0:.2f}s)")
+    sys.exit(0 if paths else 1)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.ml.cluster_selection import select_k
+from src.ranking.topsis import (
+    TOPSIS_COLS, median_impute, topsis_apply, topsis_directions, topsis_params, topsis_weights,
+)
+
+BUNDLE_VERSION = 1
+BUNDLE_FILE = "model_bundle.npz"
+
+TEXT_COLS = {"Material Name", "Categories", "CategoryList", "Material Notes", "GUID"}
+
+# Analysis.ipynb keeps cost/environment columns out of the PCA projection
+EXCLUDE_FOR_DR = {"Cost_USD_per_kg", "CO2_kg_per_kg", "Cost_per_CO2", "Eco_Index"}
+
+# Drift thresholds that flag a full refit
+DRIFT_MEAN_SHIFT = 0.5      # |mean shift| in training standard deviations
+DRIFT_MISSING_DELTA = 0.2   # absolute change in a column's missing rate
+DRIFT_OUT_OF_RANGE = 0.1    # share of values outside the training p1..p99 band
+
+
+def _numeric(df, cols):
+    return df.reindex(columns=cols).apply(pd.to_numeric, errors="coerce").values.astype(float)
+
+
+def fit_bundle(df, num_cols=None, k=None, n_components=2, topsis_weight_overrides=None):
+    """
+    Fit imputer, scaler, PCA, KMeans and TOPSIS on df and keep only the arrays
+    needed to reproduce them, so new rows can be scored without refitting.
+    """
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import RobustScaler
+
+    if num_cols is None:
+        num = df.drop(columns=[c for c in df.columns if c in TEXT_COLS])
+        num = num.apply(pd.to_numeric, errors="coerce")
+        num_cols = [c for c in num.columns if num[c].notna().any()]
+    num_cols = list(num_cols)
+    dr_cols = [c for c in num_cols if c not in EXCLUDE_FOR_DR]
+
+    # 1. Imputer + scaler
+    X = _numeric(df, num_cols)
+    missing_rate = np.isnan(X).mean(axis=0)
+    medians = np.nanmedian(X, axis=0)
+    X_imp = np.where(np.isnan(X), medians, X)
+    scaler = RobustScaler().fit(X_imp)
+    X_scaled = scaler.transform(X_imp)
+
+    # 2. PCA on the property columns
+    dr_idx = np.array([num_cols.index(c) for c in dr_cols], dtype=int)
+    pca = PCA(n_components=n_components, random_state=42).fit(X_scaled[:, dr_idx])
+
+    # 3. Clusters: centroids of the selected KMeans labelling
+    sel = select_k(X_scaled, k_range=[k] if k else range(2, 9))
+    labels = sel["labels"]
+    centroids = np.vstack([X_scaled[labels == c].mean(axis=0) for c in range(sel["k"])])
+    train_dist = np.linalg.norm(X_scaled - centroids[labels], axis=1)
+
+    # 4. TOPSIS normalisation and ideal points
+    t_cols = [c for c in TOPSIS_COLS if c in df.columns]
+    T = _numeric(df, t_cols)
+    t_medians = np.nanmedian(T, axis=0) if t_cols else np.zeros(0)
+    t_dirs = topsis_directions(t_cols)
+    t_params = topsis_params(median_impute(T), topsis_weights(t_cols, topsis_weight_overrides), t_dirs) \
+        if t_cols else {"norm": np.zeros(0), "weights": np.zeros(0),
+                        "ideal_best": np.zeros(0), "ideal_worst": np.zeros(0)}
+
+    fingerprint = hashlib.sha256(np.ascontiguousarray(X_imp).tobytes()).hexdigest()[:16]
+    return {
+        "meta": {
+            "version": BUNDLE_VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "n_train": int(len(df)),
+            "data_fingerprint": fingerprint,
+            "num_cols": num_cols,
+            "dr_cols": dr_cols,
+            "topsis_cols": t_cols,
+            "k": int(sel["k"]),
+            "explained_variance_ratio": pca.explained_variance_ratio_.tolist(),
+        },
+        "imputer_medians": medians,
+        "scaler_center": scaler.center_,
+        "scaler_scale": scaler.scale_,
+        "dr_idx": dr_idx,
+        "pca_mean": pca.mean_,
+        "pca_components": pca.components_,
+        "centroids": centroids,
+        "topsis_medians": t_medians,
+        "topsis_dirs": t_dirs,
+        "topsis_norm": t_params["norm"],
+        "topsis_weights": t_params["weights"],
+        "topsis_ideal_best": t_params["ideal_best"],
+        "topsis_ideal_worst": t_params["ideal_worst"],
+        # reference statistics for drift checks
+        "train_mean": X_scaled.mean(axis=0),
+        "train_std": X_scaled.std(axis=0),
+        "train_p01": np.percentile(X_scaled, 1, axis=0),
+        "train_p99": np.percentile(X_scaled, 99, axis=0),
+        "train_missing": missing_rate,
+        "train_centroid_dist": np.array([train_dist.mean()]),
+    }
+
+
+def save_bundle(bundle, path=BUNDLE_FILE):
+    arrays = {k: v for k, v in bundle.items() if k != "meta"}
+    np.savez(path, meta=np.array(json.dumps(bundle["meta"])), **arrays)
+
+
+def load_bundle(path=BUNDLE_FILE):
+    with np.load(path, allow_pickle=False) as z:
+        bundle = {k: z[k] for k in z.files if k != "meta"}
+        bundle["meta"] = json.loads(str(z["meta"]))
+    if bundle["meta"]["version"] != BUNDLE_VERSION:
+        raise ValueError(
+            f"Bundle version {bundle['meta']['version']} does not match {BUNDLE_VERSION}; refit it."
+        )
+    return bundle
+
+
+def _transform(bundle, rows):
+    if not isinstance(rows, pd.DataFrame):
+        rows = pd.DataFrame(rows)
+    X = _numeric(rows, bundle["meta"]["num_cols"])
+    missing = np.isnan(X)
+    X = np.where(missing, bundle["imputer_medians"], X)
+    return rows, (X - bundle["scaler_center"]) / bundle["scaler_scale"], missing
+
+
+def score_new(bundle, rows):
+    """PC position, nearest cluster and TOPSIS score for rows not seen at fit time."""
+    rows, X_scaled, _ = _transform(bundle, rows)
+
+    pcs = (X_scaled[:, bundle["dr_idx"]] - bundle["pca_mean"]) @ bundle["pca_components"].T
+    d2 = ((X_scaled[:, None, :] - bundle["centroids"][None, :, :]) ** 2).sum(axis=2)
+
+    out = pd.DataFrame(index=rows.index)
+    if "Material Name" in rows.columns:
+        out["Material Name"] = rows["Material Name"]
+    for i in range(pcs.shape[1]):
+        out[f"PC{i + 1}"] = pcs[:, i]
+    out["Cluster"] = d2.argmin(axis=1)
+
+    t_cols = bundle["meta"]["topsis_cols"]
+    if t_cols:
+        T = _numeric(rows, t_cols)
+        T = np.where(np.isnan(T), bundle["topsis_medians"], T)
+        out["TOPSIS_score"] = topsis_apply(T, {
+            "norm": bundle["topsis_norm"],
+            "weights": bundle["topsis_weights"],
+            "ideal_best": bundle["topsis_ideal_best"],
+            "ideal_worst": bundle["topsis_ideal_worst"],
+        })
+    return out
+
+
+def drift_stats(bundle, rows):
+    """Compare incoming rows against the training distribution and say whether to refit."""
+    rows, X_scaled, missing = _transform(bundle, rows)
+    cols = bundle["meta"]["num_cols"]
+
+    std = np.where(bundle["train_std"] > 0, bundle["train_std"], 1.0)
+    mean_shift = (X_scaled.mean(axis=0) - bundle["train_mean"]) / std
+    missing_delta = missing.mean(axis=0) - bundle["train_missing"]
+    outside = ((X_scaled < bundle["train_p01"]) | (X_scaled > bundle["train_p99"])) & ~missing
+    out_of_range = outside.mean(axis=0)
+
+    d2 = ((X_scaled[:, None, :] - bundle["centroids"][None, :, :]) ** 2).sum(axis=2)
+    dist_ratio = float(np.sqrt(d2.min(axis=1)).mean() / max(bundle["train_centroid_dist"][0], 1e-12))
+
+    drifted = [
+        c for c, s, m, o in zip(cols, mean_shift, missing_delta, out_of_range)
+        if abs(s) > DRIFT_MEAN_SHIFT or abs(m) > DRIFT_MISSING_DELTA or o > DRIFT_OUT_OF_RANGE
+    ]
+    return {
+        "n_rows": int(len(rows)),
+        "mean_shift": dict(zip(cols, mean_shift.round(4).tolist())),
+        "missing_delta": dict(zip(cols, missing_delta.round(4).tolist())),
+        "out_of_range": dict(zip(cols, out_of_range.round(4).tolist())),
+        "centroid_distance_ratio": round(dist_ratio, 4),
+        "drifted_columns": drifted,
+        "refit_recommended": bool(drifted) or dist_ratio > 1.5,
+    }
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("materials_final_with_price.csv")
+    bundle = fit_bundle(df)
+    save_bundle(bundle)
+    print(f"Saved {BUNDLE_FILE} (k={bundle['meta']['k']}, {len(bundle['meta']['num_cols'])} features)")
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from src.pipeline.schema import csr_membership
+from src.pipeline.store import dataset_version, load_catalog
+from src.pipeline.telemetry import annotate, end_span, log, start_span
+
+# The cleaned table before imputation: the priced catalog is category-median
+# filled, so its statistics would be computed over imputed values
+INPUT = "dataset_cleaned_final.csv"
+OUTDIR = "analysis_outputs"
+STATS_CACHE = "stats_cache"
+STATS_VERSION = 2
+
+# Per-category statistics, in output column order
+CATEGORY_STATS = ("count", "mean", "median", "p10", "p90")
+QUANTILES = {"p10": 0.1, "median": 0.5, "p90": 0.9}
+
+
+def _pairwise_moments(X):
+    """
+    Two-pass pairwise-complete moments over the rows where both columns are
+    present: n[i, j] rows, cxy[i, j] the co-moment and sxx[i, j] the sum of
+    squares of column i, both taken about the means of those shared rows (as
+    DataFrame.corr does). Centring on a column's overall mean instead loses
+    most of the precision once gaps make the shared-row means differ from it.
+    The first pass is one masked matrix product; the second runs per column
+    over the rows it has, against every other column at once.
+    """
+    X = np.asarray(X, dtype=float)
+    M = ~np.isnan(X)
+    Mf = M.astype(float)
+    n = Mf.T @ Mf
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # mean[i, j]: mean of column i over the rows shared with column j
+        mean = (np.where(M, X, 0.0).T @ Mf) / n
+    n_cols = X.shape[1]
+    cxy = np.zeros((n_cols, n_cols))
+    sxx = np.zeros((n_cols, n_cols))
+    for i in range(n_cols):
+        rows = X[M[:, i]]
+        shared = M[M[:, i]]
+        di = np.where(shared, rows[:, [i]] - mean[i], 0.0)
+        dj = np.where(shared, rows - mean[:, i], 0.0)
+        cxy[i] = np.einsum("kj,kj->j", di, dj)
+        sxx[i] = np.einsum("kj,kj->j", di, di)
+    return n, cxy, sxx
+
+
+def pairwise_cov(X, min_periods=2):
+    """Covariance of every column pair over the rows where both are present (ddof=1)."""
+    n, cxy, _ = _pairwise_moments(X)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = cxy / (n - 1)
+    return np.where(n >= max(min_periods, 2), cov, np.nan), n
+
+
+def pairwise_corr(X, min_periods=2):
+    """
+    Pearson correlation of every column pair over the rows where both are
+    present -- no imputed values enter it. Pairs with fewer than
+    min_periods shared rows, or no variance on those rows, are NaN.
+    """
+    n, cxy, sxx = _pairwise_moments(X)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cxy / np.sqrt(sxx * sxx.T)
+    corr = np.clip(corr, -1.0, 1.0)
+    return np.where((n >= max(min_periods, 2)) & (sxx > 0) & (sxx.T > 0), corr, np.nan), n
+
+
+def category_stats(X, csr):
+    """
+    Count, mean, median, p10 and p90 of every column within every category,
+    ignoring NaN. Each value is replaced by its rank in its column (NaN
+    last), so a single integer sort of category * n_rows + rank over the
+    category membership puts a column in (category, value) order; counts and
+    sums then reduce over each category's run for all columns at once, and
+    the quantiles are read off the runs with linear interpolation (numpy's
+    default method). Returns arrays of shape (n_categories, n_cols) keyed by
+    stat name.
+    """
+    X = np.asarray(X, dtype=float)
+    rows, codes = csr_membership(csr)
+    n_rows, n_cols = X.shape
+    n_groups = len(csr["vocab"])
+
+    v = np.empty((len(rows), n_cols), order="F")
+    offset = codes * n_rows
+    rank = np.empty(n_rows, dtype=np.int64)
+    ramp = np.arange(n_rows)
+    for j in range(n_cols):
+        col = np.ascontiguousarray(X[:, j])
+        order = np.argsort(col)
+        rank[order] = ramp
+        key = rank[rows]
+        key += offset
+        key.sort()
+        v[:, j] = col[order[key % n_rows]]
+    seen = ~np.isnan(v)
+
+    size = np.bincount(codes, minlength=n_groups)
+    start = np.concatenate([[0], np.cumsum(size)[:-1]])
+    nonempty = size > 0
+    out = {"count": np.zeros((n_groups, n_cols), dtype=np.int64)}
+    sums = np.zeros((n_groups, n_cols))
+    if len(codes):
+        out["count"][nonempty] = np.add.reduceat(seen, start[nonempty], axis=0)
+        sums[nonempty] = np.add.reduceat(np.where(seen, v, 0.0), start[nonempty], axis=0)
+    cnt = out["count"]
+    has = cnt > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["mean"] = np.where(has, sums / cnt, np.nan)
+
+    # NaN ranks last, so a category's values are the first count entries of its run
+    first = start[:, None] + np.zeros((1, n_cols), dtype=np.int64)
+    last = first + np.maximum(cnt - 1, 0)
+    col = np.broadcast_to(np.arange(n_cols), first.shape)
+    for name, q in QUANTILES.items():
+        pos = first + q * np.maximum(cnt - 1, 0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, last)
+        lo, hi = np.minimum(lo, len(v) - 1), np.minimum(hi, len(v) - 1)
+        with np.errstate(invalid="ignore"):
+            val = v[lo, col] + (v[hi, col] - v[lo, col]) * (pos - lo)
+        out[name] = np.where(has, val, np.nan)
+    return out
+
+
+def compute_stats(X, cols, csr, min_periods=2):
+    corr, n = pairwise_corr(X, min_periods)
+    cov, _ = pairwise_cov(X, min_periods)
+    stats = {
+        "meta": {"version": STATS_VERSION, "cols": list(cols), "categories": list(csr["vocab"]),
+                 "min_periods": min_periods},
+        "corr": corr,
+        "cov": cov,
+        "pair_counts": n.astype(np.int64),
+    }
+    for name, arr in category_stats(X, csr).items():
+        stats[f"category_{name}"] = arr
+    return stats
+
+
+def save_stats(stats, path):
+    arrays = {k: v for k, v in stats.items() if k != "meta"}
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, meta=np.array(json.dumps(stats["meta"])), **arrays)
+    os.replace(tmp, path)
+
+
+def load_stats(path):
+    with np.load(path, allow_pickle=False) as z:
+        stats = {k: z[k] for k in z.files if k != "meta"}
+        stats["meta"] = json.loads(str(z["meta"]))
+    if stats["meta"]["version"] != STATS_VERSION:
+        raise ValueError(f"Stats cache version {stats['meta']['version']} does not match {STATS_VERSION}.")
+    return stats
+
+
+def catalog_stats(path, cache_dir=STATS_CACHE, min_periods=2):
+    """
+    compute_stats() for a catalog CSV or store, cached as
+    stats_cache/stats_<kind>_<dataset version>_<min_periods>.npz so unchanged
+    data is not recomputed (a store of the same CSV is float32, hence kind).
+    """
+    if cache_dir:
+        kind = "store" if os.path.isdir(path) else "csv"
+        cache = os.path.join(cache_dir, f"stats_{kind}_{dataset_version(path)[:20]}_{min_periods}.npz")
+        if os.path.exists(cache):
+            return load_stats(cache)
+    X, cols, csr = load_catalog(path)
+    stats = compute_stats(X, cols, csr, min_periods)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_stats(stats, cache)
+    return stats
+
+
+def matrix_frame(stats, key="corr"):
+    import pandas as pd
+
+    cols = stats["meta"]["cols"]
+    return pd.DataFrame(stats[key], index=cols, columns=cols)
+
+
+def category_frame(stats, cols=None):
+    """Long table: one row per (category, column) with any values, stats as columns."""
+    import pandas as pd
+
+    all_cols = stats["meta"]["cols"]
+    idx = [all_cols.index(c) for c in (cols or all_cols)]
+    g, j = np.nonzero(stats["category_count"][:, idx] > 0)
+    out = pd.DataFrame({
+        "Category": np.asarray(stats["meta"]["categories"], dtype=object)[g],
+        "Column": np.asarray(all_cols, dtype=object)[np.asarray(idx)[j]],
+    })
+    for name in CATEGORY_STATS:
+        out[name] = stats[f"category_{name}"][g, np.asarray(idx)[j]]
+    return out
+
+
+def write_reports(stats, outdir=OUTDIR):
+    """Correlation, covariance, shared-row counts and category statistics as CSVs in outdir."""
+    os.makedirs(outdir, exist_ok=True)
+    paths = []
+    for key, name in [("corr", "correlation_pairwise.csv"), ("cov", "covariance_pairwise.csv"),
+                      ("pair_counts", "correlation_pair_counts.csv")]:
+        paths.append(os.path.join(outdir, name))
+        matrix_frame(stats, key).to_csv(paths[-1])
+    paths.append(os.path.join(outdir, "category_stats.csv"))
+    category_frame(stats).to_csv(paths[-1], index=False)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pairwise-complete correlations and per-category statistics.")
+    parser.add_argument("--input", default=INPUT, help="catalog CSV or materials_store directory")
+    parser.add_argument("--outdir", default=OUTDIR)
+    parser.add_argument("--min-periods", type=int, default=2, help="shared rows a pair needs")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    stage = start_span("property_stats")
+    stats = catalog_stats(args.input, None if args.no_cache else STATS_CACHE, args.min_periods)
+    write_reports(stats, args.outdir)
+    annotate(stage, cols=len(stats["meta"]["cols"]), categories=len(stats["meta"]["categories"]))
+    end_span(stage)
+    log(f"Saved correlation, covariance and category statistics to {args.outdir}/")
@@ -0,0 +1,145 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+BATCH_ROWS = 50000
+RANDOM_STATE = 42
+
+# Dense matrices up to this many cells use the exact full SVD
+FULL_SVD_MAX_CELLS = 2_000_000
+# Above this many rows an in-memory matrix is still fitted batch-wise
+INCREMENTAL_MIN_ROWS = 500_000
+
+# Rows kept per column to estimate median / IQR for chunked scaling
+RESERVOIR_ROWS = 100_000
+
+
+def _report(model, method, n_rows, dtype, seconds, batch_size=None):
+    return {
+        "method": method,
+        "n_rows": int(n_rows),
+        "n_components": int(model.n_components_),
+        "explained_variance": model.explained_variance_.tolist(),
+        "explained_variance_ratio": model.explained_variance_ratio_.tolist(),
+        "dtype": np.dtype(dtype).name,
+        "batch_size": batch_size,
+        "seconds": round(seconds, 4),
+    }
+
+
+def fit_pca(X, n_components=2, method="auto", dtype=np.float32, batch_size=BATCH_ROWS,
+            random_state=RANDOM_STATE):
+    """
+    PCA on an in-memory matrix.
+    method is "full", "randomized", "incremental" or "auto" (full SVD for small
+    matrices, randomized for wide/tall ones, batch-wise for very tall ones).
+    Returns the fitted model and a report with explained variance and timing.
+    """
+    from sklearn.decomposition import PCA, IncrementalPCA
+
+    X = np.asarray(X, dtype=dtype)
+    n, d = X.shape
+    if method == "auto":
+        if n >= INCREMENTAL_MIN_ROWS:
+            method = "incremental"
+        elif n * d <= FULL_SVD_MAX_CELLS:
+            method = "full"
+        else:
+            method = "randomized"
+
+    t0 = time.perf_counter()
+    if method == "incremental":
+        model = IncrementalPCA(n_components=n_components, batch_size=batch_size)
+        for start in range(0, n, batch_size):
+            batch = X[start:start + batch_size]
+            if len(batch) >= n_components:
+                model.partial_fit(batch)
+    elif method in ("full", "randomized"):
+        model = PCA(n_components=n_components, svd_solver=method, random_state=random_state).fit(X)
+    else:
+        raise ValueError(f"Unknown PCA method: {method}")
+    return model, _report(model, method, n, dtype, time.perf_counter() - t0,
+                          batch_size if method == "incremental" else None)
+
+
+def iter_csv_batches(path, cols, chunksize=BATCH_ROWS, dtype=np.float32, medians=None,
+                     center=None, scale=None):
+    """Numeric batches of cols from a CSV, median-imputed and robust-scaled when stats are given."""
+    for chunk in pd.read_csv(path, usecols=lambda c: c in set(cols), chunksize=chunksize):
+        X = chunk.reindex(columns=cols).apply(pd.to_numeric, errors="coerce").values.astype(dtype)
+        if medians is not None:
+            X = np.where(np.isnan(X), np.asarray(medians, dtype=dtype), X)
+        if center is not None:
+            X = (X - np.asarray(center, dtype=dtype)) / np.asarray(scale, dtype=dtype)
+        yield X
+
+
+def sample_robust_stats(path, cols, chunksize=BATCH_ROWS, sample_rows=RESERVOIR_ROWS,
+                        random_state=RANDOM_STATE):
+    """
+    Median and IQR per column from a reservoir sample of a CSV, so chunked PCA
+    can impute and scale like SimpleImputer + RobustScaler without loading it all.
+    """
+    rng = np.random.default_rng(random_state)
+    reservoir = None
+    seen = 0
+    for X in iter_csv_batches(path, cols, chunksize, dtype=np.float64):
+        if reservoir is None:
+            reservoir = np.empty((0, X.shape[1]))
+        take = min(len(X), max(sample_rows - len(reservoir), 0))
+        reservoir = np.vstack([reservoir, X[:take]])
+        seen += take
+        rest = X[take:]
+        if len(rest):
+            # Algorithm R, vectorised per chunk
+            slots = rng.integers(0, seen + np.arange(1, len(rest) + 1))
+            hit = slots < sample_rows
+            reservoir[slots[hit]] = rest[hit]
+            seen += len(rest)
+    if reservoir is None:
+        raise ValueError(f"No rows read from {path}")
+
+    medians = np.nanmedian(reservoir, axis=0)
+    medians = np.where(np.isnan(medians), 0.0, medians)
+    filled = np.where(np.isnan(reservoir), medians, reservoir)
+    q25, q75 = np.percentile(filled, [25, 75], axis=0)
+    scale = q75 - q25
+    scale[scale == 0] = 1.0
+    return {"medians": medians, "center": np.median(filled, axis=0), "scale": scale, "n_rows": seen}
+
+
+def fit_pca_chunked(path, cols, n_components=2, chunksize=BATCH_ROWS, dtype=np.float32, stats=None):
+    """
+    IncrementalPCA over a CSV read chunk by chunk; memory is bounded by chunksize.
+    stats holds medians/center/scale (from sample_robust_stats or a model bundle).
+    """
+    from sklearn.decomposition import IncrementalPCA
+
+    if stats is None:
+        stats = sample_robust_stats(path, cols, chunksize)
+
+    t0 = time.perf_counter()
+    model = IncrementalPCA(n_components=n_components)
+    n_rows = 0
+    # A trailing chunk smaller than n_components is merged into the one before it
+    pending = None
+    for X in iter_csv_batches(path, cols, chunksize, dtype, stats["medians"], stats["center"], stats["scale"]):
+        if pending is not None and len(X) < n_components:
+            pending = np.vstack([pending, X])
+            continue
+        if pending is not None:
+            model.partial_fit(pending)
+            n_rows += len(pending)
+        pending = X
+    if pending is not None and len(pending) >= n_components:
+        model.partial_fit(pending)
+        n_rows += len(pending)
+    return model, _report(model, "incremental", n_rows, dtype, time.perf_counter() - t0, chunksize)
+
+
+def transform_chunked(path, cols, model, stats, chunksize=BATCH_ROWS, dtype=np.float32):
+    """Project a CSV onto a fitted PCA chunk by chunk."""
+    parts = [model.transform(X) for X in iter_csv_batches(
+        path, cols, chunksize, dtype, stats["medians"], stats["center"], stats["scale"])]
+    return np.vstack(parts) if parts else np.empty((0, model.n_components_), dtype=dtype)
@@ -0,0 +1,206 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+INDEX_FILE = "similarity_index.npz"
+
+TEXT_COLS = {"Material Name", "Categories", "CategoryList", "Material Notes", "GUID"}
+
+# KD-tree only pays off in low dimensions; above this brute force wins
+TREE_MAX_DIMS = 12
+# ... and on catalogs big enough to amortise building it (and importing sklearn)
+TREE_MIN_ROWS = 20000
+# Distance-matrix cells computed per block in the brute-force path
+BLOCK_CELLS = 8_000_000
+# Largest scaled magnitude for which distances use the matrix-product expansion
+EXPANSION_MAX_ABS = 1e4
+
+
+def _robust_stats(X):
+    center = np.nanmedian(X, axis=0)
+    q25, q75 = np.nanpercentile(X, [25, 75], axis=0)
+    scale = q75 - q25
+    center = np.where(np.isnan(center), 0.0, center)
+    scale = np.where(np.isnan(scale) | (scale == 0), 1.0, scale)
+    return center, scale
+
+
+def build_index(df, cols=None, weights=None, method="auto", center=None, scale=None):
+    """
+    Nearest-neighbour index over the robust-scaled property matrix.
+    weights maps column -> weight (default 1). Missing values are kept and
+    handled by the NaN-aware brute-force path; method="tree" fills them with
+    the column median instead. center/scale can come from a model bundle so the
+    index lives in the same space as the analysis pipeline.
+    """
+    if cols is None:
+        num = df.drop(columns=[c for c in df.columns if c in TEXT_COLS])
+        num = num.apply(pd.to_numeric, errors="coerce")
+        cols = [c for c in num.columns if num[c].notna().any()]
+    cols = list(cols)
+    X = df.reindex(columns=cols).apply(pd.to_numeric, errors="coerce").values.astype(float)
+    if center is None:
+        center, scale = _robust_stats(X)
+    X = (X - center) / scale
+
+    has_nan = bool(np.isnan(X).any())
+    if method == "auto":
+        method = "tree" if len(cols) <= TREE_MAX_DIMS and not has_nan else "brute"
+    if method not in ("tree", "brute"):
+        raise ValueError(f"Unknown index method: {method}")
+
+    w = np.array([float((weights or {}).get(c, 1.0)) for c in cols])
+    names = np.asarray(df["Material Name"].astype(str).tolist() if "Material Name" in df.columns
+                       else [str(i) for i in range(len(df))], dtype=str)
+
+    index = {
+        "meta": {"cols": cols, "method": method},
+        "names": names,
+        "X": X,
+        "weights": w,
+        "center": np.asarray(center, dtype=float),
+        "scale": np.asarray(scale, dtype=float),
+    }
+    return index
+
+
+def _medians(index):
+    """Scaled column medians of the indexed rows: what a tree index reads a missing value as."""
+    if "medians" not in index:
+        medians = np.nanmedian(index["X"], axis=0)
+        index["medians"] = np.where(np.isnan(medians), 0.0, medians)
+    return index["medians"]
+
+
+def _fill_missing(X, medians):
+    return np.where(np.isnan(X), medians, X)
+
+
+def _attach_tree(index):
+    from sklearn.neighbors import KDTree
+
+    X = _fill_missing(index["X"], _medians(index))
+    index["tree"] = KDTree(X * np.sqrt(index["weights"]))
+
+
+def save_index(index, path=INDEX_FILE):
+    np.savez(
+        path,
+        meta=np.array(json.dumps(index["meta"])),
+        names=index["names"],
+        X=index["X"],
+        weights=index["weights"],
+        center=index["center"],
+        scale=index["scale"],
+    )
+
+
+def load_index(path=INDEX_FILE):
+    with np.load(path, allow_pickle=False) as z:
+        index = {k: z[k] for k in z.files if k != "meta"}
+        index["meta"] = json.loads(str(z["meta"]))
+    return index
+
+
+def _brute_knn(Q, X, w, k, exclude=None):
+    # NaN-aware weighted Euclidean over co-observed features, rescaled to the
+    # full feature weight (same convention as sklearn's nan_euclidean).
+    Mx = ~np.isnan(X)
+    X0 = np.where(Mx, X, 0.0)
+    Mxf = Mx.astype(float)
+    x_sq = (X0 ** 2) * w
+    total_w = w.sum()
+    # The matrix-product expansion cancels catastrophically when a column spans
+    # many decades (volume resistivity), so such matrices take exact differences.
+    expand = np.abs(X0).max(initial=0.0) <= EXPANSION_MAX_ABS
+
+    n, d = X.shape
+    k = min(k, n - (1 if exclude is not None else 0))
+    block = max(1, BLOCK_CELLS // max(n if expand else n * d, 1))
+    idx_out = np.empty((len(Q), k), dtype=int)
+    dist_out = np.empty((len(Q), k))
+    for start in range(0, len(Q), block):
+        q = Q[start:start + block]
+        Mq = ~np.isnan(q)
+        q0 = np.where(Mq, q, 0.0)
+        Mqf = Mq.astype(float)
+        common = (Mqf * w) @ Mxf.T
+        if expand:
+            d2 = (q0 ** 2 * w) @ Mxf.T + Mqf @ x_sq.T - 2.0 * (q0 * w) @ X0.T
+        else:
+            both = Mq[:, None, :] & Mx[None, :, :]
+            d2 = (np.where(both, q0[:, None, :] - X0[None, :, :], 0.0) ** 2 * w).sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d2 = np.where(common > 0, np.maximum(d2, 0.0) * total_w / common, np.inf)
+        if exclude is not None:
+            d2[np.arange(len(q)), exclude[start:start + block]] = np.inf
+        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        pd2 = np.take_along_axis(d2, part, axis=1)
+        order = np.argsort(pd2, axis=1)
+        idx_out[start:start + block] = np.take_along_axis(part, order, axis=1)
+        dist_out[start:start + block] = np.sqrt(np.take_along_axis(pd2, order, axis=1))
+    return idx_out, dist_out
+
+
+def _knn(index, Q, k, exclude=None):
+    if index["meta"]["method"] == "tree":
+        # tree indexes read a missing value as the column median (not as 0,
+        # which is the median only when center came from _robust_stats)
+        medians = _medians(index)
+        Q = _fill_missing(Q, medians)
+        if len(index["X"]) < TREE_MIN_ROWS:
+            return _brute_knn(Q, _fill_missing(index["X"], medians), index["weights"], k, exclude)
+        if "tree" not in index:
+            _attach_tree(index)    # built on first use, so loading stays cheap
+        extra = 1 if exclude is not None else 0
+        Qw = Q * np.sqrt(index["weights"])
+        kk = min(k + extra, len(index["X"]))
+        dist, idx = index["tree"].query(Qw, k=kk)
+        if exclude is not None:
+            keep = idx != exclude[:, None]
+            # drop the query itself (or the last extra hit when it was not returned)
+            keep[keep.all(axis=1), -1] = False
+            idx = idx[keep].reshape(len(Q), kk - 1)
+            dist = dist[keep].reshape(len(Q), kk - 1)
+        return idx, dist
+    return _brute_knn(Q, index["X"], index["weights"], k, exclude)
+
+
+def query(index, names=None, rows=None, k=5):
+    """
+    Batched k nearest materials, either for catalog entries by Material Name
+    (the material itself is excluded) or for raw property rows (DataFrame or
+    list of dicts). Returns one row per (query, neighbour).
+    """
+    if (names is None) == (rows is None):
+        raise ValueError("Pass exactly one of names= or rows=.")
+
+    if names is not None:
+        if isinstance(names, str):
+            names = [names]
+        lookup = pd.Series(np.arange(len(index["names"])), index=index["names"])
+        lookup = lookup[~lookup.index.duplicated()]
+        missing = [n for n in names if n not in lookup.index]
+        if missing:
+            raise KeyError(f"Unknown materials: {missing[:5]}")
+        pos = lookup.loc[list(names)].values
+        Q = index["X"][pos]
+        idx, dist = _knn(index, Q, k, exclude=pos)
+        labels = list(names)
+    else:
+        if not isinstance(rows, pd.DataFrame):
+            rows = pd.DataFrame(rows)
+        raw = rows.reindex(columns=index["meta"]["cols"]).apply(pd.to_numeric, errors="coerce").values
+        Q = (raw.astype(float) - index["center"]) / index["scale"]
+        idx, dist = _knn(index, Q, k)
+        labels = rows["Material Name"].astype(str).tolist() if "Material Name" in rows.columns \
+            else [str(i) for i in range(len(rows))]
+
+    kk = idx.shape[1]
+    return pd.DataFrame({
+        "Query": np.repeat(labels, kk),
+        "Rank": np.tile(np.arange(1, kk + 1), len(labels)),
+        "Material Name": index["names"][idx.ravel()],
+        "Distance": dist.ravel(),
+    })
@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+
+# Rows per chunk for out-of-core runs; unset or 0 keeps the in-memory path.
+CHUNKSIZE = int(os.environ.get("MATERIALS_CHUNKSIZE", "0") or 0) or None
+
+SIGN_BIT = np.uint64(1 << 63)
+RADIX_BITS = 16
+
+
+def map_csv(input_path, output_path, fn, chunksize, **read_kwargs):
+    """Stream input through fn chunk by chunk, appending to output. Returns rows written."""
+    import pandas as pd
+
+    rows = 0
+    first = True
+    for chunk in pd.read_csv(input_path, chunksize=chunksize, **read_kwargs):
+        out = fn(chunk)
+        out.to_csv(output_path, mode="w" if first else "a", header=first, index=False)
+        first = False
+        rows += len(out)
+    if first:
+        # empty input: still write the header
+        fn(pd.read_csv(input_path, nrows=0, **read_kwargs)).to_csv(output_path, index=False)
+    return rows
+
+
+def iter_numeric(path, cols, chunksize):
+    import pandas as pd
+
+    for chunk in pd.read_csv(path, usecols=lambda c: c in set(cols), chunksize=chunksize):
+        yield chunk.reindex(columns=cols).apply(pd.to_numeric, errors="coerce").values.astype(float)
+
+
+def _sortable(x):
+    # float64 -> uint64 with the same ordering, so values can be radix-selected
+    b = np.ascontiguousarray(x, dtype=np.float64).view(np.uint64)
+    return np.where(b & SIGN_BIT, ~b, b | SIGN_BIT)
+
+
+def _from_sortable(k):
+    k = np.uint64(k)
+    b = k & ~SIGN_BIT if k & SIGN_BIT else ~k
+    return float(np.array([b], dtype=np.uint64).view(np.float64)[0])
+
+
+def column_summary(path, cols, chunksize, collect_max=None):
+    """
+    Total row count plus exact per-column median, count, sum of squares, min
+    and max of the observed values, in a few streaming passes. Medians use
+    radix selection on order-preserving integer keys: each pass narrows the
+    bucket holding the middle rank by 16 bits, and once the bucket is small its
+    values are collected and selected directly, so memory stays bounded by the
+    chunk size.
+    """
+    collect_max = collect_max or chunksize
+    d = len(cols)
+    rows = 0
+    count = np.zeros(d, dtype=np.int64)
+    sumsq = np.zeros(d)
+    lo = np.full(d, np.inf)
+    hi = np.full(d, -np.inf)
+    top = np.zeros((d, 1 << RADIX_BITS), dtype=np.int64)
+
+    # Pass 1: counts, moments and the top-16-bit histogram
+    for X in iter_numeric(path, cols, chunksize):
+        rows += len(X)
+        for j in range(d):
+            v = X[:, j][~np.isnan(X[:, j])]
+            if not len(v):
+                continue
+            count[j] += len(v)
+            sumsq[j] += float((v * v).sum())
+            lo[j] = min(lo[j], v.min())
+            hi[j] = max(hi[j], v.max())
+            top[j] += np.bincount((_sortable(v) >> np.uint64(64 - RADIX_BITS)).astype(np.int64),
+                                  minlength=1 << RADIX_BITS)
+
+    # One target per (column, middle rank); np.median averages the two middles
+    targets = []
+    for j in range(d):
+        if count[j]:
+            for r in sorted({(count[j] - 1) // 2, count[j] // 2}):
+                cum = np.cumsum(top[j])
+                b = int(np.searchsorted(cum, r, side="right"))
+                targets.append({"col": j, "rank": r - (int(cum[b - 1]) if b else 0),
+                                "prefix": b, "bits": RADIX_BITS, "size": int(top[j][b])})
+
+    # Further passes narrow buckets that are still too large to collect
+    while any(t["size"] > collect_max and t["bits"] < 64 for t in targets):
+        active = [t for t in targets if t["size"] > collect_max and t["bits"] < 64]
+        hists = [np.zeros(1 << RADIX_BITS, dtype=np.int64) for _ in active]
+        for X in iter_numeric(path, cols, chunksize):
+            for t, h in zip(active, hists):
+                v = X[:, t["col"]]
+                k = _sortable(v[~np.isnan(v)])
+                k = k[(k >> np.uint64(64 - t["bits"])) == np.uint64(t["prefix"])]
+                shift = np.uint64(64 - t["bits"] - RADIX_BITS)
+                h += np.bincount(((k >> shift) & np.uint64(0xFFFF)).astype(np.int64), minlength=1 << RADIX_BITS)
+        for t, h in zip(active, hists):
+            cum = np.cumsum(h)
+            b = int(np.searchsorted(cum, t["rank"], side="right"))
+            t["rank"] -= int(cum[b - 1]) if b else 0
+            t["prefix"] = (t["prefix"] << RADIX_BITS) | b
+            t["bits"] += RADIX_BITS
+            t["size"] = int(h[b])
+
+    # Final pass: collect the remaining small buckets and select exactly
+    pending = [t for t in targets if t["bits"] < 64]
+    if pending:
+        buckets = [[] for _ in pending]
+        for X in iter_numeric(path, cols, chunksize):
+            for t, bucket in zip(pending, buckets):
+                v = X[:, t["col"]]
+                v = v[~np.isnan(v)]
+                k = _sortable(v)
+                bucket.append(v[(k >> np.uint64(64 - t["bits"])) == np.uint64(t["prefix"])])
+        for t, bucket in zip(pending, buckets):
+            vals = np.concatenate(bucket)
+            t["value"] = float(np.partition(vals, t["rank"])[t["rank"]])
+    for t in targets:
+        if "value" not in t:
+            t["value"] = _from_sortable(t["prefix"])
+
+    median = np.zeros(d)
+    for j in range(d):
+        vals = [t["value"] for t in targets if t["col"] == j]
+        if vals:
+            median[j] = float(np.mean(vals))
+    return {"rows": rows, "median": median, "count": count, "sumsq": sumsq, "min": lo, "max": hi}
@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from src.pipeline import telemetry
+from src.pipeline.telemetry import log
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+STATE_FILE = ".pipeline_state.json"
+MAX_WORKERS = 4
+
+# Every existing script as a stage. Scripts keep their hard-coded relative
+# INPUT/OUTPUT names, so they are run with the work directory as cwd.
+# "deps" are extra source files folded into the code fingerprint; stages with
+# "default": False (network scrapes) only run when asked for by name.
+STAGES = [
+    {"name": "guids", "script": "src/guids.py",
+     "deps": ["src/pipeline/telemetry.py"],
+     "inputs": [], "outputs": ["matweb_guids_checkpoint.csv"], "default": False},
+    {"name": "scrape", "script": "src/scrape.py",
+     "deps": ["src/pipeline/telemetry.py"],
+     "inputs": ["matweb_guids_checkpoint.csv"], "outputs": ["comprehensive_matweb_data.csv"], "default": False},
+    {"name": "reconstruct", "script": "src/data_cleaning/reconstruct_misaligned.py",
+     "deps": ["src/pipeline/telemetry.py"],
+     "inputs": ["comprehensive_matweb_data.csv"], "outputs": ["dataset_stage1_reconstructed.csv"]},
+    {"name": "units", "script": "src/data_cleaning/unit_parser.py",
+     "deps": ["src/pipeline/telemetry.py"],
+     "inputs": ["dataset_stage1_reconstructed.csv"], "outputs": ["dataset_cleaned_final.csv"]},
+    {"name": "dedup", "script": "src/data_cleaning/dedup_grades.py",
+     "deps": ["src/pipeline/telemetry.py"],
+     "inputs": ["dataset_cleaned_final.csv"], "outputs": ["dataset_deduplicated.csv", "duplicate_groups.csv"]},
+    {"name": "impute", "script": "src/data_cleaning/imputation_pipeline.py",
+     "deps": ["src/pipeline/schema.py", "src/pipeline/telemetry.py"],
+     "inputs": ["dataset_deduplicated.csv"], "outputs": ["dataset_final_imputed.csv"]},
+    {"name": "environment", "script": "src/merge_data/Environment_data.py",
+     "deps": ["src/pipeline/chunked.py", "src/pipeline/telemetry.py"],
+     "inputs": ["dataset_final_imputed.csv"], "outputs": ["materials_env_enriched.csv"]},
+    {"name": "cost", "script": "src/merge_data/Cost_integration.py",
+     "deps": ["src/pipeline/chunked.py", "src/pipeline/telemetry.py"],
+     "inputs": ["materials_env_enriched.csv"], "outputs": ["materials_final_with_price.csv"]},
+    {"name": "rank", "script": "src/ranking/rank.py",
+     "deps": ["src/ranking/pareto.py", "src/ranking/topsis.py", "src/pipeline/chunked.py",
+              "src/pipeline/schema.py", "src/pipeline/telemetry.py"],
+     "inputs": ["materials_final_with_price.csv"], "outputs": ["materials_ranked.csv"]},
+    {"name": "store", "script": "src/pipeline/store.py",
+     "deps": ["src/pipeline/schema.py", "src/pipeline/telemetry.py"],
+     "inputs": ["materials_final_with_price.csv"], "outputs": ["materials_store/header.json"]},
+    {"name": "merge_reference", "script": "src/merge_data/Data_merge.py",
+     "deps": ["src/pipeline/telemetry.py"],
+     "inputs": ["Data.csv"], "outputs": ["materials_enriched.csv"]},
+]
+
+
+def file_hash(path, cache=None):
+    """sha256 of a file, reusing the cached digest while size and mtime are unchanged."""
+    st = os.stat(path)
+    key = str(path)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit and hit["size"] == st.st_size and hit["mtime"] == st.st_mtime_ns:
+            return hit["sha256"]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    if cache is not None:
+        cache[key] = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def stage_fingerprint(stage, workdir, hash_cache):
+    h = hashlib.sha256()
+    for src in [stage["script"]] + stage.get("deps", []):
+        h.update(file_hash(REPO_ROOT / src, hash_cache).encode())
+    h.update(json.dumps(stage.get("config", {}), sort_keys=True).encode())
+    for name in stage["inputs"]:
+        h.update(name.encode())
+        h.update(file_hash(Path(workdir) / name, hash_cache).encode())
+    return h.hexdigest()
+
+
+def load_state(workdir):
+    path = Path(workdir) / STATE_FILE
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {"stages": {}, "hashes": {}}
+
+
+def save_state(workdir, state):
+    with open(Path(workdir) / STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def select_stages(names=None):
+    if not names:
+        return [s for s in STAGES if s.get("default", True)]
+    by_name = {s["name"]: s for s in STAGES}
+    unknown = [n for n in names if n not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stages: {unknown}. Known: {list(by_name)}")
+    return [by_name[n] for n in names]
+
+
+def _upstream(stages):
+    producers = {out: s["name"] for s in stages for out in s["outputs"]}
+    return {s["name"]: {producers[i] for i in s["inputs"] if i in producers} for s in stages}
+
+
+def _run_stage(stage, workdir):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(REPO_ROOT / stage["script"])],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    return proc, time.perf_counter() - t0
+
+
+def run_pipeline(workdir=".", names=None, force=False, jobs=MAX_WORKERS, dry_run=False):
+    """
+    Run the selected stages in dependency order, skipping any stage whose code,
+    config and input hashes match the last successful run, and running
+    independent stages concurrently. Returns {stage: status}.
+    """
+    workdir = Path(workdir)
+    stages = select_stages(names)
+    upstream = _upstream(stages)
+    state = load_state(workdir)
+    cache = state.setdefault("hashes", {})
+    status = {}
+
+    def decide(stage):
+        missing = [i for i in stage["inputs"] if not (workdir / i).exists()]
+        if missing:
+            return "missing_input", None
+        fp = stage_fingerprint(stage, workdir, cache)
+        prev = state["stages"].get(stage["name"], {})
+        outputs_ok = all((workdir / o).exists() for o in stage["outputs"])
+        if not force and outputs_ok and prev.get("fingerprint") == fp:
+            return "cached", fp
+        return "run", fp
+
+    pending = {s["name"]: s for s in stages}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as ex:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                busy = {n for n, _ in running.values()}
+                if any(u in pending or u in busy for u in upstream[name]):
+                    continue
+                if any(status.get(u) in ("failed", "blocked", "missing_input") for u in upstream[name]):
+                    status[name] = "blocked"
+                    del pending[name]
+                    continue
+                decision, fp = decide(stage)
+                del pending[name]
+                if decision != "run" or dry_run:
+                    status[name] = decision if decision != "run" else "would_run"
+                    log(f"[{name}] {status[name]}", stage=name, status=status[name])
+                    continue
+                log(f"[{name}] running {stage['script']}", stage=name, status="running")
+                running[ex.submit(_run_stage, stage, workdir)] = (name, fp)
+
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, fp = running.pop(fut)
+                proc, seconds = fut.result()
+                stage = next(s for s in stages if s["name"] == name)
+                if proc.returncode != 0:
+                    status[name] = "failed"
+                    telemetry.count("stage_failures", stage=name)
+                    log(f"[{name}] FAILED after {seconds:.2f}s\n{proc.stderr.strip()}",
+                        stage=name, status="failed", seconds=round(seconds, 3))
+                    continue
+                status[name] = "ran"
+                state["stages"][name] = {
+                    "fingerprint": fp,
+                    "seconds": round(seconds, 3),
+                    "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "outputs": {o: file_hash(workdir / o, cache) for o in stage["outputs"]
+                                if (workdir / o).exists()},
+                }
+                telemetry.observe("stage_seconds", seconds, buckets=telemetry.SPAN_BUCKETS, stage=name)
+                log(f"[{name}] done in {seconds:.2f}s", stage=name, status="ran", seconds=round(seconds, 3))
+
+    if not dry_run:
+        save_state(workdir, state)
+    return status
+
+
+def print_timings(workdir="."):
+    state = load_state(workdir)
+    for name, info in state["stages"].items():
+        print(f"{name:<16} {info['seconds']:>9.2f}s  {info['finished']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the materials pipeline with cached stages.")
+    parser.add_argument("stages", nargs="*", help="stages to run (default: every offline stage)")
+    parser.add_argument("--workdir", default=".", help="directory holding the pipeline CSVs")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and rerun")
+    parser.add_argument("--jobs", type=int, default=MAX_WORKERS, help="stages run concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would run")
+    parser.add_argument("--timings", action="store_true", help="print last recorded stage timings")
+    parser.add_argument("--list", action="store_true", help="list the declared stages")
+    parser.add_argument("--telemetry", help="append JSON-lines spans/events from every stage here")
+    parser.add_argument("--metrics", help="Prometheus text file per stage; '{job}' becomes the script name")
+    args = parser.parse_args(argv)
+    telemetry.enable(args.telemetry and os.path.abspath(args.telemetry),
+                     args.metrics and os.path.abspath(args.metrics))
+
+    if args.list:
+        for s in STAGES:
+            flag = "" if s.get("default", True) else "  (on request)"
+            print(f"{s['name']:<16} {', '.join(s['inputs']) or '-'} → {', '.join(s['outputs'])}{flag}")
+        return 0
+    if args.timings:
+        print_timings(args.workdir)
+        return 0
+
+    status = run_pipeline(args.workdir, args.stages, args.force, args.jobs, args.dry_run)
+    return 1 if any(v in ("failed", "blocked") for v in status.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
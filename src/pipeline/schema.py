@@ -0,0 +1,216 @@
+import ast
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Columns that stay as text
+TEXT_COLS = ["GUID", "Material Name", "Material Notes"]
+# Low-cardinality strings stored dictionary-encoded
+CATEGORICAL_COLS = ["Categories"]
+# Category lists are rebuilt from Categories into CSR offsets, never kept as Python lists
+LIST_COLS = ["CategoryList", "Category_List", "__categories_list"]
+
+# A float64 column is narrowed when every value survives float32 within this relative error
+FLOAT32_RTOL = 1e-6
+# Columns at least this empty are stored sparse
+SPARSE_MIN_NAN = 0.9
+
+MEMORY_REPORT = "memory_report.jsonl"
+
+
+def split_categories(value):
+    """'Ceramic;Glass' or "['Ceramic', 'Glass']" -> ['Ceramic', 'Glass']."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    s = str(value).strip()
+    if s.startswith("[") and s.endswith("]"):
+        try:
+            return [str(t).strip() for t in ast.literal_eval(s) if str(t).strip()]
+        except (ValueError, SyntaxError):
+            pass
+    return [c.strip() for c in s.split(";") if c.strip()]
+
+
+def category_csr(values, vocab=None):
+    """
+    Category lists as CSR arrays: row i owns codes[offsets[i]:offsets[i + 1]]
+    (in listed order, so position-based weights still apply), codes index vocab.
+    """
+    lists = [split_categories(v) for v in values]
+    if vocab is None:
+        vocab = sorted({c for lst in lists for c in lst})
+    code_of = {c: i for i, c in enumerate(vocab)}
+    lengths = np.fromiter((len(lst) for lst in lists), dtype=np.int64, count=len(lists))
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    codes = np.fromiter((code_of.get(c, -1) for lst in lists for c in lst), dtype=np.int32, count=int(offsets[-1]))
+    return {"offsets": offsets, "codes": codes, "vocab": list(vocab)}
+
+
+def csr_rows(csr):
+    """Row index of every stored code."""
+    return np.repeat(np.arange(len(csr["offsets"]) - 1), np.diff(csr["offsets"]))
+
+
+def csr_membership(csr):
+    """Unique (row, code) pairs: which rows belong to which category."""
+    rows = csr_rows(csr)
+    keep = csr["codes"] >= 0
+    # one int64 key per pair; sorting it orders by row, then code (a plain
+    # sort plus a neighbour test is far cheaper than np.unique here)
+    width = max(len(csr["vocab"]), 1)
+    pairs = np.sort(rows[keep] * width + csr["codes"][keep].astype(np.int64))
+    pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])] if len(pairs) else pairs
+    return pairs // width, pairs % width
+
+
+def csr_lists(csr):
+    vocab = csr["vocab"]
+    off = csr["offsets"]
+    return [[vocab[c] for c in csr["codes"][off[i]:off[i + 1]]] for i in range(len(off) - 1)]
+
+
+def category_means(X, csr):
+    """
+    Per-category column means ignoring NaN, (n_categories, n_cols). Member rows
+    are gathered category by category in row order, column-major, so each sum
+    runs over a contiguous zero-filled column slice exactly as Series.mean()
+    sums it: the means are bit-identical to pandas'.
+    """
+    rows, codes = csr_membership(csr)
+    order = np.argsort(codes, kind="stable")
+    vals = np.asfortranarray(X[rows[order]])
+    seen = ~np.isnan(vals)
+    vals[~seen] = 0.0
+    bounds = np.searchsorted(codes[order], np.arange(len(csr["vocab"]) + 1))
+    sums = np.zeros((len(csr["vocab"]), X.shape[1]))
+    counts = np.zeros_like(sums)
+    for g in np.flatnonzero(np.diff(bounds)):
+        sums[g] = vals[bounds[g]:bounds[g + 1]].sum(axis=0)
+        counts[g] = seen[bounds[g]:bounds[g + 1]].sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _fits_float32(values):
+    v = values[~np.isnan(values)]
+    if not len(v):
+        return True
+    if np.abs(v).max() > np.finfo(np.float32).max:
+        return False
+    back = v.astype(np.float32).astype(np.float64)
+    return bool(np.all(np.abs(back - v) <= FLOAT32_RTOL * np.abs(v)))
+
+
+def plan_schema(df, coerce=False, narrow=True):
+    """
+    Compact dtype for every column. coerce=True treats every other column as
+    numeric with unparsed text read as NaN (what the numeric stages do with
+    pd.to_numeric); narrow=False keeps float64, so values stay bit-identical
+    to a plain float64 load.
+    """
+    plan = {}
+    for col in df.columns:
+        if col in LIST_COLS:
+            plan[col] = "csr"
+        elif col in TEXT_COLS:
+            plan[col] = "object"
+        elif col in CATEGORICAL_COLS:
+            plan[col] = "category"
+        else:
+            coerced = pd.to_numeric(df[col], errors="coerce")
+            if not coerce and (coerced.isna() & df[col].notna()).any():
+                plan[col] = "category"    # unparsed text, e.g. raw metric cells
+                continue
+            values = coerced.values.astype(float)
+            dtype = "float32" if narrow and _fits_float32(values) else "float64"
+            plan[col] = f"Sparse[{dtype}]" if np.isnan(values).mean() >= SPARSE_MIN_NAN else dtype
+    return plan
+
+
+def compact(df, plan=None):
+    """Apply plan_schema; returns the compact frame and the category CSR."""
+    plan = plan or plan_schema(df)
+    out = {}
+    for col in df.columns:
+        kind = plan.get(col, "object")
+        if kind == "csr":
+            continue
+        if kind in ("object", "category"):
+            out[col] = df[col].astype(kind)
+        else:
+            values = pd.to_numeric(df[col], errors="coerce")
+            if kind.startswith("Sparse"):
+                dtype = kind[len("Sparse["):-1]
+                out[col] = values.astype(dtype).astype(pd.SparseDtype(dtype, np.nan))
+            else:
+                out[col] = values.astype(kind)
+    source = df["Categories"] if "Categories" in df.columns else next(
+        (df[c] for c in LIST_COLS if c in df.columns), pd.Series([""] * len(df)))
+    return pd.DataFrame(out, index=df.index), category_csr(source)
+
+
+def load_materials(path, plan=None, **plan_args):
+    """
+    Shared loader: read a stage CSV straight into the compact representation.
+    plan_args (coerce, narrow) go to plan_schema when no plan is given.
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+    return compact(df, plan or plan_schema(df, **plan_args))
+
+
+def _float_values(s):
+    if pd.api.types.is_float_dtype(s.dtype) or isinstance(s.dtype, pd.SparseDtype):
+        return np.asarray(s, dtype=float)
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+
+
+def dense(df, cols=None):
+    """
+    float64 matrix of cols (sparse columns densified, other columns parsed
+    with unparsed text as NaN), for numeric kernels. Column-major like
+    DataFrame.values, so column reductions sum in the same order.
+    """
+    cols = cols or [c for c in df.columns if pd.api.types.is_float_dtype(df[c].dtype)
+                    or isinstance(df[c].dtype, pd.SparseDtype)]
+    out = np.empty((len(df), len(cols)), order="F")
+    for j, c in enumerate(cols):
+        out[:, j] = _float_values(df[c])
+    return out
+
+
+def memory_report(df, csr=None, stage=""):
+    per_col = df.memory_usage(deep=True, index=False)
+    csr_bytes = 0 if csr is None else int(csr["offsets"].nbytes + csr["codes"].nbytes
+                                          + sum(sys.getsizeof(v) for v in csr["vocab"]))
+    return {
+        "stage": stage,
+        "rows": int(len(df)),
+        "cols": int(df.shape[1]),
+        "bytes": int(per_col.sum()) + csr_bytes,
+        "csr_bytes": csr_bytes,
+        "dtypes": {str(k): int(v) for k, v in df.dtypes.astype(str).value_counts().items()},
+        "largest": {str(k): int(v) for k, v in per_col.sort_values(ascending=False).head(5).items()},
+    }
+
+
+def log_memory(report, path=MEMORY_REPORT):
+    with open(path, "a") as f:
+        f.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **report}) + "\n")
+
+
+if __name__ == "__main__":
+    # Compare the plain pandas load with the compact one for each stage file given
+    for path in sys.argv[1:]:
+        plain = pd.read_csv(path)
+        if "CategoryList" in plain.columns:
+            plain["CategoryList"] = plain["CategoryList"].apply(split_categories)
+        before = memory_report(plain, stage=path)
+        frame, csr = load_materials(path)
+        after = memory_report(frame, csr, stage=path)
+        log_memory({**after, "plain_bytes": before["bytes"]})
+        print(f"{path}: {before['bytes'] / 1e6:.2f} MB → {after['bytes'] / 1e6:.2f} MB "
+              f"({before['bytes'] / max(after['bytes'], 1):.1f}x)")
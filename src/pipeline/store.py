@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.pipeline.telemetry import end_span, frame, log, start_span
+
+STORE_VERSION = 1
+INPUT = "materials_final_with_price.csv"
+STORE_DIR = "materials_store"
+HEADER = "header.json"
+
+# Layout of a store directory (all arrays little-endian, opened with mmap):
+#   header.json             schema, row count, dictionaries, source hash
+#   values.npy              numeric property matrix, column-major so a column is contiguous;
+#                           float32 (~1e-6 relative) when every column fits, else float64
+#   text_<i>.bin            UTF-8 bytes of text column i, back to back
+#   text_<i>_offsets.npy    int64 start of each row in text_<i>.bin (n + 1 entries)
+#   text_<i>_valid.npy      uint8, 0 where the cell was empty
+#   cat_<i>_codes.npy       int32 dictionary codes of categorical column i (-1 = missing)
+#   categories_offsets.npy  CSR offsets of the per-row category lists
+#   categories_codes.npy    CSR codes into header["category_vocab"]
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_text(values, out_dir, i):
+    valid = values.notna().values
+    encoded = [str(v).encode("utf-8") if ok else b"" for v, ok in zip(values, valid)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(out_dir / f"text_{i}.bin", "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(out_dir / f"text_{i}_offsets.npy", offsets)
+    np.save(out_dir / f"text_{i}_valid.npy", valid.astype(np.uint8))
+
+
+def write_store(df, path=STORE_DIR, source=None):
+    """
+    Write df as a binary store directory. The directory is built next to its
+    target and swapped in at the end, so readers never see a partial store.
+    """
+    import pandas as pd
+
+    from src.pipeline.schema import LIST_COLS, compact
+
+    frame, csr = compact(df)
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    numeric = [c for c in frame.columns if pd.api.types.is_float_dtype(frame[c].dtype)
+               or isinstance(frame[c].dtype, pd.SparseDtype)]
+    # One matrix dtype: float32 only when every numeric column fits it within
+    # schema.FLOAT32_RTOL (~1e-6 relative), so scores computed from a store can differ
+    # from the CSV's in the last digits (~1e-9 for TOPSIS on the catalog)
+    dtype = "float32" if all(str(frame[c].dtype).count("float32") for c in numeric) else "float64"
+    values = np.empty((len(frame), len(numeric)), dtype=dtype, order="F")
+    for j, c in enumerate(numeric):
+        # a float64 store takes the parsed values, not columns already narrowed to float32
+        col = frame[c] if dtype == "float32" else pd.to_numeric(df[c], errors="coerce")
+        values[:, j] = np.asarray(col, dtype=dtype)
+    np.save(tmp / "values.npy", values)
+
+    columns = []
+    n_text = n_cat = 0
+    for c in df.columns:
+        if c in numeric:
+            columns.append({"name": c, "kind": "numeric", "index": numeric.index(c)})
+        elif c in LIST_COLS:
+            columns.append({"name": c, "kind": "category_list"})
+        elif isinstance(frame[c].dtype, pd.CategoricalDtype):
+            codes = frame[c].cat.codes.values.astype(np.int32)
+            np.save(tmp / f"cat_{n_cat}_codes.npy", codes)
+            columns.append({"name": c, "kind": "categorical", "index": n_cat,
+                            "categories": [str(v) for v in frame[c].cat.categories]})
+            n_cat += 1
+        else:
+            _write_text(frame[c], tmp, n_text)
+            columns.append({"name": c, "kind": "text", "index": n_text})
+            n_text += 1
+
+    np.save(tmp / "categories_offsets.npy", csr["offsets"])
+    np.save(tmp / "categories_codes.npy", csr["codes"])
+
+    header = {
+        "version": STORE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": int(len(df)),
+        "dtype": dtype,
+        "columns": columns,
+        "category_vocab": csr["vocab"],
+        "source": str(source) if source else None,
+        "source_sha256": _sha256(source) if source else None,
+    }
+    # Header goes last: its presence marks a complete store
+    with open(tmp / HEADER, "w") as f:
+        json.dump(header, f, indent=1)
+
+    old = path.with_name(f"{path.name}.old-{os.getpid()}")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return header
+
+
+def _map(path, dtype=np.uint8):
+    # np.memmap refuses empty files
+    return np.memmap(path, dtype=dtype, mode="r") if os.path.getsize(path) else np.zeros(0, dtype=dtype)
+
+
+def open_store(path=STORE_DIR):
+    """
+    Open a store without reading it: every array is a read-only memory map, so
+    opening costs a header parse and worker processes share the page cache.
+    """
+    path = Path(path)
+    with open(path / HEADER) as f:
+        header = json.load(f)
+    if header["version"] != STORE_VERSION:
+        raise ValueError(
+            f"Store version {header['version']} does not match {STORE_VERSION}; rebuild it."
+        )
+    store = {
+        "header": header,
+        "values": np.load(path / "values.npy", mmap_mode="r"),
+        "columns": {c["name"]: c for c in header["columns"]},
+        "numeric": [c["name"] for c in header["columns"] if c["kind"] == "numeric"],
+        "text": {},
+        "categorical": {},
+        "csr": {
+            "offsets": np.load(path / "categories_offsets.npy", mmap_mode="r"),
+            "codes": np.load(path / "categories_codes.npy", mmap_mode="r"),
+            "vocab": header["category_vocab"],
+        },
+    }
+    for c in header["columns"]:
+        if c["kind"] == "text":
+            i = c["index"]
+            store["text"][c["name"]] = {
+                "blob": _map(path / f"text_{i}.bin"),
+                "offsets": np.load(path / f"text_{i}_offsets.npy", mmap_mode="r"),
+                "valid": np.load(path / f"text_{i}_valid.npy", mmap_mode="r"),
+            }
+        elif c["kind"] == "categorical":
+            store["categorical"][c["name"]] = np.load(path / f"cat_{c['index']}_codes.npy", mmap_mode="r")
+    return store
+
+
+def numeric_matrix(store, cols=None):
+    """Numeric columns as a matrix; the full set is the mapped array itself."""
+    if cols is None:
+        return store["values"]
+    idx = [store["columns"][c]["index"] for c in cols]
+    return store["values"][:, idx]
+
+
+def text_values(store, col, rows=None):
+    """Decode a text column (or only the given row positions) to a list of str/None."""
+    t = store["text"][col]
+    rows = range(len(t["offsets"]) - 1) if rows is None else rows
+    off, blob, valid = t["offsets"], t["blob"], t["valid"]
+    return [bytes(blob[off[i]:off[i + 1]]).decode("utf-8") if valid[i] else None for i in rows]
+
+
+def column(store, col):
+    """One column: a zero-copy view for numeric columns, decoded values otherwise."""
+    info = store["columns"][col]
+    if info["kind"] == "numeric":
+        return store["values"][:, info["index"]]
+    if info["kind"] == "text":
+        return text_values(store, col)
+    if info["kind"] == "categorical":
+        import pandas as pd
+
+        return pd.Categorical.from_codes(np.asarray(store["categorical"][col]), info["categories"])
+    from src.pipeline.schema import csr_lists
+
+    return csr_lists(store["csr"])
+
+
+def to_frame(store, cols=None):
+    """Rebuild a DataFrame in the original column order."""
+    import pandas as pd
+
+    cols = cols or [c["name"] for c in store["header"]["columns"]]
+    return pd.DataFrame({c: column(store, c) for c in cols})
+
+
+def load_catalog(path):
+    """
+    (X, numeric column names, category csr) from a store directory or a
+    catalog CSV, so analysis code reads either the same way.
+    """
+    from src.pipeline.schema import CATEGORICAL_COLS, LIST_COLS, TEXT_COLS, category_csr
+
+    if os.path.isdir(path):
+        store = open_store(path)
+        return np.asarray(numeric_matrix(store), dtype=float), list(store["numeric"]), store["csr"]
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    skip = set(TEXT_COLS) | set(CATEGORICAL_COLS) | set(LIST_COLS)
+    num = df.drop(columns=[c for c in df.columns if c in skip]).apply(pd.to_numeric, errors="coerce")
+    cat_col = next((c for c in LIST_COLS + CATEGORICAL_COLS if c in df.columns), None)
+    csr = category_csr(df[cat_col].values if cat_col else [None] * len(df))
+    return num.values.astype(float), list(num.columns), csr
+
+
+def dataset_version(path):
+    """Content hash identifying a catalog CSV or store, for keying derived caches."""
+    if os.path.isdir(path):
+        with open(Path(path) / HEADER) as f:
+            sha = json.load(f).get("source_sha256")
+        return sha or _sha256(Path(path) / "values.npy")
+    return _sha256(path)
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    src = sys.argv[1] if len(sys.argv) > 1 else INPUT
+    out = sys.argv[2] if len(sys.argv) > 2 else STORE_DIR
+    stage = start_span("store")
+    df = pd.read_csv(src, dtype=str, keep_default_na=False, na_values=[""])
+    frame(stage, df, "in")
+    header = write_store(df, out, source=src)
+    end_span(stage)
+    t0 = time.perf_counter()
+    open_store(out)
+    log(f"Saved {out}/ ({header['rows']} rows, {len(header['columns'])} columns, {header['dtype']}); "
+        f"opens in {(time.perf_counter() - t0) * 1e3:.2f} ms")
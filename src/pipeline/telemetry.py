@@ -0,0 +1,240 @@
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Off unless one of these is set (the runner passes them on to every stage):
+#   MATERIALS_TELEMETRY  JSON-lines event log, appended to by every process
+#   MATERIALS_METRICS    Prometheus text file written at exit; "{job}" in the
+#                        path becomes the script name, one file per stage
+TELEMETRY_FILE = os.environ.get("MATERIALS_TELEMETRY") or None
+METRICS_FILE = os.environ.get("MATERIALS_METRICS") or None
+ENABLED = bool(TELEMETRY_FILE or METRICS_FILE)
+
+PREFIX = "materials_"
+JOB = os.path.splitext(os.path.basename(sys.argv[0] if sys.argv and sys.argv[0] else "python"))[0]
+
+# Request latency buckets in seconds (scraper pages take 1-30 s)
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+# Stage / sub-step duration buckets in seconds
+SPAN_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 1800.0)
+
+_NULL = contextlib.nullcontext()
+_lock = threading.Lock()
+_local = threading.local()
+_out = None
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+
+def enable(telemetry_file=None, metrics_file=None):
+    """Turn instrumentation on from code (and for child processes via the environment)."""
+    global TELEMETRY_FILE, METRICS_FILE, ENABLED
+    if telemetry_file:
+        TELEMETRY_FILE = os.environ["MATERIALS_TELEMETRY"] = str(telemetry_file)
+    if metrics_file:
+        METRICS_FILE = os.environ["MATERIALS_METRICS"] = str(metrics_file)
+    ENABLED = bool(TELEMETRY_FILE or METRICS_FILE)
+
+
+def peak_rss_mb():
+    """This process's own peak RSS (VmHWM; ru_maxrss would include the parent's peak)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+def _emit(record):
+    global _out
+    if not TELEMETRY_FILE:
+        return
+    line = json.dumps({"ts": round(time.time(), 3), "pid": os.getpid(), "job": JOB, **record}, default=str)
+    with _lock:
+        if _out is None:
+            _out = open(TELEMETRY_FILE, "a", buffering=1)
+        _out.write(line + "\n")
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def count(name, value=1, **labels):
+    """Add to a counter, e.g. count("scrape_retries")."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge(name, value, **labels):
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record one value in a histogram, e.g. observe("scrape_request_seconds", dt)."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = {"le": tuple(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for i, le in enumerate(h["le"]):
+            if value <= le:
+                h["counts"][i] += 1
+                break
+        h["sum"] += value
+        h["count"] += 1
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def start_span(name, **fields):
+    """Open a timed span (None when disabled). Nested spans are named parent/child."""
+    if not ENABLED:
+        return None
+    stack = _stack()
+    full = f"{stack[-1]['name']}/{name}" if stack else name
+    s = {"name": full, "fields": dict(fields), "t0": time.perf_counter()}
+    stack.append(s)
+    return s
+
+
+def end_span(s, status="ok"):
+    if s is None:
+        return
+    seconds = time.perf_counter() - s["t0"]
+    stack = _stack()
+    if s in stack:
+        stack.remove(s)
+    observe("span_seconds", seconds, buckets=SPAN_BUCKETS, span=s["name"])
+    _emit({"type": "span", "span": s["name"], "status": status, "seconds": round(seconds, 6),
+           "peak_rss_mb": peak_rss_mb(), **s["fields"]})
+
+
+def span(name, **fields):
+    """
+    Context manager form of start_span/end_span. Yields the span (None when
+    disabled), so callers annotate through frame()/annotate(), which accept None.
+    """
+    if not ENABLED:
+        return _NULL
+    return _span(name, fields)
+
+
+@contextlib.contextmanager
+def _span(name, fields):
+    s = start_span(name, **fields)
+    try:
+        yield s
+    except BaseException:
+        end_span(s, "error")
+        raise
+    end_span(s)
+
+
+def annotate(s, **fields):
+    if s is not None:
+        s["fields"].update(fields)
+
+
+def frame(s, df, direction):
+    """Record the row/column count of a frame going into ("in") or out of ("out") a span."""
+    if s is not None:
+        s["fields"][f"rows_{direction}"] = int(df.shape[0])
+        s["fields"][f"cols_{direction}"] = int(df.shape[1]) if len(df.shape) > 1 else 1
+
+
+def log(message, **fields):
+    """print() replacement: same console output, plus a structured event when enabled."""
+    print(message)
+    if ENABLED:
+        stack = _stack()
+        _emit({"type": "log", "span": stack[-1]["name"] if stack else None, "msg": message, **fields})
+
+
+def _labels(labels, extra=()):
+    pairs = [("job", JOB), *labels, *extra]
+    body = ",".join(f"{k}={json.dumps(str(v), ensure_ascii=False)}" for k, v in pairs)
+    return "{" + body + "}"
+
+
+def metrics_text():
+    """Counters, gauges and histograms in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {k: dict(v, counts=list(v["counts"])) for k, v in _histograms.items()}
+    gauges[("peak_rss_bytes", ())] = int((peak_rss_mb() or 0) * 1024 * 1024)
+
+    typed = set()
+    for (name, labels), value in sorted(counters.items()):
+        metric = PREFIX + (name if name.endswith("_total") else name + "_total")
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_labels(labels)} {value}")
+    for (name, labels), value in sorted(gauges.items()):
+        metric = PREFIX + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} gauge")
+            typed.add(metric)
+        lines.append(f"{metric}{_labels(labels)} {value}")
+    for (name, labels), h in sorted(histograms.items()):
+        metric = PREFIX + name
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} histogram")
+            typed.add(metric)
+        cumulative = 0
+        for le, n in zip(h["le"], h["counts"]):
+            cumulative += n
+            lines.append(f"{metric}_bucket{_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{metric}_bucket{_labels(labels, [('le', '+Inf')])} {h['count']}")
+        lines.append(f"{metric}_sum{_labels(labels)} {h['sum']}")
+        lines.append(f"{metric}_count{_labels(labels)} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path=None):
+    path = (path or METRICS_FILE).replace("{job}", JOB)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(metrics_text())
+    os.replace(tmp, path)    # textfile collectors must never see a half-written file
+
+
+@atexit.register
+def _shutdown():
+    if not ENABLED:
+        return
+    if METRICS_FILE:
+        write_metrics()
+    if TELEMETRY_FILE:
+        _emit({"type": "exit", "peak_rss_mb": peak_rss_mb(),
+               "counters": [{"name": n, "labels": dict(lb), "value": c} for (n, lb), c in _counters.items()]})
+    if _out is not None:
+        _out.close()
@@ -0,0 +1,112 @@
+from bisect import bisect_right
+
+import numpy as np
+
+# Points compared at once against the skyline window in the >= 3 objective case
+BLOCK_SIZE = 256
+
+
+def _to_minimisation(X, dirs):
+    """Flip maximised objectives and push missing values to the worst end."""
+    Y = np.asarray(X, dtype=float) * -np.asarray(dirs, dtype=float)
+    Y[np.isnan(Y)] = np.inf
+    return Y
+
+
+def _layers_2d(Y, max_fronts):
+    # Y is unique and lexicographically sorted: a point can only be dominated by
+    # points before it, and the tail (lowest y1) of every front stays sorted, so
+    # each point lands on the first front whose tail is strictly above its y1.
+    tails = []
+    fronts = np.empty(len(Y), dtype=int)
+    for i, y1 in enumerate(Y[:, 1]):
+        k = bisect_right(tails, y1)
+        if k == len(tails):
+            tails.append(y1)
+        else:
+            tails[k] = y1
+        fronts[i] = k
+    if max_fronts is not None:
+        fronts[fronts >= max_fronts] = -1
+    return fronts
+
+
+def _skyline(Y):
+    # Block-nested-loop over presorted unique rows: a dominating point always
+    # sorts first, so the window only ever grows and never needs eviction.
+    keep = np.zeros(len(Y), dtype=bool)
+    window = Y[:0]
+    for start in range(0, len(Y), BLOCK_SIZE):
+        block = Y[start:start + BLOCK_SIZE]
+        if len(window):
+            alive = ~(window[None, :, :] <= block[:, None, :]).all(axis=2).any(axis=1)
+        else:
+            alive = np.ones(len(block), dtype=bool)
+        idx = np.flatnonzero(alive)
+        cand = block[idx]
+        dom = (cand[None, :, :] <= cand[:, None, :]).all(axis=2)
+        np.fill_diagonal(dom, False)
+        idx = idx[~dom.any(axis=1)]
+        keep[start + idx] = True
+        window = np.vstack([window, block[idx]])
+    return keep
+
+
+def _layers_nd(Y, max_fronts):
+    fronts = np.full(len(Y), -1, dtype=int)
+    remaining = np.arange(len(Y))
+    f = 0
+    while len(remaining) and (max_fronts is None or f < max_fronts):
+        mask = _skyline(Y[remaining])
+        fronts[remaining[mask]] = f
+        remaining = remaining[~mask]
+        f += 1
+    return fronts
+
+
+def non_dominated_sort(X, dirs, max_fronts=None):
+    """
+    Pareto layer of every row of X (0 = non-dominated front).
+    dirs holds +1 for maximised and -1 for minimised objectives. Rows beyond
+    max_fronts get -1. Identical rows always share a front.
+    """
+    Y = _to_minimisation(X, dirs)
+    if len(Y) == 0:
+        return np.empty(0, dtype=int)
+    if Y.shape[1] == 1:
+        uniq, inverse = np.unique(Y[:, 0], return_inverse=True)
+        fronts = np.arange(len(uniq))
+        if max_fronts is not None:
+            fronts[fronts >= max_fronts] = -1
+        return fronts[inverse.ravel()]
+
+    uniq, inverse = np.unique(Y, axis=0, return_inverse=True)
+    if uniq.shape[1] == 2:
+        fronts = _layers_2d(uniq, max_fronts)
+    else:
+        fronts = _layers_nd(uniq, max_fronts)
+    return fronts[inverse.ravel()]
+
+
+def pareto_front(X, dirs):
+    return non_dominated_sort(X, dirs, max_fronts=1) == 0
+
+
+def pareto_layers(df, objectives, max_fronts=None):
+    """objectives maps column name -> +1 (maximise) / -1 (minimise)."""
+    cols = [c for c in objectives if c in df.columns]
+    if not cols:
+        raise ValueError("None of the requested objectives are present in the table.")
+    import pandas as pd
+
+    X = df[cols].apply(pd.to_numeric, errors="coerce").values
+    dirs = np.array([objectives[c] for c in cols], dtype=float)
+    return non_dominated_sort(X, dirs, max_fronts=max_fronts)
+
+
+def restrict_to_fronts(df, objectives, n_fronts):
+    """Rows on the first n_fronts Pareto layers, with a Pareto_Front column."""
+    fronts = pareto_layers(df, objectives, max_fronts=n_fronts)
+    out = df.loc[fronts >= 0].copy()
+    out["Pareto_Front"] = fronts[fronts >= 0]
+    return out
@@ -0,0 +1,176 @@
+import numpy as np
+
+from src.pipeline.chunked import CHUNKSIZE, column_summary
+from src.pipeline.telemetry import annotate, end_span, frame, log, start_span
+from src.ranking.pareto import non_dominated_sort
+from src.ranking.topsis import (
+    TOPSIS_COLS, median_impute, topsis_apply, topsis_directions, topsis_params,
+    topsis_weights, weighted_scores,
+)
+
+INPUT = "materials_final_with_price.csv"
+OUTPUT = "materials_ranked.csv"
+
+# Pareto layers scored by default (None = score all). The pre-filter is opt-in:
+# it drops every row past those layers, so only the first n_fronts positions
+# of a filtered ranking are guaranteed to match the full one
+N_FRONTS = None
+
+# Rows kept by the out-of-core ranking (None = all, which is not memory-bounded)
+TOP_K = 1000
+
+
+def rank_matrix(X, cols, weights=None, n_fronts=N_FRONTS, method="topsis"):
+    """
+    numpy core of rank_materials, for callers that already hold the imputed
+    matrix (e.g. the memory-mapped store) and should not pay for pandas.
+    Returns row positions best-first with their scores and Pareto fronts.
+    """
+    dirs = topsis_directions(cols)
+    w = topsis_weights(cols, weights)
+
+    if n_fronts is None:
+        rows = np.arange(len(X))
+        fronts = None
+    else:
+        fronts = non_dominated_sort(X, dirs, max_fronts=n_fronts)
+        rows = np.flatnonzero(fronts >= 0)
+        fronts = fronts[rows]
+
+    if method == "topsis":
+        params = topsis_params(X, w, dirs)
+    elif method == "weighted":
+        params = _weighted_params(X.min(axis=0), X.max(axis=0), w, dirs)
+    else:
+        raise ValueError(f"Unknown ranking method: {method}")
+    score_col, score = _score(X[rows], params, method)
+
+    order = np.argsort(-score, kind="stable")
+    return {
+        "rows": rows[order],
+        "score": score[order],
+        "score_col": score_col,
+        "fronts": None if fronts is None else fronts[order],
+    }
+
+
+def rank_materials(df, cols=None, weights=None, n_fronts=N_FRONTS, method="topsis"):
+    """
+    Score materials on cols and return them best-first.
+    n_fronts=k scores only the first k Pareto layers. Normalisation and ideal
+    points come from the full table, so a material keeps the same score either
+    way, and since neither method ranks a dominated material above the one
+    dominating it, a material in the full top k sits on one of the first k
+    layers: the first k positions are exact, later ones are not (the rest of
+    the full ranking is dropped, not reordered).
+    """
+    from src.pipeline.schema import dense
+
+    cols = [c for c in (cols or TOPSIS_COLS) if c in df.columns]
+    if not cols:
+        raise ValueError("No ranking columns found in the table.")
+
+    X = median_impute(dense(df, cols))
+    res = rank_matrix(X, cols, weights, n_fronts, method)
+
+    ranking = df[["Material Name"]].iloc[res["rows"]].copy()
+    if res["fronts"] is not None:
+        ranking["Pareto_Front"] = res["fronts"]
+    for i, c in enumerate(cols):
+        ranking[c] = X[res["rows"], i]
+    ranking[res["score_col"]] = res["score"]
+    return ranking
+
+
+def _weighted_params(lo, hi, w, dirs):
+    # Direction-aware weighted sum on column-normalised values
+    norm = np.maximum(np.abs(lo), np.abs(hi))
+    norm[norm == 0] = 1.0
+    return {"norm": norm, "weights": w * dirs}
+
+
+def _score(X, params, method):
+    if method == "topsis":
+        return "TOPSIS_score", topsis_apply(X, params)
+    return "Weighted_score", weighted_scores(X / params["norm"], params["weights"])
+
+
+def rank_csv_chunked(path, chunksize, cols=None, weights=None, top_k=TOP_K, method="topsis"):
+    """
+    Out-of-core version of rank_materials(n_fronts=None) for tables that do not
+    fit in memory. Pass one gathers exact medians, column norms and extremes;
+    pass two scores chunk by chunk and merges a running top-k. The Pareto
+    pre-filter needs the whole table and is not applied here.
+    """
+    import pandas as pd
+
+    header = pd.read_csv(path, nrows=0).columns
+    cols = [c for c in (cols or TOPSIS_COLS) if c in header]
+    if not cols:
+        raise ValueError("No ranking columns found in the table.")
+    dirs = topsis_directions(cols)
+    w = topsis_weights(cols, weights)
+
+    # Pass 1: imputed-column statistics without materialising the matrix
+    stats = column_summary(path, cols, chunksize)
+    med = stats["median"]
+    missing = stats["rows"] - stats["count"]
+    lo = np.where(missing > 0, np.minimum(stats["min"], med), stats["min"])
+    hi = np.where(missing > 0, np.maximum(stats["max"], med), stats["max"])
+    if method == "topsis":
+        norm = np.sqrt(stats["sumsq"] + missing * med ** 2)
+        norm[norm == 0] = 1.0
+        v_lo, v_hi = lo / norm * w, hi / norm * w
+        params = {
+            "norm": norm,
+            "weights": w,
+            "ideal_best": np.where(dirs == 1, v_hi, v_lo),
+            "ideal_worst": np.where(dirs == 1, v_lo, v_hi),
+        }
+    elif method == "weighted":
+        params = _weighted_params(lo, hi, w, dirs)
+    else:
+        raise ValueError(f"Unknown ranking method: {method}")
+
+    # Pass 2: score and keep the running best top_k rows
+    best = None
+    usecols = ["Material Name"] + cols
+    for chunk in pd.read_csv(path, usecols=lambda c: c in set(usecols), chunksize=chunksize):
+        X = chunk.reindex(columns=cols).apply(pd.to_numeric, errors="coerce").values.astype(float)
+        X = np.where(np.isnan(X), med, X)
+        score_col, score = _score(X, params, method)
+        part = pd.DataFrame({"Material Name": chunk["Material Name"].values})
+        for i, c in enumerate(cols):
+            part[c] = X[:, i]
+        part[score_col] = score
+        if top_k is not None:
+            part = part.nlargest(top_k, score_col, keep="first")
+        best = part if best is None else pd.concat([best, part], ignore_index=True)
+        if top_k is not None:
+            best = best.nlargest(top_k, score_col, keep="first")
+    if best is None:
+        return pd.DataFrame(columns=usecols)
+    return best.sort_values(best.columns[-1], ascending=False, kind="stable").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from src.pipeline.schema import load_materials, log_memory, memory_report
+
+    stage = start_span("rank", chunksize=CHUNKSIZE)
+    if CHUNKSIZE:
+        ranking = rank_csv_chunked(INPUT, CHUNKSIZE)
+        ranking.to_csv(OUTPUT, index=False)
+        frame(stage, ranking, "out")
+        end_span(stage)
+        log(f"Ranked top {len(ranking)} materials (chunks of {CHUNKSIZE}) → {OUTPUT}")
+    else:
+        df, categories = load_materials(INPUT, coerce=True, narrow=False)
+        frame(stage, df, "in")
+        report = memory_report(df, categories, stage="rank")
+        log_memory(report)
+        annotate(stage, frame_bytes=report["bytes"])
+        ranking = rank_materials(df)
+        ranking.to_csv(OUTPUT, index=False)
+        frame(stage, ranking, "out")
+        end_span(stage)
+        log(f"Ranked {len(ranking)} of {len(df)} materials → {OUTPUT}")
@@ -0,0 +1,77 @@
+import numpy as np
+
+# Objectives used by the ranking cells in Analysis.ipynb / ML_pipeline.ipynb
+TOPSIS_COLS = [
+    "UTS",
+    "Elastic Modulus",
+    "Strength_to_Weight",
+    "Specific_Stiffness",
+    "Thermal Conductivity",
+    "Density",
+    "Cost_USD_per_kg",
+    "CO2_kg_per_kg",
+]
+
+# Lower is better for these, higher is better for everything else
+COST_COLS = ["Density", "Cost_USD_per_kg", "CO2_kg_per_kg"]
+
+
+def topsis_directions(cols):
+    return np.array([-1.0 if c in COST_COLS else 1.0 for c in cols])
+
+
+def topsis_weights(cols, overrides=None):
+    """Default criterion weights from the notebooks, normalised to sum 1."""
+    overrides = overrides or {}
+    weights = []
+    for c in cols:
+        if c in overrides:
+            weights.append(float(overrides[c]))
+        elif c in ["UTS", "Elastic Modulus", "Strength_to_Weight", "Specific_Stiffness"]:
+            weights.append(1.0)
+        elif c == "Thermal Conductivity":
+            weights.append(0.9)
+        elif c in ["Cost_USD_per_kg", "CO2_kg_per_kg"]:
+            weights.append(0.8)
+        else:
+            weights.append(0.6)
+    w = np.array(weights, dtype=float)
+    return w / w.sum()
+
+
+def median_impute(X):
+    X = np.array(X, dtype=float)
+    med = np.nanmedian(X, axis=0)
+    med = np.where(np.isnan(med), 0.0, med)
+    rows, cols = np.where(np.isnan(X))
+    X[rows, cols] = med[cols]
+    return X
+
+
+def topsis_params(X, weights, dirs):
+    """Column norms and ideal points; everything needed to score a row later."""
+    norm = np.linalg.norm(X, axis=0)
+    norm[norm == 0] = 1.0
+    V = X / norm * weights
+    return {
+        "norm": norm,
+        "weights": np.asarray(weights, dtype=float),
+        "ideal_best": np.where(dirs == 1, V.max(axis=0), V.min(axis=0)),
+        "ideal_worst": np.where(dirs == 1, V.min(axis=0), V.max(axis=0)),
+    }
+
+
+def topsis_apply(X, params):
+    V = X / params["norm"] * params["weights"]
+    d_pos = np.linalg.norm(V - params["ideal_best"], axis=1)
+    d_neg = np.linalg.norm(V - params["ideal_worst"], axis=1)
+    return d_neg / (d_pos + d_neg + 1e-12)
+
+
+def topsis_scores(X, weights, dirs):
+    return topsis_apply(X, topsis_params(X, weights, dirs))
+
+
+def weighted_scores(X, weights):
+    """Plain weighted sum (the Engineering_Score cell in ML_pipeline.ipynb)."""
+    return (X * weights).sum(axis=1)
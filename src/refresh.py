@@ -0,0 +1,299 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.pipeline.telemetry import count, log, observe, span
+from src.scrape import (BASE_URL, GUIDS_FILE, MAX_CONCURRENT_SCRAPERS, MAX_RETRIES, OUTPUT_FILE,
+                        RETRY_PAUSE_SECONDS, SCRAPING_DELAY_RANGE, extract_material_properties)
+
+STATE_FILE = 'matweb_refresh_state.csv'
+CHANGES_FILE = 'matweb_changes.csv'
+
+# Revisit schedule: a datasheet is due once it is interval_days old. The
+# interval halves when a re-fetch finds a change and grows when it does not,
+# so volatile sheets are checked often and stable ones rarely.
+BASE_INTERVAL_DAYS = 30
+MIN_INTERVAL_DAYS = 7
+MAX_INTERVAL_DAYS = 180
+INTERVAL_GROWTH = 1.5
+# Re-fetches per run (new GUIDs are always fetched, outside this budget)
+REFRESH_BUDGET = 250
+# A GUID must be missing from this many consecutive GUID collections before it
+# is reported removed (one failed search segment should not delete materials)
+REMOVE_AFTER_MISSES = 2
+
+STATE_COLS = ['GUID', 'first_seen', 'last_fetched', 'last_changed', 'interval_days',
+              'content_hash', 'etag', 'last_modified', 'misses', 'status']
+GUID_RE = re.compile(r'^[0-9a-f]{32}$')
+DAY = 86400.0
+
+
+def record_hash(record):
+    """
+    sha256 of a parsed datasheet (GUID excluded). Hashing the extracted fields
+    rather than the page means ads, session tokens and layout changes around
+    pnlMaterialData never count as a change.
+    """
+    body = {k: v for k, v in record.items() if k != 'GUID' and v not in (None, '')}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _raw_guids(path=OUTPUT_FILE):
+    """GUIDs at the start of the raw scrape's lines (wrapped continuation lines have none)."""
+    guids = []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        next(f, None)
+        for line in f:
+            first = line.split(',', 1)[0].strip()
+            if GUID_RE.match(first):
+                guids.append(first)
+    return guids
+
+
+def load_state(path=STATE_FILE, raw_path=OUTPUT_FILE):
+    """
+    Per-GUID refresh state. Without a state file it is seeded from the raw
+    scrape: those rows count as fetched when the file was written and have no
+    content hash yet, so their first re-fetch is reported as changed (which
+    also replaces the original, often misaligned, raw line).
+    """
+    if os.path.exists(path):
+        state = pd.read_csv(path, dtype={'GUID': str, 'content_hash': str, 'etag': str,
+                                         'last_modified': str, 'status': str},
+                            keep_default_na=False)
+        return state.set_index('GUID', drop=False)
+    guids = list(dict.fromkeys(_raw_guids(raw_path))) if os.path.exists(raw_path) else []
+    fetched = os.path.getmtime(raw_path) if guids else 0.0
+    state = pd.DataFrame({
+        'GUID': guids, 'first_seen': fetched, 'last_fetched': fetched, 'last_changed': fetched,
+        'interval_days': float(BASE_INTERVAL_DAYS), 'content_hash': '', 'etag': '', 'last_modified': '',
+        'misses': 0, 'status': 'active',
+    }, columns=STATE_COLS)
+    return state.set_index('GUID', drop=False)
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    state[STATE_COLS].to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def plan_refresh(state, current_guids, now=None, budget=REFRESH_BUDGET):
+    """
+    Diff the freshly collected GUID set against the state and pick the
+    re-fetches for this run. Returns added GUIDs, GUIDs now confirmed
+    removed, and the due GUIDs in priority order (most overdue relative to
+    their own interval first), capped at budget. Updates miss counts in place;
+    a returning GUID starts again from zero misses.
+    """
+    now = time.time() if now is None else now
+    current = set(current_guids)
+    active = state[state['status'] == 'active']
+    known = set(state.index)
+
+    added = [g for g in current_guids if g not in known]
+    returned = [g for g in current if g in known and state.at[g, 'status'] != 'active']
+    state.loc[returned, 'misses'] = 0
+
+    missing = ~active.index.isin(list(current))
+    state.loc[active.index[~missing], 'misses'] = 0
+    state.loc[active.index[missing], 'misses'] = active.loc[missing, 'misses'].astype(int) + 1
+    removed = [g for g in active.index[missing] if state.at[g, 'misses'] >= REMOVE_AFTER_MISSES]
+
+    present = active[~missing]
+    overdue = (now - present['last_fetched'].astype(float)) / (present['interval_days'].astype(float) * DAY)
+    overdue = overdue[overdue >= 1.0].sort_values(ascending=False, kind='stable')
+    due = list(overdue.index[:budget])
+    return {'added': list(dict.fromkeys(added + returned)), 'removed': removed, 'due': due}
+
+
+def fetch_datasheet(session, guid, etag='', last_modified=''):
+    """
+    One conditional GET of a datasheet. Returns ("not_modified", None, validators),
+    ("ok", html, validators) or ("banned", None, {}); raises on network errors.
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    started = time.perf_counter()
+    response = session.get(f"{BASE_URL}/search/DataSheet.aspx?MatGUID={guid}", headers=headers, timeout=30)
+    observe("refresh_request_seconds", time.perf_counter() - started)
+    if response.status_code == 304:
+        count("refresh_requests", status="not_modified")
+        return 'not_modified', None, {}
+    response.raise_for_status()
+    count("refresh_requests", status="ok")
+    count("refresh_bytes", len(response.content))
+    validators = {'etag': response.headers.get('ETag', ''), 'last_modified': response.headers.get('Last-Modified', '')}
+    if "Your IP Address has been restricted" in response.text:
+        count("refresh_ban_events")
+        return 'banned', None, {}
+    return 'ok', response.text, validators
+
+
+def _fetch_one(session, guid, row, stop):
+    for attempt in range(1, MAX_RETRIES + 1):
+        if stop.is_set():
+            return guid, 'stopped', None, {}
+        time.sleep(random.uniform(*SCRAPING_DELAY_RANGE))
+        try:
+            status, html, validators = fetch_datasheet(
+                session, guid, row.get('etag', '') if row is not None else '',
+                row.get('last_modified', '') if row is not None else '')
+        except Exception as e:
+            if attempt < MAX_RETRIES:
+                count("refresh_retries")
+            log(f"ERROR: {e}. Attempt {attempt} for {guid} failed. Pausing {RETRY_PAUSE_SECONDS}s...", guid=guid)
+            time.sleep(RETRY_PAUSE_SECONDS)
+            continue
+        if status == 'banned':
+            stop.set()
+            log("!!! IP RESTRICTED. Stopping the refresh. !!!", guid=guid)
+            return guid, status, None, {}
+        if status == 'not_modified':
+            return guid, status, None, validators
+        with span("parse"):
+            record = extract_material_properties(html, guid)
+        return guid, status, record, validators
+    count("refresh_failures")
+    return guid, 'failed', None, {}
+
+
+def run_refresh(session, current_guids, state, budget=REFRESH_BUDGET, now=None):
+    """
+    Fetch new GUIDs and the due re-fetches, update state in place and return
+    the change records: full rows for added / changed datasheets and GUID-only
+    rows for removed ones, each tagged in a "Change" column.
+    """
+    now = time.time() if now is None else now
+    plan = plan_refresh(state, current_guids, now, budget)
+    log(f"Refresh plan: {len(plan['added'])} new, {len(plan['due'])} due for re-fetch, "
+        f"{len(plan['removed'])} removed")
+
+    jobs = [(g, None) for g in plan['added']] + [(g, state.loc[g].to_dict()) for g in plan['due']]
+    stop = threading.Event()
+    changes = [{'Change': 'removed', 'GUID': g} for g in plan['removed']]
+    state.loc[plan['removed'], 'status'] = 'removed'
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SCRAPERS) as executor:
+        results = list(executor.map(lambda job: _fetch_one(session, job[0], job[1], stop), jobs))
+
+    unchanged = 0
+    for guid, status, record, validators in results:
+        if status in ('failed', 'stopped', 'banned'):
+            continue
+        if guid not in state.index:
+            state.loc[guid] = {'GUID': guid, 'first_seen': now, 'last_changed': now,
+                               'interval_days': float(BASE_INTERVAL_DAYS), 'content_hash': '',
+                               'etag': '', 'last_modified': '', 'misses': 0, 'status': 'active'}
+            kind = 'added'
+        elif state.at[guid, 'status'] != 'active':
+            kind = 'added'
+        else:
+            kind = 'changed'
+        state.at[guid, 'status'] = 'active'
+        state.at[guid, 'misses'] = 0
+        state.at[guid, 'last_fetched'] = now
+        interval = float(state.at[guid, 'interval_days'])
+
+        digest = record_hash(record) if record is not None else state.at[guid, 'content_hash']
+        if kind == 'changed' and (status == 'not_modified' or digest == state.at[guid, 'content_hash']):
+            unchanged += 1
+            count("refresh_unchanged")
+            state.at[guid, 'interval_days'] = min(MAX_INTERVAL_DAYS, interval * INTERVAL_GROWTH)
+        else:
+            count("refresh_changes", kind=kind)
+            state.at[guid, 'last_changed'] = now
+            state.at[guid, 'interval_days'] = max(MIN_INTERVAL_DAYS, interval / 2) if kind == 'changed' \
+                else float(BASE_INTERVAL_DAYS)
+            changes.append({'Change': kind, **record})
+        state.at[guid, 'content_hash'] = digest
+        if validators.get('etag') or validators.get('last_modified'):
+            state.at[guid, 'etag'] = validators.get('etag', '')
+            state.at[guid, 'last_modified'] = validators.get('last_modified', '')
+
+    log(f"Fetched {sum(r[1] in ('ok', 'not_modified') for r in results)}/{len(jobs)} datasheets: "
+        f"{sum(c['Change'] == 'added' for c in changes)} added, "
+        f"{sum(c['Change'] == 'changed' for c in changes)} changed, {unchanged} unchanged, "
+        f"{len(plan['removed'])} removed")
+    return changes
+
+
+def save_changes(changes, path=CHANGES_FILE):
+    cols = ['Change', 'GUID'] + [k for k in dict.fromkeys(k for c in changes for k in c) if k not in ('Change', 'GUID')]
+    pd.DataFrame(changes, columns=cols).to_csv(path, index=False)
+
+
+def apply_changes(changes, raw_path=OUTPUT_FILE):
+    """
+    Merge change records into the raw scrape so the cleaning stages see them:
+    lines of changed and removed GUIDs (with their wrapped continuation lines)
+    are dropped, untouched lines are kept byte for byte, and added / changed
+    records are appended in the file's header column order.
+    """
+    drop = {c['GUID'] for c in changes if c['Change'] in ('changed', 'removed')}
+    fresh = [c for c in changes if c['Change'] in ('added', 'changed')]
+    tmp = f"{raw_path}.{os.getpid()}.tmp"
+    with open(raw_path, encoding='utf-8', errors='replace', newline='') as src, \
+            open(tmp, 'w', encoding='utf-8', newline='') as out:
+        header_line = next(src)
+        header = next(csv.reader([header_line]))
+        out.write(header_line)
+        keep = True
+        for line in src:
+            first = line.split(',', 1)[0].strip()
+            if GUID_RE.match(first):
+                keep = first not in drop
+            if keep:
+                out.write(line)
+        writer = csv.writer(out, lineterminator='\n')
+        for record in fresh:
+            writer.writerow([record.get(c, '') for c in header])
+    os.replace(tmp, raw_path)
+    return {'dropped': len(drop), 'appended': len(fresh)}
+
+
+def refresh_catalog(budget=REFRESH_BUDGET, apply=True):
+    """
+    One refresh run. With apply=False it is a dry run: the change file is
+    written but the state is not advanced, so the same changes are found
+    again (and reach the raw scrape) on the next applied run.
+    """
+    from src.guids import SESSION
+
+    if not os.path.exists(GUIDS_FILE):
+        log(f"Error: GUID checkpoint file not found at {GUIDS_FILE}.")
+        return None
+    current = pd.read_csv(GUIDS_FILE, dtype=str)['GUID'].tolist()
+    state = load_state()
+    changes = run_refresh(SESSION, current, state, budget)
+    save_changes(changes)
+    if apply and changes and os.path.exists(OUTPUT_FILE):
+        merged = apply_changes(changes)
+        log(f"Updated {OUTPUT_FILE}: {merged['dropped']} records replaced or removed, "
+            f"{merged['appended']} appended")
+    if apply:
+        save_state(state)
+    log(f"Saved {len(changes)} change records to {CHANGES_FILE}")
+    return changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the scraped catalog: new, changed and removed datasheets only.")
+    parser.add_argument("--budget", type=int, default=REFRESH_BUDGET, help="re-fetches of known datasheets this run")
+    parser.add_argument("--no-apply", action="store_true",
+                        help=f"dry run: only write {CHANGES_FILE}, leave {OUTPUT_FILE} and {STATE_FILE} alone")
+    args = parser.parse_args()
+    with span("refresh"):
+        refresh_catalog(args.budget, apply=not args.no_apply)
@@ -1,5 +1,4 @@
 import asyncio
-from playwright.async_api import async_playwright
 import pandas as pd
 import time
 import random
@@ -7,6 +6,8 @@ import os
 from bs4 import BeautifulSoup
 import re
 
+from src.pipeline.telemetry import count, log, observe, span
+
 # Configuration
 BASE_URL = "https://www.matweb.com"
 GUIDS_FILE = 'matweb_guids_checkpoint.csv'
@@ -124,37 +125,51 @@ async def scrape_single_material_concurrent(browser, guid_index, guid, total_gui
     
     for attempt in range(1, MAX_RETRIES + 1):
         wait_time = random.uniform(*SCRAPING_DELAY_RANGE)
-        print(f"[{guid_index+1}/{total_guids}] Waiting {wait_time:.2f}s...")
+        log(f"[{guid_index+1}/{total_guids}] Waiting {wait_time:.2f}s...")
         await asyncio.sleep(wait_time) 
 
+        started = time.perf_counter()
         try:
             # Navigate and Wait for load
             await page.goto(material_url, wait_until="networkidle", timeout=30000)
             
             content = await page.content()
+            observe("scrape_request_seconds", time.perf_counter() - started)
+            count("scrape_bytes", len(content.encode("utf-8")))
             if "Your IP Address has been restricted" in content:
-                print(f"!!! IP RESTRICTED. Halting this job. !!!")
+                count("scrape_ban_events")
+                log(f"!!! IP RESTRICTED. Halting this job. !!!", guid=str(guid))
                 return {'status': 'IP_BANNED'}
             
             # Success: Extract data
-            material_info = extract_material_properties(content, str(guid))
-            print(f"SUCCESS (Attempt {attempt}): {material_info.get('Material Name', 'N/A')}")
+            with span("parse"):
+                material_info = extract_material_properties(content, str(guid))
+            count("scrape_requests", status="ok")
+            log(f"SUCCESS (Attempt {attempt}): {material_info.get('Material Name', 'N/A')}")
             await page.close() 
             return material_info
             
         except Exception as e:
-            print(f"ERROR: {e}. Attempt {attempt} failed. Pausing thread for {RETRY_PAUSE_SECONDS}s...")
+            observe("scrape_request_seconds", time.perf_counter() - started)
+            count("scrape_requests", status="error")
+            if attempt < MAX_RETRIES:
+                count("scrape_retries")
+            log(f"ERROR: {e}. Attempt {attempt} failed. Pausing thread for {RETRY_PAUSE_SECONDS}s...", guid=str(guid))
             await asyncio.sleep(RETRY_PAUSE_SECONDS) 
             continue 
             
     await page.close() 
-    print(f"FAILED: Max retries ({MAX_RETRIES}) reached for {guid}.")
+    count("scrape_failures")
+    log(f"FAILED: Max retries ({MAX_RETRIES}) reached for {guid}.", guid=str(guid))
     return {'status': 'MAX_RETRIES_FAILED'}
 
 
 async def playwright_scraper_manager():
+    # Imported here so the parsing helpers above can be reused on saved HTML without a browser stack
+    from playwright.async_api import async_playwright
+
     if not os.path.exists(GUIDS_FILE):
-        print(f"Error: GUID checkpoint file not found at {GUIDS_FILE}.")
+        log(f"Error: GUID checkpoint file not found at {GUIDS_FILE}.")
         return
 
     guids_df = pd.read_csv(GUIDS_FILE)
@@ -180,9 +195,9 @@ async def playwright_scraper_manager():
     total_jobs = len(jobs)
     
     
-    print("Initializing Full Phase 2 Run ")
-    print(f"Total GUIDs remaining to process: {total_jobs}")
-    print(f"Concurrency Level: {MAX_CONCURRENT_SCRAPERS} workers")
+    log("Initializing Full Phase 2 Run ")
+    log(f"Total GUIDs remaining to process: {total_jobs}")
+    log(f"Concurrency Level: {MAX_CONCURRENT_SCRAPERS} workers")
     
     checkpoint_list = []
 
@@ -192,7 +207,7 @@ async def playwright_scraper_manager():
 
         # CRITICAL: Initial Delay
         initial_wait = random.uniform(50, 100) 
-        print(f"\n*** CRITICAL: Waiting {initial_wait:.2f}s before starting first request. ***")
+        log(f"\n*** CRITICAL: Waiting {initial_wait:.2f}s before starting first request. ***")
         await asyncio.sleep(initial_wait)
 
         # Create tasks for all jobs
@@ -209,7 +224,7 @@ async def playwright_scraper_manager():
                 status = result.get('status')
                 
                 if status == 'IP_BANNED':
-                    print("\nIMMEDIATE STOP: IP BAN DETECTED. Shutting down browser.")
+                    log("\nIMMEDIATE STOP: IP BAN DETECTED. Shutting down browser.")
                     await browser.close()
                     save_to_checkpoint(checkpoint_list)
                     return 
@@ -219,7 +234,8 @@ async def playwright_scraper_manager():
                     
                     # Checkpoint Logic (Save every 50 records)
                     if len(checkpoint_list) >= 50:
-                        print(f"\nCHECKPOINT: Saving 50 records to CSV")
+                        log(f"\nCHECKPOINT: Saving 50 records to CSV")
+                        count("scrape_records_saved", len(checkpoint_list))
                         save_to_checkpoint(checkpoint_list)
                         checkpoint_list = []
 
@@ -227,14 +243,16 @@ async def playwright_scraper_manager():
 
     # Final save
     if checkpoint_list:
-        print("\nFINAL CHECKPOINT: Saving remaining records")
+        log("\nFINAL CHECKPOINT: Saving remaining records")
+        count("scrape_records_saved", len(checkpoint_list))
         save_to_checkpoint(checkpoint_list)
         
     final_scraped_count = len(pd.read_csv(OUTPUT_FILE)) if os.path.exists(OUTPUT_FILE) else 0
-    print("\n" + "="*50)
-    print(f"PHASE 2 SCRAPE COMPLETE. Total UNIQUE records saved: {final_scraped_count}")
-    print("="*50)
+    log("\n" + "="*50)
+    log(f"PHASE 2 SCRAPE COMPLETE. Total UNIQUE records saved: {final_scraped_count}")
+    log("="*50)
 
 # Execution
 if __name__ == "__main__":
-    asyncio.run(playwright_scraper_manager())
\ No newline at end of file
+    with span("scrape"):
+        asyncio.run(playwright_scraper_manager())
\ No newline at end of file
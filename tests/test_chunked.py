@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.chunked import column_summary
+from src.ranking.rank import rank_csv_chunked, rank_materials
+from src.ranking.topsis import TOPSIS_COLS
+
+
+def write_columns(path, n_rows=1000, seed=0):
+    """Columns that exercise the radix select: signs, ties, gaps, tiny and huge values."""
+    rng = np.random.default_rng(seed)
+    cols = {
+        "normal": rng.normal(size=n_rows),
+        "lognormal": rng.lognormal(sigma=3.0, size=n_rows),
+        "ties": rng.integers(-3, 4, size=n_rows).astype(float),
+        "tiny": rng.normal(scale=1e-300, size=n_rows),
+        "huge": rng.choice([-1.0, 1.0], size=n_rows) * 10 ** rng.uniform(100, 150, size=n_rows),
+        "constant": np.full(n_rows, 7.25),
+        "sparse": np.where(rng.random(n_rows) < 0.99, np.nan, rng.normal(size=n_rows)),
+    }
+    df = pd.DataFrame(cols)
+    df = df.mask(rng.random(df.shape) < 0.2)
+    df["empty"] = np.nan
+    df.to_csv(path, index=False)
+    return df
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("n_rows, chunksize, collect_max", [(1000, 97, None), (1000, 97, 8), (1, 10, None), (2, 1, 1)])
+def test_summary_matches_numpy(tmp_path, seed, n_rows, chunksize, collect_max):
+    path = tmp_path / "columns.csv"
+    df = write_columns(path, n_rows, seed)
+    X = pd.read_csv(path).values
+    stats = column_summary(path, list(df.columns), chunksize, collect_max)
+    seen = ~np.isnan(X)
+    has = seen.any(axis=0)
+    assert stats["rows"] == n_rows
+    np.testing.assert_array_equal(stats["count"], seen.sum(axis=0))
+    with np.errstate(all="ignore"):
+        np.testing.assert_array_equal(stats["median"][has], np.nanmedian(X[:, has], axis=0))
+        np.testing.assert_array_equal(stats["min"][has], np.nanmin(X[:, has], axis=0))
+        np.testing.assert_array_equal(stats["max"][has], np.nanmax(X[:, has], axis=0))
+        np.testing.assert_allclose(stats["sumsq"][has], np.nansum(X[:, has] ** 2, axis=0), rtol=1e-12)
+
+
+def write_catalog(path, n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    cols = TOPSIS_COLS[:6]
+    df = pd.DataFrame(rng.lognormal(size=(n_rows, len(cols))) * rng.uniform(1, 1e4, size=len(cols)), columns=cols)
+    df = df.mask(rng.random(df.shape) < 0.15)
+    df.insert(0, "Material Name", [f"Material {i}" for i in range(n_rows)])
+    df.to_csv(path, index=False)
+    return df
+
+
+@pytest.mark.parametrize("method", ["topsis", "weighted"])
+@pytest.mark.parametrize("chunksize", [7, 37, 10_000])
+def test_chunked_ranking_matches_full(tmp_path, method, chunksize):
+    path = tmp_path / "catalog.csv"
+    write_catalog(path)
+    full = rank_materials(pd.read_csv(path), n_fronts=None, method=method).reset_index(drop=True)
+    top = rank_csv_chunked(path, chunksize, top_k=50, method=method)
+    assert list(top["Material Name"]) == list(full["Material Name"][:50])
+    assert list(top.columns) == list(full.columns)
+    np.testing.assert_array_equal(top.iloc[:, 1:-1].values, full.iloc[:50, 1:-1].values)
+    np.testing.assert_allclose(top.iloc[:, -1], full.iloc[:50, -1], rtol=1e-12)
+    everything = rank_csv_chunked(path, chunksize, top_k=None, method=method)
+    assert list(everything["Material Name"]) == list(full["Material Name"])
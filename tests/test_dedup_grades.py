@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_cleaning import dedup_grades
+
+
+def synthetic_grades(n_rows=300, n_families=8, seed=0):
+    """
+    Grades of a few material families, each property jittered by up to 4 %:
+    wider than REL_TOL, so grades only verify against some of their family
+    and groups form by chaining, with merges inside shared LSH buckets.
+    """
+    rng = np.random.default_rng(seed)
+    base = 10 ** rng.uniform(-1, 3, size=(n_families, 6))
+    family = rng.integers(0, n_families, size=n_rows)
+    values = base[family] * (1 + rng.uniform(-0.04, 0.04, size=(n_rows, 6)))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    df = pd.DataFrame(values, columns=[f"P{j}" for j in range(6)])
+    df.insert(0, "Material Name", [f"Alloy {f} Grade {rng.integers(3)}" for f in family])
+    return df
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_verified_pairs_share_a_group(seed, monkeypatch):
+    verified = []
+    is_duplicate = dedup_grades._is_duplicate
+
+    def recording(i, j, values, names):
+        ok = is_duplicate(i, j, values, names)
+        if ok:
+            verified.append((i, j))
+        return ok
+
+    monkeypatch.setattr(dedup_grades, "_is_duplicate", recording)
+    groups = dedup_grades.find_near_duplicates(synthetic_grades(seed=seed))
+    assert verified
+    split = [(i, j) for i, j in verified if groups[i] != groups[j]]
+    assert not split
+
+
+def test_groups_are_roots():
+    groups = dedup_grades.find_near_duplicates(synthetic_grades())
+    assert np.array_equal(groups[groups], groups)
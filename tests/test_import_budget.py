@@ -0,0 +1,9 @@
+from benchmarks.import_budget import HEAVY, check
+
+
+def test_cli_fast_paths_stay_within_budget():
+    # fresh interpreters: `import src.cli` and `rank` on a store must not pull in HEAVY
+    results, failures = check()
+    for step in ("import", "rank"):
+        assert not set(results[step]["report"]["heavy"]) & set(HEAVY), step
+    assert not failures
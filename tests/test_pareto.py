@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.ranking.pareto import non_dominated_sort
+from src.ranking.rank import rank_matrix
+from src.ranking.topsis import TOPSIS_COLS, topsis_directions
+
+
+def brute_force_fronts(X, dirs):
+    """Peel the rows no remaining row dominates, one layer at a time."""
+    Y = np.asarray(X, dtype=float) * -np.asarray(dirs, dtype=float)
+    Y[np.isnan(Y)] = np.inf
+    fronts = np.full(len(Y), -1)
+    remaining = set(range(len(Y)))
+    f = 0
+    while remaining:
+        layer = [i for i in remaining
+                 if not any((Y[j] <= Y[i]).all() and (Y[j] < Y[i]).any() for j in remaining)]
+        fronts[layer] = f
+        remaining -= set(layer)
+        f += 1
+    return fronts
+
+
+def objectives(n_rows, n_cols, seed):
+    """Coarse values so ties and duplicate rows occur, with a few gaps."""
+    rng = np.random.default_rng(seed)
+    X = rng.integers(0, 6, size=(n_rows, n_cols)).astype(float)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    dirs = rng.choice([-1.0, 1.0], size=n_cols)
+    return X, dirs
+
+
+@pytest.mark.parametrize("n_cols", [1, 2, 3, 5])
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_brute_force(n_cols, seed):
+    X, dirs = objectives(120, n_cols, seed)
+    expected = brute_force_fronts(X, dirs)
+    assert np.array_equal(non_dominated_sort(X, dirs), expected)
+    limited = non_dominated_sort(X, dirs, max_fronts=2)
+    assert np.array_equal(limited, np.where(expected < 2, expected, -1))
+
+
+@pytest.mark.parametrize("method", ["topsis", "weighted"])
+@pytest.mark.parametrize("seed", range(5))
+def test_first_n_fronts_positions_are_exact(method, seed):
+    rng = np.random.default_rng(seed)
+    cols = TOPSIS_COLS[:5]
+    X = rng.lognormal(size=(400, len(cols)))
+    full = rank_matrix(X, cols, method=method)
+    assert full["fronts"] is None and len(full["rows"]) == len(X)
+    for k in (1, 3, 6):
+        res = rank_matrix(X, cols, n_fronts=k, method=method)
+        assert np.array_equal(res["rows"][:k], full["rows"][:k])
+        np.testing.assert_array_equal(res["score"][:k], full["score"][:k])
+        fronts = non_dominated_sort(X, topsis_directions(cols))
+        assert set(res["rows"]) == set(np.flatnonzero(fronts < k))
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.property_stats import pairwise_corr, pairwise_cov
+
+
+def gappy_table(n_rows=400, seed=0):
+    """
+    Correlated columns on very different scales and offsets, each missing on
+    its own pattern, so shared-row means sit away from the column means.
+    """
+    rng = np.random.default_rng(seed)
+    z = rng.normal(size=(n_rows, 1))
+    X = z + rng.normal(scale=0.5, size=(n_rows, 6))
+    X *= np.array([1.0, 1e-3, 1e6, 50.0, 1e12, 3.0])
+    X += np.array([0.0, 2.5, 1e9, -400.0, 5e14, 1e4])
+    X[rng.random(X.shape) < np.array([0.1, 0.3, 0.5, 0.7, 0.8, 0.95])] = np.nan
+    X[z[:, 0] > 0, 3] = np.nan    # column 3 only on the low half of the shared factor
+    # column 6 sits 1e8 higher on the rows column 2 has: the pair's shared-row
+    # mean is far from the column mean, relative to its spread
+    shift = np.where(np.isnan(X[:, 2]), 0.0, 1e8)
+    X = np.column_stack([X, shift + z[:, 0] + rng.normal(scale=0.5, size=n_rows)])
+    return X
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("min_periods", [2, 10, 40])
+def test_matches_pandas(seed, min_periods):
+    X = gappy_table(seed=seed)
+    df = pd.DataFrame(X)
+    corr, n = pairwise_corr(X, min_periods)
+    expected = df.corr(min_periods=min_periods).values
+    assert np.array_equal(np.isnan(corr), np.isnan(expected))
+    # pandas' running means are themselves ~1e-9 off on the shifted column
+    np.testing.assert_allclose(corr, expected, rtol=0, atol=1e-8)
+    cov, _ = pairwise_cov(X, min_periods)
+    np.testing.assert_allclose(cov, df.cov(min_periods=min_periods).values, rtol=1e-8, atol=0)
+    np.testing.assert_array_equal(n, df.notna().astype(int).T @ df.notna().astype(int))
+
+
+def test_constant_on_shared_rows_is_nan():
+    X = np.array([[1.0, 5.0], [2.0, 5.0], [3.0, np.nan], [np.nan, 7.0]])
+    corr, _ = pairwise_corr(X)
+    assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 0])
+    assert corr[0, 0] == 1.0
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.schema import FLOAT32_RTOL, split_categories
+from src.pipeline.store import column, load_catalog, numeric_matrix, open_store, to_frame, write_store
+
+
+def catalog(n_rows=50, seed=0, exact=False):
+    """A stage CSV as the store stage reads it: every cell a string, "" -> NaN."""
+    rng = np.random.default_rng(seed)
+    density = np.round(rng.uniform(0.9, 20.0, n_rows), 2)
+    modulus = rng.lognormal(10, 2, n_rows)
+    sparse = np.where(np.arange(n_rows) % 20 == 0, rng.normal(size=n_rows), np.nan)
+    if exact:
+        modulus[0] = 1e300    # beyond float32 range: the store keeps float64
+    density[3] = modulus[5] = np.nan
+    cats = ["Ceramic;Oxide", "Metal", "", "Glass;Ceramic;Other"]
+    df = pd.DataFrame({
+        "GUID": [f"g{i:04x}" for i in range(n_rows)],
+        "Material Name": [f"Grade {i} – Ω" for i in range(n_rows)],
+        "Categories": [cats[i % len(cats)] for i in range(n_rows)],
+        "Density": [repr(float(v)) for v in density],
+        "Modulus": [repr(float(v)) for v in modulus],
+        "Rare": [repr(float(v)) for v in sparse],
+        "Material Notes": ["" if i % 3 else f"note {i}" for i in range(n_rows)],
+    }).replace("nan", "")
+    return df.replace("", np.nan)
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_round_trip(tmp_path, exact):
+    df = catalog(exact=exact)
+    header = write_store(df, tmp_path / "store")
+    store = open_store(tmp_path / "store")
+    assert header["dtype"] == ("float64" if exact else "float32")
+    assert store["header"]["rows"] == len(df)
+
+    values = numeric_matrix(store)
+    assert isinstance(values, np.memmap) and not values.flags.writeable
+    assert values.dtype == np.dtype(header["dtype"]) and values.flags.f_contiguous
+    assert store["numeric"] == ["Density", "Modulus", "Rare"]
+    for c in store["numeric"]:
+        expected = pd.to_numeric(df[c]).values
+        got = np.asarray(column(store, c), dtype=float)
+        assert np.array_equal(np.isnan(got), np.isnan(expected))
+        if exact:
+            assert np.array_equal(got, expected, equal_nan=True)
+        else:
+            np.testing.assert_allclose(got, expected, rtol=FLOAT32_RTOL)
+
+    assert column(store, "Material Name") == list(df["Material Name"])
+    assert column(store, "Material Notes") == [None if pd.isna(v) else v for v in df["Material Notes"]]
+    assert list(pd.Series(column(store, "Categories")).astype(object).fillna("")) == list(df["Categories"].fillna(""))
+    assert list(to_frame(store).columns) == list(df.columns)
+
+
+def test_category_csr(tmp_path):
+    df = catalog()
+    write_store(df, tmp_path / "store")
+    csr = open_store(tmp_path / "store")["csr"]
+    vocab = csr["vocab"]
+    off, codes = np.asarray(csr["offsets"]), np.asarray(csr["codes"])
+    assert len(off) == len(df) + 1 and off[0] == 0
+    lists = [[vocab[c] for c in codes[off[i]:off[i + 1]]] for i in range(len(df))]
+    assert lists == [split_categories(v) for v in df["Categories"]]
+
+
+def test_load_catalog_store_matches_csv(tmp_path):
+    df = catalog()
+    df.to_csv(tmp_path / "catalog.csv", index=False)
+    write_store(df, tmp_path / "store")
+    X_csv, cols_csv, csr_csv = load_catalog(str(tmp_path / "catalog.csv"))
+    X_store, cols_store, csr_store = load_catalog(str(tmp_path / "store"))
+    assert cols_store == cols_csv and X_store.dtype == np.float64
+    np.testing.assert_allclose(X_store, X_csv, rtol=FLOAT32_RTOL)
+    assert csr_store["vocab"] == csr_csv["vocab"]
+    np.testing.assert_array_equal(csr_store["offsets"], csr_csv["offsets"])
+    np.testing.assert_array_equal(csr_store["codes"], csr_csv["codes"])
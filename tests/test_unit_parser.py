@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_cleaning import unit_parser
+from src.data_cleaning.unit_parser import PREFIX, parse_cells, parse_condition, to_si, typed_frame, typed_property
+
+
+def si_value(cell):
+    si = to_si(parse_cells([cell]))
+    return si["value"][0], si["unit"][0]
+
+
+@pytest.mark.parametrize("cell, value, unit", [
+    ("2.70 g/cc", 2700.0, "kg/m³"),
+    ("0.0975 lb/in³", 2698.79, "kg/m³"),
+    ("69.0 GPa", 69e9, "Pa"),
+    ("10000 ksi", 68.94757e9, "Pa"),
+    ("45000 psi", 310.264e6, "Pa"),
+    ("25.0 °C", 298.15, "K"),
+    ("77.0 °F", 298.15, "K"),
+    ("237 W/m-K", 237.0, "W/m-K"),
+    ("1644 BTU-in/hr-ft²-°F", 237.11, "W/m-K"),
+    ("23.6 -°C", 23.6e-6, "1/K"),
+    ("13.1 -°F", 23.58e-6, "1/K"),
+    ("0.33", 0.33, "1"),
+    ("99.5 %", 99.5, "%"),
+    ("12 tex", 12e-6, "kg/m"),
+    ("5.2 barns/atom", 5.2e-28, "m²"),
+])
+def test_converts_to_si(cell, value, unit):
+    got, got_unit = si_value(cell)
+    assert got_unit == unit
+    assert got == pytest.approx(value, rel=1e-4)
+
+
+def test_range_qualifier_and_condition():
+    parsed = parse_cells(["≤2.23 - 2.40g/cc@Temperature 25.0 °C", "<= 5 %", "English", None])
+    assert parsed["value"][0] == 2.23 and parsed["upper"][0] == 2.40
+    assert parsed["unit"][0] == "g/cc" and parsed["condition"][0] == "@Temperature 25.0 °C"
+    assert parsed["value"][1] == 5.0
+    assert np.isnan(parsed["value"][2]) and np.isnan(parsed["value"][3])
+    si = to_si(parsed)
+    assert si["upper"][0] == pytest.approx(2400.0)
+
+
+def test_parse_condition():
+    cond = parse_condition("@Temperature 23.0 °C,Time 60 sec,Thickness 1.00 mm")
+    assert cond == pytest.approx({"Temperature [K]": 296.15, "Time [s]": 60.0, "Thickness [m]": 1e-3})
+
+
+def test_unknown_units_are_reported_not_guessed():
+    si = typed_property(np.array(["3 furlongs", "2.0 g/cc"], dtype=object))
+    assert list(si["unknown_units"]) == ["furlongs"]
+    assert np.isnan(si["value"][0]) and si["value"][1] == 2000.0
+
+
+def test_cells_in_another_unit_are_dropped():
+    cells = np.array(["2.0 g/cc", "7.8 g/cc", "200 GPa", "55 %", "0.29 lb/in³"], dtype=object)
+    si = typed_property(cells, "kg/m³")
+    assert si["off_unit"] == 2
+    np.testing.assert_allclose(si["value"], [2000.0, 7800.0, np.nan, np.nan, 8027.17], rtol=1e-4)
+    # without a declared unit the most common one wins
+    assert typed_property(cells)["si_unit"] == "kg/m³"
+
+
+def test_typed_frame_columns(monkeypatch):
+    monkeypatch.setattr(unit_parser, "BLANK_THRESHOLD", 0.5)
+    df = pd.DataFrame({
+        "Material Name": ["A", "B", "C"],
+        PREFIX + "Density": ["2.70 g/cc", "0.284 lb/in³", "25 %"],
+        PREFIX + "Density (Comment)": ["0.0975 lb/in³", None, "8.0 g/cc"],
+        PREFIX + "Color": ["5 %", "7 %", None],
+        PREFIX + "Softening Point": [None, None, "800 °C"],
+    })
+    typed, stats = typed_frame(df, conditions=False)
+    assert list(typed.columns) == ["Material Name", "Density"]
+    np.testing.assert_allclose(typed["Density"], [2700.0, 7861.1, np.nan], rtol=1e-4)
+    assert stats["units"] == {"Density": "kg/m³"} and stats["off_unit"] == 1
+    catalog = unit_parser.catalog_frame(typed, stats["units"])
+    assert list(catalog.columns) == ["Material Name", PREFIX + "Density"]